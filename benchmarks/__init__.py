@@ -0,0 +1,3 @@
+"""
+Offline benchmarks and the local mock news server.
+"""
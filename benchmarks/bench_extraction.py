@@ -0,0 +1,142 @@
+"""
+Extraction Backend Benchmark.
+
+Runs every extraction backend over a saved HTML corpus, reports pages per second
+and checks that all backends extract exactly what the BeautifulSoup backend does.
+
+The corpus directory holds one sub-directory per site, "bdpratidin" and
+"banglanews24", each with article pages named *.html and archive pages named
+archive-*.html, the layout of the recorded fixtures in benchmarks/fixtures.
+Without --corpus, pages are rendered from data/NewsArticle.json.
+
+Run from the repository root:
+    python -m benchmarks.bench_extraction --corpus path/to/corpus --repeat 3
+"""
+
+import argparse
+import sys
+import time
+
+from benchmarks import mock_server
+from benchmarks.fixtures import load_fixtures
+from src.crawlers.bdp_crawler_v2 import BengaliNewsCrawler
+from src.crawlers.bn24_crawler_v2 import BanglaNews24Crawler
+from src.crawlers.extraction import BACKENDS, etree
+
+SITES = {"bdpratidin": BengaliNewsCrawler, "banglanews24": BanglaNews24Crawler}
+ARCHIVE_URLS = {
+    "bdpratidin": "https://www.bd-pratidin.com/first-page/2024/03/31/31",
+    "banglanews24": "https://www.banglanews24.com/cricket?date=2024/03/31",
+}
+
+
+def load_corpus(directory):
+    """
+    Loads a saved HTML corpus from disk.
+
+    Args:
+        directory (str): The corpus directory, e.g. benchmarks/fixtures.
+
+    Returns:
+        dict: Mapping of site name to (article pages, archive pages), each a
+            list of (url, html) tuples.
+    """
+    return load_fixtures(directory)
+
+
+def render_corpus(articles_file):
+    """
+    Renders a corpus in each site's markup from crawled articles.
+
+    Args:
+        articles_file (str): A JSON file produced by the crawlers.
+
+    Returns:
+        dict: Mapping of site name to (article pages, archive pages).
+    """
+    articles = mock_server.load_articles(articles_file)
+    hrefs = [f"country/2024/03/31/{i}" for i in range(50)]
+    urls = [f"https://www.banglanews24.com/cricket/news/bd/{i}.details" for i in range(50)]
+    return {
+        "bdpratidin": (
+            [(a["url"], mock_server.render_bdp_article(a).encode()) for a in articles],
+            [(ARCHIVE_URLS["bdpratidin"], mock_server.render_bdp_archive(hrefs).encode())],
+        ),
+        "banglanews24": (
+            [(a["url"], mock_server.render_bn24_article(a).encode()) for a in articles],
+            [(ARCHIVE_URLS["banglanews24"], mock_server.render_bn24_archive(urls).encode())],
+        ),
+    }
+
+
+def run_backend(crawler, articles, archives, repeat):
+    """
+    Extracts every page with one crawler and times the article pages.
+
+    Args:
+        crawler: A crawler configured with the backend under test.
+        articles (list): (url, html) article pages.
+        archives (list): (url, html) archive pages.
+        repeat (int): Number of timed passes over the article pages.
+
+    Returns:
+        tuple: (outputs, best seconds per pass) where outputs lists the extracted
+            article or error name per page, followed by the archive links.
+    """
+    outputs = []
+    for url, html in articles:
+        try:
+            outputs.append(crawler.extract_article(url, html))
+        except AttributeError:
+            outputs.append("AttributeError")
+    for url, html in archives:
+        outputs.append(crawler.extract_archive_links(url, html))
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for url, html in articles:
+            try:
+                crawler.extract_article(url, html)
+            except AttributeError:
+                pass
+        best = min(best, time.perf_counter() - started)
+    return outputs, best
+
+
+def main():
+    """
+    Runs the extraction benchmark and exits non-zero if the backends disagree.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 2)[1])
+    parser.add_argument("--corpus", help="saved HTML corpus directory")
+    parser.add_argument("--articles", default=mock_server.ARTICLES_FILE,
+                        help="articles to render when no corpus is given")
+    parser.add_argument("--repeat", type=int, default=3, help="timed passes per backend")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus) if args.corpus else render_corpus(args.articles)
+    backends = [name for name in BACKENDS if name != "lxml" or etree is not None]
+    mismatches = 0
+    for site, (articles, archives) in corpus.items():
+        if not articles:
+            continue
+        reference, reference_time = None, None
+        for name in backends:
+            outputs, elapsed = run_backend(SITES[site](backend=name), articles, archives,
+                                           args.repeat)
+            if reference is None:
+                reference, reference_time = outputs, elapsed
+            differing = sum(1 for ours, theirs in zip(outputs, reference) if ours != theirs)
+            mismatches += differing
+            print(
+                f"{site:<13} {name:<5} {len(articles) / elapsed:9.1f} pages/s "
+                f"({reference_time / elapsed:4.1f}x), {differing} pages differ"
+            )
+    if mismatches:
+        print(f"FAIL: {mismatches} pages extracted differently")
+        sys.exit(1)
+    print("OK: all backends produced identical output")
+
+
+if __name__ == "__main__":
+    main()
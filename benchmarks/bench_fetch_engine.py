@@ -0,0 +1,188 @@
+"""
+Fetch Engine Benchmark.
+
+Measures fetch throughput of serial requests, with a new connection per request
+and with the pooled HttpFetcher, against the AsyncFetchEngine, the effect of the
+response cache on repeated fetches, and the end-to-end crawl throughput of both
+crawlers, using the local mock server.
+
+Run from the repository root:
+    python -m benchmarks.bench_fetch_engine --latency 0.05 --urls 200
+"""
+
+import argparse
+import contextlib
+import io
+import tempfile
+import time
+from datetime import datetime
+
+import requests
+
+from benchmarks.mock_server import MockNewsServer
+from src.crawlers.bdp_crawler_v2 import BengaliNewsCrawler
+from src.crawlers.bn24_crawler_v2 import BanglaNews24Crawler
+from src.crawlers.fetch_engine import AsyncFetchEngine
+from src.crawlers.http_fetcher import HttpFetcher
+from src.crawlers.pipeline import CrawlPipeline
+from src.crawlers.response_cache import ResponseCache
+
+
+def bench_serial(urls, fetch):
+    """
+    Fetches the URLs one at a time.
+
+    Args:
+        urls (list): The URLs to fetch.
+        fetch (callable): Blocking callable taking a URL.
+
+    Returns:
+        float: Elapsed seconds.
+    """
+    started = time.perf_counter()
+    for url in urls:
+        fetch(url)
+    return time.perf_counter() - started
+
+
+def bench_engine(urls, concurrency, per_host_limit):
+    """
+    Fetches the URLs through the AsyncFetchEngine with a fresh pooled fetcher.
+
+    Args:
+        urls (list): The URLs to fetch.
+        concurrency (int): The global concurrency limit.
+        per_host_limit (int): The per-host concurrency limit.
+
+    Returns:
+        float: Elapsed seconds.
+    """
+    fetcher = HttpFetcher(pool_size=per_host_limit)
+    with AsyncFetchEngine(
+        max_concurrency=concurrency, per_host_limit=per_host_limit, fetcher=fetcher
+    ) as engine:
+        started = time.perf_counter()
+        results = engine.fetch_all(urls)
+        elapsed = time.perf_counter() - started
+    failures = sum(1 for result in results if result.error is not None)
+    if failures:
+        print(f"  {failures} fetches failed")
+    print_fetcher_stats(fetcher)
+    return elapsed
+
+
+def bench_cache(server, urls, concurrency):
+    """
+    Fetches the URLs three times through a response cache: cold, revalidated
+    with conditional requests, and replayed without the network.
+
+    Args:
+        server (MockNewsServer): The running mock server.
+        urls (list): The URLs to fetch.
+        concurrency (int): The global and per-host concurrency limit.
+
+    Returns:
+        list: (name, elapsed seconds, requests served) tuples.
+    """
+    rows = []
+    with tempfile.TemporaryDirectory() as directory, ResponseCache(directory) as cache:
+        for name, replay in (("cold", False), ("revalidated", False), ("replayed", True)):
+            fetcher = HttpFetcher(pool_size=concurrency, cache=cache, replay=replay)
+            served = server.requests_served
+            with AsyncFetchEngine(
+                max_concurrency=concurrency, per_host_limit=concurrency, fetcher=fetcher
+            ) as engine:
+                started = time.perf_counter()
+                engine.fetch_all(urls)
+                elapsed = time.perf_counter() - started
+            rows.append((name, elapsed, server.requests_served - served))
+            print_fetcher_stats(fetcher)
+    return rows
+
+
+def print_fetcher_stats(fetcher):
+    """
+    Prints the per-host connection reuse and retry counters of a fetcher.
+
+    Args:
+        fetcher (HttpFetcher): The fetcher to report on.
+    """
+    for host, counters in fetcher.stats().items():
+        print(
+            f"  {host}: {counters['requests']} requests over "
+            f"{counters['connections']} connections ({counters['reused']} reused), "
+            f"{counters['retries']} retries, {counters['errors']} errors, "
+            f"{counters['not_modified']} not modified, {counters['cache_hits']} replayed"
+        )
+
+
+def bench_crawlers(server, concurrency):
+    """
+    Crawls one day of both mock websites end to end.
+
+    Args:
+        server (MockNewsServer): The running mock server.
+        concurrency (int): The per-host concurrency limit.
+
+    Returns:
+        list: (name, articles, elapsed seconds) tuples.
+    """
+    day = datetime(2024, 3, 31)
+    rows = []
+    with AsyncFetchEngine(max_concurrency=concurrency, per_host_limit=concurrency) as engine:
+        bdp = BengaliNewsCrawler(engine=engine)
+        bn24 = BanglaNews24Crawler(engine=engine)
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            bdp.fetch_articles(f"{server.base_url}/first-page/", day, day)
+            rows.append(("bd-pratidin", len(bdp.articles), time.perf_counter() - started))
+            started = time.perf_counter()
+            links = bn24.fetch_all_categories(f"{server.base_url}/")
+            bn24.fetch_articles(links, day, day)
+            rows.append(("banglanews24", len(bn24.articles), time.perf_counter() - started))
+            bn24 = BanglaNews24Crawler(engine=engine)
+            started = time.perf_counter()
+            pipeline = CrawlPipeline(bn24, fetch_workers=concurrency)
+            pipeline.run(bn24.archive_urls(links, day, day))
+            elapsed = time.perf_counter() - started
+            rows.append(("banglanews24 pipeline", len(bn24.articles), elapsed))
+    return rows
+
+
+def main():
+    """
+    Runs the fetch engine benchmark and prints a throughput table.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 2)[1])
+    parser.add_argument("--urls", type=int, default=200, help="number of article URLs")
+    parser.add_argument("--latency", type=float, default=0.05, help="server latency (s)")
+    parser.add_argument(
+        "--concurrency", type=int, nargs="+", default=[4, 16, 32], help="limits to try"
+    )
+    args = parser.parse_args()
+
+    with MockNewsServer(latency=args.latency, articles_per_archive=50) as server:
+        urls = [f"{server.base_url}/cricket/news/bd/{i}.details" for i in range(args.urls)]
+        unpooled = bench_serial(urls, lambda url: requests.get(url, timeout=10))
+        print(f"serial, new connection: {args.urls / unpooled:8.1f} pages/s ({unpooled:.2f}s)")
+        fetcher = HttpFetcher()
+        serial = bench_serial(urls, fetcher.fetch)
+        print(f"serial, pooled session: {args.urls / serial:8.1f} pages/s ({serial:.2f}s)")
+        print_fetcher_stats(fetcher)
+        for concurrency in args.concurrency:
+            elapsed = bench_engine(urls, concurrency, concurrency)
+            print(
+                f"engine c={concurrency:<3}:           {args.urls / elapsed:8.1f} pages/s "
+                f"({elapsed:.2f}s, {serial / elapsed:.1f}x)"
+            )
+        for name, elapsed, served in bench_cache(server, urls, max(args.concurrency)):
+            print(
+                f"cache {name:<12}:    {args.urls / elapsed:8.1f} pages/s "
+                f"({elapsed:.2f}s, {served} requests served)"
+            )
+        for name, count, elapsed in bench_crawlers(server, max(args.concurrency)):
+            print(f"crawl {name}: {count} articles in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
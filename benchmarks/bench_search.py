@@ -0,0 +1,102 @@
+"""
+Search Index Benchmark.
+
+Indexes a corpus built by repeating data/NewsArticle.json, then reports the
+indexing throughput, the index size and the median latency of term, phrase,
+filter and date queries, before and after merging the segments.
+
+Run from the repository root:
+    python -m benchmarks.bench_search --repeat 100
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.bench_tokenization import build_corpus
+from src.crawlers.article_store import iter_articles
+from src.search.inverted_index import IndexWriter, InvertedIndex
+
+QUERIES = (
+    ("term", "বাংলাদেশ", {}),
+    ("rare term", "চান্দিমাল", {}),
+    ("terms", "সাকিব উইকেট", {}),
+    ("phrase", '"সাকিব আল হাসান"', {}),
+    ("term + category", "বাংলাদেশ", {"category": "ক্রিকেট"}),
+    ("category", "", {"category": "ক্রিকেট"}),
+    ("date range", "", {"start": datetime(2024, 3, 31), "end": datetime(2024, 3, 31, 12)}),
+)
+
+
+def directory_size(path):
+    """
+    Returns the total size of the files under a directory.
+
+    Args:
+        path (str): The directory.
+
+    Returns:
+        int: Bytes.
+    """
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, names in os.walk(path)
+        for name in names
+    )
+
+
+def time_queries(index, repeat):
+    """
+    Runs every query and prints its hit count and median latency.
+
+    Args:
+        index (InvertedIndex): The index.
+        repeat (int): Runs per query.
+    """
+    for name, query, filters in QUERIES:
+        times = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            hits = index.search(query, limit=10, **filters)
+            times.append(time.perf_counter() - started)
+        times.sort()
+        print(f"  {name:<18} {len(hits):>4} hits {times[len(times) // 2] * 1000:8.2f} ms")
+
+
+def main():
+    """
+    Runs the search benchmark.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 2)[1])
+    parser.add_argument("--articles", default="data/NewsArticle.json", help="source articles")
+    parser.add_argument("--repeat", type=int, default=100, help="copies of each article")
+    parser.add_argument("--segment-size", type=int, default=20000, help="articles per segment")
+    parser.add_argument("--runs", type=int, default=20, help="runs per query")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        corpus = os.path.join(directory, "corpus")
+        build_corpus(args.articles, args.repeat, corpus)
+        index_dir = os.path.join(directory, "index")
+        started = time.perf_counter()
+        with IndexWriter(index_dir, segment_size=args.segment_size) as writer:
+            count = writer.add_all(iter_articles(corpus))
+            segments = len(writer.manifest["segments"])
+        elapsed = time.perf_counter() - started
+        print(f"Indexed {count} articles in {elapsed:.2f}s ({count / elapsed:.1f} articles/s), "
+              f"{directory_size(index_dir) / 2**20:.1f} MB")
+        with InvertedIndex(index_dir) as index:
+            print(f"{segments} segments:")
+            time_queries(index, args.runs)
+        started = time.perf_counter()
+        with IndexWriter(index_dir) as writer:
+            writer.merge()
+        print(f"Merged in {time.perf_counter() - started:.2f}s:")
+        with InvertedIndex(index_dir) as index:
+            time_queries(index, args.runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Bengali Segmenter Benchmark.
+
+Segments the content of every crawled article into sentences and words with the
+regex segmenter, the danda split with indic_tokenize.trivial_tokenize, and NLTK
+punkt with word_tokenize, and reports articles per second and token counts.
+
+Run from the repository root:
+    python -m benchmarks.bench_segmenter --articles data/NewsArticle.json --repeat 5
+"""
+
+import argparse
+import time
+
+from src.crawlers.article_store import iter_articles
+from src.tokenization.bn_segmenter import segment
+from src.tokenization.corpus_tokenizer import indic_tokenize_text
+from src.tokenization.resources import NLTK_DATA_DIR, load_punkt, nltk_word_tokenize
+
+
+def nltk_segmenter():
+    """
+    Builds the NLTK path of tokenize_with_nltk from the vendored punkt model.
+
+    Returns:
+        callable: Takes a text and returns one list of words per sentence, or
+            None if NLTK or the vendored model is unavailable.
+    """
+    try:
+        punkt = load_punkt()
+    except (ImportError, LookupError):
+        return None
+
+    def tokenize(text):
+        return [nltk_word_tokenize(sentence) for sentence in punkt.tokenize(text)]
+
+    return tokenize
+
+
+def native_segmenter(text):
+    """
+    Segments a text with the regex segmenter, returning offsets only.
+
+    Args:
+        text (str): The text to segment.
+
+    Returns:
+        list: One list of (start, end) token offsets per sentence.
+    """
+    return segment(text)
+
+
+def run(segmenter, texts, repeat):
+    """
+    Segments every text and times the best of several passes.
+
+    Args:
+        segmenter (callable): Takes a text and returns a list of token lists.
+        texts (list): The texts.
+        repeat (int): Number of timed passes.
+
+    Returns:
+        tuple: (best seconds per pass, sentence count, token count).
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        results = [segmenter(text) for text in texts]
+        best = min(best, time.perf_counter() - started)
+    sentences = sum(len(result) for result in results)
+    tokens = sum(len(sentence) for result in results for sentence in result)
+    return best, sentences, tokens
+
+
+def main():
+    """
+    Runs the segmenter benchmark and prints a throughput table.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 2)[1])
+    parser.add_argument("--articles", default="data/NewsArticle.json",
+                        help="JSON file, JSONL shard or shard directory")
+    parser.add_argument("--repeat", type=int, default=5, help="timed passes per segmenter")
+    args = parser.parse_args()
+
+    texts = [article.get("content") or "" for article in iter_articles(args.articles)]
+    characters = sum(len(text) for text in texts)
+    segmenters = {
+        "native": native_segmenter,
+        "indic": indic_tokenize_text,
+        "nltk": nltk_segmenter(),
+    }
+    print(f"{len(texts)} articles, {characters} characters")
+    baseline = None
+    for name, segmenter in segmenters.items():
+        if segmenter is None:
+            print(f"{name:<7} skipped: NLTK or its punkt model in {NLTK_DATA_DIR} is not available")
+            continue
+        elapsed, sentences, tokens = run(segmenter, texts, args.repeat)
+        baseline = baseline or elapsed
+        print(
+            f"{name:<7} {len(texts) / elapsed:9.1f} articles/s "
+            f"{characters / elapsed / 1e6:6.2f} Mchar/s ({elapsed / baseline:5.1f}x native time), "
+            f"{sentences} sentences, {tokens} tokens"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Tokenizer Cold-Start Benchmark.
+
+Starts a fresh interpreter per run, imports a tokenizer module and makes its
+first tokenization call, and reports the import time, the first-call time and
+the best total against a budget. Nothing is downloaded: the NLTK method reads
+the vendored nltk_data directory.
+
+Run from the repository root:
+    python -m benchmarks.bench_startup --runs 5 --budget 1.0
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+SAMPLE = "দিনের শুরুতে আকাশে মেঘ। কিন্তু ম্যাচের ভাগ্যে কোনো বদল এলো না তবুও।"
+
+# Each entry imports a module and tokenizes SAMPLE once with one backend.
+TARGETS = {
+    "native": ("src.tokenization.bn_segmenter", "segment"),
+    "indic": ("src.tokenization.corpus_tokenizer", "indic_tokenize_text"),
+    "nltk": ("src.tokenization.bn_tokenizer", "tokenize_with_nltk"),
+}
+
+_PROBE = """
+import importlib, json, sys, time
+started = time.perf_counter()
+module = importlib.import_module(sys.argv[1])
+imported = time.perf_counter()
+getattr(module, sys.argv[2])(sys.argv[3])
+finished = time.perf_counter()
+print(json.dumps({"import": imported - started, "first_call": finished - imported,
+                  "modules": len(sys.modules)}))
+"""
+
+
+def cold_start(module, function, text=SAMPLE):
+    """
+    Imports a module and calls a tokenizer once in a new interpreter.
+
+    Args:
+        module (str): The module to import.
+        function (str): The tokenizer function in that module.
+        text (str): The text passed to the first call.
+
+    Returns:
+        dict: Seconds spent in "import" and "first_call", and the number of
+            loaded "modules", or None if the probe failed (e.g. a missing backend).
+    """
+    result = subprocess.run(
+        [sys.executable, "-c", _PROBE, module, function, text],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if result.returncode != 0:
+        return None
+    return json.loads(result.stdout)
+
+
+def main():
+    """
+    Runs the cold-start benchmark and prints one line per tokenizer.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 2)[1])
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per method")
+    parser.add_argument("--budget", type=float, default=1.0,
+                        help="seconds allowed for import plus the first call")
+    parser.add_argument("--methods", nargs="+", choices=TARGETS, default=list(TARGETS))
+    args = parser.parse_args()
+
+    over_budget = []
+    for name in args.methods:
+        runs = [cold_start(*TARGETS[name]) for _ in range(args.runs)]
+        if None in runs:
+            print(f"{name:<7} skipped: the backend or its model is not available")
+            continue
+        best = min(runs, key=lambda run: run["import"] + run["first_call"])
+        total = best["import"] + best["first_call"]
+        status = "ok" if total <= args.budget else "OVER BUDGET"
+        if total > args.budget:
+            over_budget.append(name)
+        print(
+            f"{name:<7} import {best['import'] * 1000:7.1f} ms  "
+            f"first call {best['first_call'] * 1000:7.1f} ms  "
+            f"total {total * 1000:7.1f} ms  {best['modules']:4d} modules  {status}"
+        )
+    if over_budget:
+        sys.exit(f"Over the {args.budget:.2f}s cold-start budget: {', '.join(over_budget)}")
+
+
+if __name__ == "__main__":
+    main()
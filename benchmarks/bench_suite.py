@@ -0,0 +1,376 @@
+"""
+Offline Benchmark Suite.
+
+Runs every benchmark case against the recorded fixtures and the local mock
+server, compares the results with a stored baseline and exits non-zero if any
+metric regressed by more than the tolerance. The cases are:
+
+    crawl-<site>-<n>x     end-to-end pipeline crawl of n times as many articles
+                          as data/NewsArticle.json holds, streamed to shards
+    extract-<site>        extraction time per recorded article page
+    tokenize-<n>x         corpus tokenization of data/NewsArticle.json repeated
+                          n times
+
+Each case runs in a fresh interpreter, so its peak memory is its own. Metrics
+ending in _per_second are better when higher, all others when lower.
+
+Run from the repository root:
+    python -m benchmarks.bench_suite --save-baseline
+    python -m benchmarks.bench_suite --tolerance 0.15
+"""
+
+import argparse
+import contextlib
+import json
+import math
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from benchmarks import mock_server
+from benchmarks.fixtures import FIXTURES_DIR, SITES, load_fixtures
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def peak_rss_mb():
+    """
+    Returns the peak resident memory of this process and of its finished children.
+
+    Returns:
+        float: Megabytes; parser and tokenizer pools are children.
+    """
+    usage = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    # ru_maxrss is in kilobytes, except on macOS where it is in bytes.
+    return usage / (1024**2 if sys.platform == "darwin" else 1024)
+
+
+@contextlib.contextmanager
+def crawl_environment(args, articles):
+    """
+    Runs the mock website, and the fetch engine and sink of a crawl case.
+
+    Args:
+        args (argparse.Namespace): The suite options.
+        articles (list): The articles the mock website serves.
+
+    Yields:
+        tuple: (server, engine, sink), closed when the case ends.
+    """
+    # pylint: disable=import-outside-toplevel
+    from src.crawlers.article_store import JsonlShardWriter
+    from src.crawlers.fetch_engine import AsyncFetchEngine
+    from src.crawlers.http_fetcher import HttpFetcher
+
+    with contextlib.ExitStack() as stack:
+        directory = stack.enter_context(tempfile.TemporaryDirectory())
+        server = stack.enter_context(
+            mock_server.MockNewsServer(
+                articles,
+                latency=args.latency,
+                articles_per_archive=args.articles_per_archive,
+                fixtures=load_fixtures(args.fixtures),
+                error_rate=args.error_rate,
+            )
+        )
+        # Injected errors are retried at once, so they cost requests, not sleeps.
+        fetcher = HttpFetcher(pool_size=args.concurrency, backoff_factor=0.001)
+        engine = stack.enter_context(
+            AsyncFetchEngine(
+                max_concurrency=args.concurrency,
+                per_host_limit=args.concurrency,
+                fetcher=fetcher,
+            )
+        )
+        sink = stack.enter_context(JsonlShardWriter(directory, sync_every=1000))
+        devnull = stack.enter_context(open(os.devnull, "w", encoding="utf-8"))
+        stack.enter_context(contextlib.redirect_stdout(devnull))
+        yield server, engine, sink
+
+
+def site_crawler(site, server, engine, sink):
+    """
+    Builds the crawler of a site and lists the archive bases on the mock website.
+
+    Args:
+        site (str): "bdpratidin" or "banglanews24".
+        server (mock_server.MockNewsServer): The mock website.
+        engine (AsyncFetchEngine): The fetch engine.
+        sink (JsonlShardWriter): The article sink.
+
+    Returns:
+        tuple: (crawler, base URLs).
+    """
+    # pylint: disable=import-outside-toplevel
+    from src.crawlers.bdp_crawler_v2 import BengaliNewsCrawler
+    from src.crawlers.bn24_crawler_v2 import BanglaNews24Crawler
+
+    if site == "bdpratidin":
+        return BengaliNewsCrawler(engine=engine, sink=sink), [f"{server.base_url}/first-page/"]
+    crawler = BanglaNews24Crawler(engine=engine, sink=sink)
+    return crawler, crawler.fetch_all_categories(f"{server.base_url}/")
+
+
+def case_crawl(args, site, scale):
+    """
+    Crawls the mock website end to end through the pipeline.
+
+    Args:
+        args (argparse.Namespace): The suite options.
+        site (str): "bdpratidin" or "banglanews24".
+        scale (int): Multiple of the size of the articles file to crawl.
+
+    Returns:
+        dict: articles_per_second and peak_rss_mb.
+    """
+    # pylint: disable=import-outside-toplevel
+    from src.crawlers.pipeline import CrawlPipeline
+
+    articles = mock_server.load_articles(args.articles)
+    with crawl_environment(args, articles) as (server, engine, sink):
+        crawler, bases = site_crawler(site, server, engine, sink)
+        days = math.ceil(len(articles) * scale / (args.articles_per_archive * len(bases)))
+        start = datetime(2024, 1, 1)
+        started = time.perf_counter()
+        CrawlPipeline(crawler, fetch_workers=args.concurrency).run(
+            crawler.archive_urls(bases, start, start + timedelta(days=days - 1))
+        )
+        crawler.flush_articles()
+        elapsed = time.perf_counter() - started
+    return {"articles_per_second": sink.records / elapsed, "peak_rss_mb": peak_rss_mb()}
+
+
+def case_extract(args, site):
+    """
+    Extracts every recorded article page of a site.
+
+    Args:
+        args (argparse.Namespace): The suite options.
+        site (str): "bdpratidin" or "banglanews24".
+
+    Returns:
+        dict: The median and 95th percentile milliseconds per article.
+    """
+    # pylint: disable=import-outside-toplevel
+    from src.crawlers.bdp_crawler_v2 import BengaliNewsCrawler
+    from src.crawlers.bn24_crawler_v2 import BanglaNews24Crawler
+
+    crawler = {"bdpratidin": BengaliNewsCrawler, "banglanews24": BanglaNews24Crawler}[site]()
+    pages = load_fixtures(args.fixtures)[site][0]
+    times = []
+    for _ in range(args.repeat):
+        for url, html in pages:
+            started = time.perf_counter()
+            try:
+                crawler.extract_article(url, html)
+            except AttributeError:
+                pass
+            times.append(time.perf_counter() - started)
+    times.sort()
+    return {
+        "ms_per_article": times[len(times) // 2] * 1000,
+        "p95_ms_per_article": times[int(len(times) * 0.95)] * 1000,
+    }
+
+
+def case_tokenize(args, scale):
+    """
+    Tokenizes a synthetic corpus of repeated articles.
+
+    Args:
+        args (argparse.Namespace): The suite options.
+        scale (int): How many times each article appears.
+
+    Returns:
+        dict: articles_per_second and peak_rss_mb.
+    """
+    # pylint: disable=import-outside-toplevel
+    from benchmarks.bench_tokenization import build_corpus
+    from src.tokenization.corpus_tokenizer import tokenize_corpus
+
+    with tempfile.TemporaryDirectory() as directory:
+        corpus = os.path.join(directory, "corpus")
+        build_corpus(args.articles, scale, corpus)
+        started = time.perf_counter()
+        count = tokenize_corpus(
+            [corpus], os.path.join(directory, "tokens.jsonl"), workers=args.workers
+        )
+        elapsed = time.perf_counter() - started
+    return {"articles_per_second": count / elapsed, "peak_rss_mb": peak_rss_mb()}
+
+
+def cases(args):
+    """
+    Lists the cases selected by the options.
+
+    Args:
+        args (argparse.Namespace): The suite options.
+
+    Returns:
+        list: Case names, e.g. "crawl-bdpratidin-1x".
+    """
+    names = [f"crawl-{site}-{scale}x" for site in SITES for scale in args.crawl_scales]
+    names += [f"extract-{site}" for site in SITES]
+    names += [f"tokenize-{scale}x" for scale in args.scales]
+    if args.only:
+        names = [name for name in names if any(name.startswith(p) for p in args.only)]
+    return names
+
+
+def run_case(args, name):
+    """
+    Runs one case in this process.
+
+    Args:
+        args (argparse.Namespace): The suite options.
+        name (str): The case name.
+
+    Returns:
+        dict: The metrics of the case.
+    """
+    kind, *rest = name.split("-")
+    if kind == "crawl":
+        return case_crawl(args, rest[0], int(rest[1].rstrip("x")))
+    if kind == "extract":
+        return case_extract(args, rest[0])
+    return case_tokenize(args, int(rest[0].rstrip("x")))
+
+
+def run_isolated(name, argv):
+    """
+    Runs one case in a fresh interpreter.
+
+    Args:
+        name (str): The case name.
+        argv (list): The suite's command-line arguments.
+
+    Returns:
+        dict: The metrics of the case, or None if it failed.
+    """
+    with tempfile.NamedTemporaryFile("r", suffix=".json", encoding="utf-8") as output:
+        result = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_suite", *argv,
+             "--case", name, "--case-output", output.name],
+            stdout=subprocess.DEVNULL,
+            check=False,
+        )
+        if result.returncode != 0:
+            return None
+        return json.load(output)
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compares results with a baseline.
+
+    Args:
+        results (dict): Mapping of metric name to value.
+        baseline (dict): Mapping of metric name to the baseline value.
+        tolerance (float): The allowed relative change, e.g. 0.1 for 10%.
+
+    Returns:
+        list: (metric, value, baseline value, relative change) of each regression.
+    """
+    regressions = []
+    for metric, value in results.items():
+        reference = baseline.get(metric)
+        if not reference:
+            continue
+        change = (value - reference) / reference
+        higher_is_better = metric.endswith("_per_second")
+        if (-change if higher_is_better else change) > tolerance:
+            regressions.append((metric, value, reference, change))
+    return regressions
+
+
+def environment():
+    """
+    Describes the machine, stored with a baseline because results depend on it.
+
+    Returns:
+        dict: Python version, platform and CPU count.
+    """
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def main():
+    """
+    Runs the suite, prints every metric and exits non-zero on a regression.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 2)[1])
+    parser.add_argument("--articles", default=mock_server.ARTICLES_FILE, help="source articles")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="recorded pages")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 100],
+                        help="tokenization corpus sizes, in copies of the articles file")
+    parser.add_argument("--crawl-scales", type=int, nargs="+", default=[1],
+                        help="crawl sizes, in copies of the articles file")
+    parser.add_argument("--latency", type=float, default=0.005, help="server latency (s)")
+    parser.add_argument("--error-rate", type=float, default=0.01,
+                        help="fraction of requests answered with 503")
+    parser.add_argument("--articles-per-archive", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=16, help="fetch concurrency")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="tokenizer processes")
+    parser.add_argument("--repeat", type=int, default=5, help="extraction passes")
+    parser.add_argument("--only", nargs="+", help="run the cases starting with these names")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="stored baseline")
+    parser.add_argument("--tolerance", type=float, default=0.1,
+                        help="allowed relative regression")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="store the results as the new baseline")
+    parser.add_argument("--case", help=argparse.SUPPRESS)
+    parser.add_argument("--case-output", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        with open(args.case_output, "w", encoding="utf-8") as f:
+            json.dump(run_case(args, args.case), f)
+        return
+
+    argv = [arg for arg in sys.argv[1:] if arg != "--save-baseline"]
+    results, failed = {}, []
+    for name in cases(args):
+        metrics = run_isolated(name, argv)
+        if metrics is None:
+            print(f"{name:<28} FAILED")
+            failed.append(name)
+            continue
+        for metric, value in metrics.items():
+            results[f"{name}.{metric}"] = value
+            print(f"{name:<28} {metric:<20} {value:12.2f}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"environment": environment(), "metrics": results}, f, indent=2)
+        print("Baseline saved to", args.baseline)
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline["environment"] != environment():
+            print("WARNING: the baseline was recorded on", baseline["environment"])
+        regressions = compare(results, baseline["metrics"], args.tolerance)
+        for metric, value, reference, change in regressions:
+            print(f"REGRESSION {metric}: {value:.2f} against {reference:.2f} ({change:+.0%})")
+        if regressions:
+            sys.exit(1)
+        print(f"OK: no metric regressed by more than {args.tolerance:.0%}")
+    else:
+        print("No baseline at", args.baseline, "- run with --save-baseline to store one")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Corpus Tokenization Benchmark.
+
+Tokenizes a corpus built by repeating data/NewsArticle.json with an increasing
+number of worker processes, and reports articles per second and the speedup
+over a single worker.
+
+Run from the repository root:
+    python -m benchmarks.bench_tokenization --repeat 20 --workers 1 2 4 8
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from src.crawlers.article_store import JsonlShardWriter, iter_articles
+from src.tokenization.corpus_tokenizer import METHODS, tokenize_corpus
+
+
+def build_corpus(articles_file, repeat, directory):
+    """
+    Writes a synthetic corpus of repeated articles as JSONL shards.
+
+    Args:
+        articles_file (str): The JSON file the articles are taken from.
+        repeat (int): How many times each article appears.
+        directory (str): The shard directory.
+
+    Returns:
+        int: The number of articles written.
+    """
+    with JsonlShardWriter(directory, sync_every=10000) as sink:
+        for i in range(repeat):
+            for article in iter_articles(articles_file):
+                sink.write(dict(article, url=f"{article['url']}#{i}"))
+    return sink.records
+
+
+def main():
+    """
+    Runs the tokenization benchmark and prints a throughput table.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 2)[1])
+    parser.add_argument("--articles", default="data/NewsArticle.json", help="source articles")
+    parser.add_argument("--repeat", type=int, default=20, help="copies of each article")
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=sorted({1, 2, os.cpu_count() or 1}), help="pool sizes to try")
+    parser.add_argument("--chunk-size", type=int, default=64, help="articles per task")
+    parser.add_argument("--method", choices=METHODS, default="native", help="tokenizer")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        corpus = os.path.join(directory, "corpus")
+        count = build_corpus(args.articles, args.repeat, corpus)
+        print(f"{count} articles, {os.cpu_count()} CPUs")
+        baseline = None
+        for workers in args.workers:
+            started = time.perf_counter()
+            tokenize_corpus(
+                [corpus],
+                os.path.join(directory, "tokens.jsonl"),
+                method=args.method,
+                workers=workers,
+                chunk_size=args.chunk_size,
+            )
+            elapsed = time.perf_counter() - started
+            baseline = baseline or elapsed
+            print(
+                f"workers={workers:<3} {count / elapsed:9.1f} articles/s "
+                f"({elapsed:.2f}s, {baseline / elapsed:.2f}x)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Recorded HTML Fixtures Module.
+
+This module records archive and article pages of both news websites to disk and
+loads them back, so that extraction and crawl benchmarks run on fixed bytes.
+Each site has a sub-directory of benchmarks/fixtures holding its article pages
+as <id>.html and its archive pages as archive-<n>.html.
+
+Pages are fetched with the standard library only and article links are picked
+with the site specs, so fixtures can be recorded without the crawler's
+dependencies. Record from the live websites, or from the local mock server:
+    python -m benchmarks.fixtures --date 2024-03-31 --limit 20
+    python -m benchmarks.fixtures --mock --limit 20
+"""
+
+import argparse
+import glob
+import os
+import re
+import urllib.request
+from datetime import datetime
+
+from benchmarks.mock_server import MockNewsServer
+from src.crawlers.sites import BANGLANEWS24, BDPRATIDIN
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+SITES = {spec.name: spec for spec in (BDPRATIDIN, BANGLANEWS24)}
+
+_HREF = re.compile(rb"""href\s*=\s*["']([^"']*)["']""", re.IGNORECASE)
+_ARTICLE_ID = re.compile(r"(\d+)(?:\.details)?$")
+
+
+def load_fixtures(directory=FIXTURES_DIR):
+    """
+    Loads recorded pages from disk.
+
+    Args:
+        directory (str): The fixtures directory.
+
+    Returns:
+        dict: Mapping of site name to (article pages, archive pages), each a
+            list of (url, html) tuples in file name order.
+    """
+    fixtures = {}
+    for site in SITES:
+        articles, archives = [], []
+        for path in sorted(glob.glob(os.path.join(directory, site, "*.html"))):
+            with open(path, "rb") as f:
+                page = (f"file://{os.path.abspath(path)}", f.read())
+            name = os.path.basename(path)
+            (archives if name.startswith("archive-") else articles).append(page)
+        fixtures[site] = (articles, archives)
+    return fixtures
+
+
+def fetch(url, timeout=30):
+    """
+    Fetches a page with the standard library.
+
+    Args:
+        url (str): The URL to fetch.
+        timeout (float): The request timeout in seconds.
+
+    Returns:
+        bytes: The response body.
+    """
+    request = urllib.request.Request(url, headers={"User-Agent": "bd-article-crawler"})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return response.read()
+
+
+def record_site(spec, archive_urls, directory, limit=20):
+    """
+    Records archive pages and the first articles they link to.
+
+    Args:
+        spec (SiteSpec): The website.
+        archive_urls (list): The archive pages to record.
+        directory (str): The site's fixtures directory.
+        limit (int): Maximum number of article pages to record.
+
+    Returns:
+        tuple: (archive pages, article pages) recorded.
+    """
+    os.makedirs(directory, exist_ok=True)
+    article_urls = {}
+    for number, archive_url in enumerate(archive_urls):
+        html = fetch(archive_url)
+        with open(os.path.join(directory, f"archive-{number}.html"), "wb") as f:
+            f.write(html)
+        hrefs = [href.decode("utf-8", "replace") for href in _HREF.findall(html)]
+        for url in spec.article_links(hrefs, archive_url):
+            article_urls.setdefault(url, None)
+    recorded = 0
+    for url in list(article_urls)[:limit]:
+        match = _ARTICLE_ID.search(url)
+        name = match.group(1) if match else f"{recorded:04d}"
+        with open(os.path.join(directory, f"{name}.html"), "wb") as f:
+            f.write(fetch(url))
+        recorded += 1
+    return len(archive_urls), recorded
+
+
+def record_fixtures(directory, day, *, limit=20, base_urls=None, categories=("cricket",)):
+    """
+    Records fixtures of both websites for one archive date.
+
+    Args:
+        directory (str): The fixtures directory.
+        day (datetime): The archive date.
+        limit (int): Maximum number of article pages per site.
+        base_urls (dict): Optional mapping of site name to the base URL to use
+            instead of the live website, e.g. the mock server's.
+        categories (tuple): The BanglaNews24 categories whose archives are recorded.
+
+    Returns:
+        dict: Mapping of site name to (archive pages, article pages) recorded.
+    """
+    base_urls = base_urls or {}
+    bdp_base = base_urls.get("bdpratidin", BDPRATIDIN.base_url)
+    bn24_base = base_urls.get("banglanews24", BANGLANEWS24.base_url)
+    archives = {
+        "bdpratidin": list(BDPRATIDIN.archive_urls(bdp_base, day, day)),
+        "banglanews24": list(
+            BANGLANEWS24.archive_urls([bn24_base + slug for slug in categories], day, day)
+        ),
+    }
+    return {
+        site: record_site(SITES[site], urls, os.path.join(directory, site), limit)
+        for site, urls in archives.items()
+    }
+
+
+def main():
+    """
+    Records fixtures and prints how many pages were saved per site.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 2)[1])
+    parser.add_argument("-o", "--output", default=FIXTURES_DIR, help="fixtures directory")
+    parser.add_argument("--date", default="2024-03-31", help="archive date, YYYY-MM-DD")
+    parser.add_argument("--limit", type=int, default=20, help="article pages per site")
+    parser.add_argument("--categories", nargs="+", default=["cricket"],
+                        help="BanglaNews24 categories to record")
+    parser.add_argument("--mock", action="store_true",
+                        help="record from the local mock server instead of the live websites")
+    args = parser.parse_args()
+
+    day = datetime.strptime(args.date, "%Y-%m-%d")
+    if args.mock:
+        with MockNewsServer(articles_per_archive=args.limit) as server:
+            base_urls = {
+                "bdpratidin": f"{server.base_url}/first-page/",
+                "banglanews24": f"{server.base_url}/",
+            }
+            counts = record_fixtures(args.output, day, limit=args.limit,
+                                     base_urls=base_urls, categories=server.slugs[:1])
+    else:
+        counts = record_fixtures(args.output, day, limit=args.limit,
+                                 categories=args.categories)
+    for site, (archives, articles) in counts.items():
+        print(f"{site}: {archives} archive pages, {articles} article pages")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,365 @@
+"""
+Local Mock News Server Module.
+
+This module serves stand-in archive and article pages for BD Pratidin and
+BanglaNews24 from a local HTTP server, so that the crawlers and the fetch engine
+can be exercised and measured without touching the live websites.
+"""
+
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+ARTICLES_FILE = "data/NewsArticle.json"
+
+BDP_ARCHIVE_PATH = re.compile(r"^/first-page/(\d{4})/(\d{2})/(\d{2})/\d+$")
+BDP_ARTICLE_PATH = re.compile(r"^/([\w-]+)/(\d{4})/(\d{2})/(\d{2})/(\d+)$")
+BN24_ARTICLE_PATH = re.compile(r"^/([\w-]+)/news/bd/(\d+)\.details$")
+BN24_ARCHIVE_PATH = re.compile(r"^/([\w-]+)$")
+
+
+def load_articles(path=ARTICLES_FILE):
+    """
+    Loads the articles used to fill the mock pages.
+
+    Args:
+        path (str): The path to a JSON file produced by the crawlers.
+
+    Returns:
+        list: List of article dictionaries.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def render_bdp_archive(hrefs):
+    """
+    Renders a BD Pratidin archive page linking to the given articles.
+
+    Args:
+        hrefs (list): Relative article links as used by the live site.
+
+    Returns:
+        str: The HTML of the archive page.
+    """
+    links = "\n".join(
+        f'<div class="col-md-6"><a href="{href}"><img alt=""></a>'
+        f'<a href="{href}"><h3>News</h3></a></div>'
+        for href in hrefs
+    )
+    return (
+        "<html><body><nav><a href=\"/\">Home</a><a href=\"/country\">Country</a></nav>"
+        f'<div class="row">{links}</div></body></html>'
+    )
+
+
+def render_bdp_article(article):
+    """
+    Renders a BD Pratidin article page with the markup the crawler expects.
+
+    Args:
+        article (dict): The article to render.
+
+    Returns:
+        str: The HTML of the article page.
+    """
+    paragraphs = "".join(
+        f"<p>{escape(line)}</p>" for line in article["content"].split("\n")
+    )
+    return (
+        "<html><head><title>bd-pratidin</title></head><body>"
+        '<ol class="breadcrumb"><li><a href="/">Home</a></li>'
+        f'<li><a href="/country">{escape(article["category"])}</a></li>'
+        "<li>News</li></ol>"
+        f'<h1>{escape(article["title"])}</h1>'
+        f'<div class="row p-3"><span>{escape(article["date"])}</span></div>'
+        f'<div class="news-info ps-3 my-3"><h2>{escape(article["author"])}</h2></div>'
+        f"<div class=\"news-details\">{paragraphs}</div></body></html>"
+    )
+
+
+def render_bn24_home(base_url, slugs):
+    """
+    Renders a BanglaNews24 homepage with one dropdown entry per category.
+
+    Args:
+        base_url (str): The base URL of the mock server.
+        slugs (list): The category slugs.
+
+    Returns:
+        str: The HTML of the homepage.
+    """
+    items = "".join(
+        f'<li class="dropdown"><a href="{base_url}/{slug}">{slug}</a></li>'
+        for slug in slugs
+    )
+    return f'<html><body><ul class="nav">{items}</ul></body></html>'
+
+
+def render_bn24_archive(urls):
+    """
+    Renders a BanglaNews24 category archive page linking to the given articles.
+
+    Args:
+        urls (list): Absolute article URLs.
+
+    Returns:
+        str: The HTML of the archive page.
+    """
+    links = "".join(
+        f'<div class="list"><a href="{url}"><h2>News</h2></a><a href="{url}">More</a></div>'
+        for url in urls
+    )
+    return f"<html><body><a href=\"#\">Top</a>{links}</body></html>"
+
+
+def render_bn24_article(article):
+    """
+    Renders a BanglaNews24 article page with the markup the crawler expects.
+
+    Args:
+        article (dict): The article to render.
+
+    Returns:
+        str: The HTML of the article page.
+    """
+    sentences = "".join(
+        f"<p>{escape(sentence)}</p>" for sentence in article["content"].split("। ")
+    )
+    return (
+        "<html><body>"
+        f'<div class="section-page-title"><h1>{escape(article["category"])}</h1></div>'
+        f'<img class="lazy-load" alt="{escape(article["title"])}" src="/x.jpg">'
+        f'<span class="time">আপডেট: {escape(article["date"])}</span>'
+        f'<div class="row news-source"><span>{escape(article["author"])}| বাংলানিউজটোয়েন্টিফোর'
+        "</span></div>"
+        f"<article>{sentences}<p>বাংলাদেশ সময়: ১২০৩ ঘণ্টা</p></article></body></html>"
+    )
+
+
+class _Server(ThreadingHTTPServer):
+    """
+    Threaded HTTP server with a listen backlog large enough for benchmarks.
+    """
+
+    daemon_threads = True
+    request_queue_size = 128
+
+
+class MockNewsServer:  # pylint: disable=too-many-instance-attributes
+    """
+    A threaded local HTTP server that imitates both news websites.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        articles=None,
+        *,
+        latency=0.0,
+        articles_per_archive=20,
+        categories=4,
+        port=0,
+        fixtures=None,
+        error_rate=0.0,
+        seed=0,
+    ):
+        """
+        Initializes the MockNewsServer class.
+
+        Args:
+            articles (list): Articles used to fill the pages.
+            latency (float): Seconds each response is delayed by.
+            articles_per_archive (int): Number of articles linked from each archive page.
+            categories (int): Number of BanglaNews24 categories on the homepage.
+            port (int): The port to listen on, 0 picks a free port.
+            fixtures (dict): Recorded pages as returned by
+                benchmarks.fixtures.load_fixtures(). Article pages are served from
+                the recordings of their site instead of being rendered.
+            error_rate (float): Fraction of requests answered with 503 Service
+                Unavailable, drawn from a generator seeded with seed.
+            seed (int): Seed of the error injection, so runs fail the same requests.
+        """
+        self.articles = articles if articles is not None else load_articles()
+        self.latency = latency
+        self.articles_per_archive = articles_per_archive
+        self.slugs = [f"category-{i}" for i in range(categories)]
+        self.recorded = {
+            site: [html for _, html in pages]
+            for site, (pages, _) in (fixtures or {}).items()
+            if pages
+        }
+        self.error_rate = error_rate
+        self.requests_served = 0
+        self.errors_injected = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = _Server(("127.0.0.1", port), self._handler_class())
+        self._thread = None
+
+    @property
+    def base_url(self):
+        """
+        Returns the base URL the server is reachable at.
+
+        Returns:
+            str: The base URL without a trailing slash.
+        """
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def start(self):
+        """
+        Starts serving requests on a background thread.
+        """
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops the server and waits for the background thread to exit.
+        """
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def article_ids(self, key):
+        """
+        Returns the article IDs linked from the archive identified by key.
+
+        Args:
+            key (str): Any string identifying the archive page.
+
+        Returns:
+            list: Deterministic list of numeric article IDs.
+        """
+        # A hash keeps the IDs of different archives apart, so every archive of
+        # a long date range links to new articles.
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        offset = int(digest[:8], 16) * self.articles_per_archive
+        return [offset + i for i in range(self.articles_per_archive)]
+
+    def render(self, path, query):
+        """
+        Renders the page for a request path.
+
+        Args:
+            path (str): The request path.
+            query (dict): The parsed query string.
+
+        Returns:
+            str: The HTML of the page, bytes for a recorded page, or None if
+                the path is unknown.
+        """
+        if path == "/":
+            return render_bn24_home(self.base_url, self.slugs)
+        match = BDP_ARCHIVE_PATH.match(path)
+        if match:
+            date_path = "/".join(match.groups())
+            return render_bdp_archive(
+                [f"country/{date_path}/{i}" for i in self.article_ids(path)]
+            )
+        match = BN24_ARTICLE_PATH.match(path)
+        if match:
+            article_id = int(match.group(2))
+            return self._recorded("banglanews24", article_id) or render_bn24_article(
+                self._article(article_id)
+            )
+        match = BDP_ARTICLE_PATH.match(path)
+        if match:
+            article_id = int(match.group(5))
+            return self._recorded("bdpratidin", article_id) or render_bdp_article(
+                self._article(article_id)
+            )
+        match = BN24_ARCHIVE_PATH.match(path)
+        if match and match.group(1) in self.slugs:
+            key = path + query.get("date", [""])[0]
+            return render_bn24_archive(
+                [f"{self.base_url}{path}/news/bd/{i}.details" for i in self.article_ids(key)]
+            )
+        return None
+
+    def should_fail(self):
+        """
+        Decides whether the next request gets an injected error.
+
+        Returns:
+            bool: True for a fraction error_rate of the calls.
+        """
+        if not self.error_rate:
+            return False
+        with self._lock:
+            if self._random.random() >= self.error_rate:
+                return False
+            self.errors_injected += 1
+            return True
+
+    def _article(self, article_id):
+        return self.articles[article_id % len(self.articles)]
+
+    def _recorded(self, site, article_id):
+        pages = self.recorded.get(site)
+        return pages[article_id % len(pages)] if pages else None
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            """
+            Request handler bound to the enclosing MockNewsServer.
+            """
+
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_GET(self):  # pylint: disable=invalid-name
+                """
+                Serves a mock page, or 304 Not Modified when the ETag matches, or
+                an injected 503.
+                """
+                with server._lock:  # pylint: disable=protected-access
+                    server.requests_served += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                if server.should_fail():
+                    self.send_response(503)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                parts = urlsplit(self.path)
+                page = server.render(parts.path, parse_qs(parts.query))
+                if isinstance(page, str):
+                    page = page.encode("utf-8")
+                body = page or b"<html><body>Not Found</body></html>"
+                etag = f'"{hashlib.sha1(body).hexdigest()}"'
+                if page is not None and self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                self.send_response(200 if page is not None else 404)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+                """
+                Silences the per-request access log.
+                """
+
+        return Handler
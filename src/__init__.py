@@ -0,0 +1,3 @@
+"""
+BD news article crawler and tokenization toolkit.
+"""
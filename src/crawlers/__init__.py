@@ -0,0 +1,3 @@
+"""
+Crawlers for Bangladeshi news websites.
+"""
@@ -0,0 +1,137 @@
+"""
+Article Record Module.
+
+This module provides the compact record the crawlers extract every article
+into. Its attributes are slots instead of a per-article dictionary, the fields
+that repeat the same few dozen values across a corpus (category and author)
+are interned so every record shares one string object, and the Bengali
+publication date is parsed once, at extraction, into an epoch timestamp. Date
+filtering and partitioning then compare integers instead of parsing strings.
+
+Records are written as the same JSON objects as before, with the timestamp
+added as "published".
+"""
+
+import sys
+
+from src.crawlers.bn_dates import bengali_timestamp
+
+# The fields a site spec may extract, in output order.
+FIELDS = ("title", "date", "author", "content", "category")
+# Fields with few distinct values, shared between records.
+INTERNED_FIELDS = ("category", "author")
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+# One slot per output field; grouping them would cost the flat JSON layout.
+class ArticleRecord:  # pylint: disable=too-many-instance-attributes
+    """
+    One extracted article.
+
+    Attributes:
+        title (str): The headline.
+        date (str): The publication date as shown on the page.
+        author (str): The byline.
+        content (str): The article text.
+        category (str): The section the article is published under.
+        url (str): The article URL.
+        published (int): The publication time in seconds since the epoch, or
+            None if date is not a recognised date.
+        duplicate_of (str): The URL of the article this one nearly repeats.
+    """
+
+    __slots__ = FIELDS + ("url", "published", "duplicate_of")
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        url,
+        *,
+        title=None,
+        date=None,
+        author=None,
+        content=None,
+        category=None,
+        published=None,
+        duplicate_of=None,
+    ):
+        """
+        Initializes the ArticleRecord class.
+
+        Args:
+            url (str): The article URL.
+            title (str): The headline.
+            date (str): The publication date as shown on the page.
+            author (str): The byline, interned.
+            content (str): The article text.
+            category (str): The section, interned.
+            published (int): The publication timestamp. Defaults to the one
+                parsed from date.
+            duplicate_of (str): The URL of the article this one nearly repeats.
+
+        Raises:
+            TypeError: If a field is not one of FIELDS.
+        """
+        self.url = url
+        self.title = title
+        self.date = date
+        self.author = _intern(author)
+        self.content = content
+        self.category = _intern(category)
+        self.published = bengali_timestamp(date) if published is None else published
+        self.duplicate_of = duplicate_of
+
+    @classmethod
+    def from_dict(cls, article):
+        """
+        Builds a record from a stored article.
+
+        Args:
+            article (dict): The article as read by iter_articles().
+
+        Returns:
+            ArticleRecord: The record, with the timestamp parsed if the stored
+                article predates it.
+        """
+        return cls(
+            article.get("url"),
+            published=article.get("published"),
+            duplicate_of=article.get("duplicate_of"),
+            **{field: article.get(field) for field in FIELDS},
+        )
+
+    def to_dict(self):
+        """
+        Returns the article as the JSON object the sinks write.
+
+        Returns:
+            dict: The fields in output order, followed by url and published, and
+                duplicate_of when set.
+        """
+        article = {field: getattr(self, field) for field in FIELDS}
+        article["url"] = self.url
+        article["published"] = self.published
+        if self.duplicate_of is not None:
+            article["duplicate_of"] = self.duplicate_of
+        return article
+
+    def __eq__(self, other):
+        if not isinstance(other, ArticleRecord):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"ArticleRecord(url={self.url!r}, published={self.published!r})"
+
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        # Records extracted in parser processes arrive as new strings, so they
+        # are interned again on this side.
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, _intern(value) if name in INTERNED_FIELDS else value)
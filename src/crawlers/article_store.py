@@ -0,0 +1,271 @@
+"""
+Article Store Module.
+
+This module streams crawled articles to disk as they are extracted. Articles are
+appended as JSON lines to rotating shard files, optionally gzip or zstd
+compressed, and synced to disk periodically so that a crash loses at most the
+last few articles. A matching reader iterates shards, and the JSON files written
+by earlier versions of the crawlers, one article at a time.
+"""
+
+import glob
+import gzip
+import io
+import json
+import os
+import threading
+
+from src.crawlers.article_record import ArticleRecord
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+EXTENSIONS = {None: ".jsonl", "gzip": ".jsonl.gz", "zstd": ".jsonl.zst"}
+
+
+class JsonlShardWriter:  # pylint: disable=too-many-instance-attributes
+    """
+    Appends articles to rotating JSONL shards in a directory.
+
+    Every run starts a new shard, numbered after the shards already present, so
+    earlier output is never rewritten.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        directory,
+        *,
+        prefix="articles",
+        max_records=10000,
+        max_bytes=None,
+        compression=None,
+        sync_every=100,
+        on_flush=None,
+    ):
+        """
+        Initializes the JsonlShardWriter class.
+
+        Args:
+            directory (str): The shard directory, created if missing.
+            prefix (str): The shard file name prefix.
+            max_records (int): Start a new shard after this many articles.
+            max_bytes (int): Start a new shard once this many uncompressed bytes
+                were written to the current one.
+            compression (str): None, "gzip" or "zstd".
+            sync_every (int): Flush and fsync after this many articles.
+            on_flush (callable): Called with the URLs of the articles that each
+                flush made durable.
+
+        Raises:
+            ValueError: If the compression is unknown.
+            ImportError: If zstd compression is requested without zstandard.
+        """
+        if compression not in EXTENSIONS:
+            raise ValueError(f"Unknown compression: {compression}")
+        if compression == "zstd" and zstandard is None:
+            raise ImportError("zstd compression requires the zstandard package")
+        self.directory = directory
+        self.prefix = prefix
+        self.max_records = max_records
+        self.max_bytes = max_bytes
+        self.compression = compression
+        self.sync_every = sync_every
+        self.on_flush = on_flush
+        self.shards = []
+        self.records = 0
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._raw = self._stream = None
+        self._shard_records = self._shard_bytes = 0
+        self._unsynced = []
+        self._next_index = len(shard_paths(directory, prefix))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write(self, article):
+        """
+        Appends an article to the current shard.
+
+        Args:
+            article (ArticleRecord or dict): The extracted article.
+        """
+        if isinstance(article, ArticleRecord):
+            article = article.to_dict()
+        line = (json.dumps(article, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            if self._stream is None:
+                self._open_shard()
+            self._stream.write(line)
+            self.records += 1
+            self._shard_records += 1
+            self._shard_bytes += len(line)
+            self._unsynced.append(article.get("url"))
+            if self._shard_records >= self.max_records or (
+                self.max_bytes is not None and self._shard_bytes >= self.max_bytes
+            ):
+                self._close_shard()
+            elif len(self._unsynced) >= self.sync_every:
+                self._sync()
+
+    def flush(self):
+        """
+        Flushes the current shard and fsyncs it to disk.
+        """
+        with self._lock:
+            if self._stream is not None:
+                self._sync()
+
+    def close(self):
+        """
+        Flushes and closes the current shard.
+        """
+        with self._lock:
+            if self._stream is not None:
+                self._close_shard()
+
+    def _open_shard(self):
+        name = f"{self.prefix}-{self._next_index:05d}{EXTENSIONS[self.compression]}"
+        path = os.path.join(self.directory, name)
+        self._next_index += 1
+        self._raw = open(path, "xb")  # pylint: disable=consider-using-with
+        if self.compression == "gzip":
+            self._stream = gzip.GzipFile(fileobj=self._raw, mode="wb")
+        elif self.compression == "zstd":
+            self._stream = zstandard.ZstdCompressor().stream_writer(self._raw)
+        else:
+            self._stream = self._raw
+        self._shard_records = self._shard_bytes = 0
+        self.shards.append(path)
+
+    def _sync(self):
+        # Flushing the compressor ends the current block, so everything written
+        # so far can be decompressed even if the process dies afterwards.
+        self._stream.flush()
+        self._raw.flush()
+        os.fsync(self._raw.fileno())
+        urls, self._unsynced = [url for url in self._unsynced if url], []
+        if self.on_flush is not None and urls:
+            self.on_flush(urls)
+
+    def _close_shard(self):
+        self._sync()
+        if self._stream is not self._raw:
+            self._stream.close()
+        if not self._raw.closed:
+            self._raw.close()
+        self._raw = self._stream = None
+
+
+def shard_paths(directory, prefix="articles"):
+    """
+    Lists the shards in a directory in the order they were written.
+
+    Args:
+        directory (str): The shard directory.
+        prefix (str): The shard file name prefix.
+
+    Returns:
+        list: The shard file paths.
+    """
+    paths = glob.glob(os.path.join(glob.escape(directory), f"{prefix}-*.jsonl*"))
+    return sorted(path for path in paths if path.endswith(tuple(EXTENSIONS.values())))
+
+
+def iter_articles(path):
+    """
+    Iterates over stored articles without loading them all into memory.
+
+    Args:
+        path (str): A shard directory, a single .jsonl, .jsonl.gz or .jsonl.zst
+            shard, or a JSON file holding an article or a list of articles.
+
+    Yields:
+        dict: The articles in the order they were written.
+    """
+    if os.path.isdir(path):
+        for shard in shard_paths(path):
+            yield from _iter_shard(shard)
+    elif path.endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            yield from _iter_json(f)
+    else:
+        yield from _iter_shard(path)
+
+
+def _iter_shard(path):
+    """
+    Yields the articles of one shard, stopping at a line cut off by a crash.
+
+    Args:
+        path (str): The shard file.
+
+    Yields:
+        dict: The articles of the shard.
+    """
+    with _open_shard(path) as f:
+        try:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    print("Skipping truncated record at the end of shard:", path)
+                    return
+        except EOFError:
+            print("Skipping truncated end of compressed shard:", path)
+
+
+def _open_shard(path):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise ImportError("Reading zstd shards requires the zstandard package")
+        raw = open(path, "rb")  # pylint: disable=consider-using-with
+        reader = zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+        return io.TextIOWrapper(reader, encoding="utf-8")
+    return open(path, "r", encoding="utf-8")  # pylint: disable=consider-using-with
+
+
+def _iter_json(f, chunk_size=1 << 16):
+    """
+    Yields the articles of a JSON file, decoding a list one element at a time.
+
+    Args:
+        f (file): The open JSON file.
+        chunk_size (int): Number of characters read at a time.
+
+    Yields:
+        dict: The articles in the file.
+    """
+    decoder = json.JSONDecoder()
+    buffer, position, eof = "", 0, False
+    started = False
+    while True:
+        while position < len(buffer) and buffer[position] in " \t\r\n,":
+            position += 1
+        if not started and position < len(buffer):
+            if buffer[position] != "[":
+                # A single article object rather than a list.
+                yield json.loads(buffer[position:] + f.read())
+                return
+            started, position = True, position + 1
+            continue
+        if position < len(buffer) and buffer[position] == "]":
+            return
+        try:
+            article, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer, position = buffer[position:] + chunk, 0
+            continue
+        yield article
+        position = end
@@ -0,0 +1,90 @@
+"""
+Bengali Date Parsing Module.
+
+This module converts the publication dates shown by the news websites, written
+with Bengali digits and month names, into timezone-aware datetimes or epoch
+timestamps. It understands the BD Pratidin format ("২৭ এপ্রিল, ২০২৪ ২২:৫৬") and
+the BanglaNews24 format ("১৪৫৯ ঘণ্টা, মার্চ ৩১, ২০২৪").
+"""
+
+import re
+import unicodedata
+from datetime import datetime, timedelta, timezone
+
+BANGLADESH_TZ = timezone(timedelta(hours=6), "Asia/Dhaka")
+
+_DIGITS = str.maketrans("০১২৩৪৫৬৭৮৯", "0123456789")
+
+_MONTH_NAMES = {
+    1: ("জানুয়ারি", "জানুয়ারী"),
+    2: ("ফেব্রুয়ারি", "ফেব্রুয়ারী"),
+    3: ("মার্চ",),
+    4: ("এপ্রিল",),
+    5: ("মে",),
+    6: ("জুন",),
+    7: ("জুলাই",),
+    8: ("আগস্ট", "আগষ্ট"),
+    9: ("সেপ্টেম্বর",),
+    10: ("অক্টোবর",),
+    11: ("নভেম্বর",),
+    12: ("ডিসেম্বর",),
+}
+# Both spellings of য় (precomposed and with a nukta) normalize to the same form.
+MONTHS = {
+    unicodedata.normalize("NFC", name): month
+    for month, names in _MONTH_NAMES.items()
+    for name in names
+}
+
+# Month names are matched as runs of non-space, non-digit characters because \w
+# does not match Bengali vowel signs.
+_BDP_DATE = re.compile(r"(\d{1,2})\s+([^\s\d,]+),?\s+(\d{4})(?:\s+(\d{1,2}):(\d{2}))?")
+_BN24_DATE = re.compile(r"(\d{1,2})(\d{2})\s+ঘণ্টা,\s*([^\s\d,]+)\s+(\d{1,2}),?\s+(\d{4})")
+
+
+def parse_bengali_date(text):
+    """
+    Parses a publication date shown by BD Pratidin or BanglaNews24.
+
+    Args:
+        text (str): The date as extracted from the article page.
+
+    Returns:
+        datetime: The publication time in Bangladesh time, or None if the text
+            is not a recognised date.
+    """
+    if not text:
+        return None
+    text = unicodedata.normalize("NFC", text).translate(_DIGITS)
+    match = _BN24_DATE.search(text)
+    if match:
+        hour, minute, month_name, day, year = match.groups()
+    else:
+        match = _BDP_DATE.search(text)
+        if not match:
+            return None
+        day, month_name, year, hour, minute = match.groups()
+    month = MONTHS.get(month_name)
+    if month is None:
+        return None
+    try:
+        return datetime(
+            int(year), month, int(day), int(hour or 0), int(minute or 0),
+            tzinfo=BANGLADESH_TZ,
+        )
+    except ValueError:
+        return None
+
+
+def bengali_timestamp(text):
+    """
+    Parses a publication date shown by BD Pratidin or BanglaNews24 into a timestamp.
+
+    Args:
+        text (str): The date as extracted from the article page.
+
+    Returns:
+        int: Seconds since the epoch, or None if the text is not a recognised date.
+    """
+    published = parse_bengali_date(text)
+    return int(published.timestamp()) if published is not None else None
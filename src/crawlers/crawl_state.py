@@ -0,0 +1,225 @@
+"""
+Incremental Crawl State Module.
+
+This module remembers, per source, category and archive date, which article IDs
+a crawl has already stored and which archive pages are closed, in SQLite. A
+scheduled crawl over a date window then only fetches the archives of days that
+can still gain articles, and only the article links it has not stored yet, so
+its cost follows the number of new articles rather than the window size.
+"""
+
+import re
+import sqlite3
+import threading
+import time
+from datetime import date, timedelta
+
+_ARTICLE_ID = re.compile(r"(\d+)(?:\.\w+)?/?$")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS article_ids (
+    source TEXT NOT NULL,
+    category TEXT NOT NULL,
+    day TEXT NOT NULL,
+    article_id TEXT NOT NULL,
+    PRIMARY KEY (source, category, day, article_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS archives (
+    source TEXT NOT NULL,
+    category TEXT NOT NULL,
+    day TEXT NOT NULL,
+    closed INTEGER NOT NULL,
+    crawled_at REAL NOT NULL,
+    PRIMARY KEY (source, category, day)
+) WITHOUT ROWID;
+"""
+
+
+def article_id(url):
+    """
+    Extracts the numeric article ID from an article URL.
+
+    Args:
+        url (str): The article URL, e.g. ".../news/bd/1306708.details".
+
+    Returns:
+        str: The ID, e.g. "1306708", or the URL itself if it has no numeric ID.
+    """
+    match = _ARTICLE_ID.search(url.split("?", 1)[0])
+    return match.group(1) if match else url
+
+
+class IncrementalState:  # pylint: disable=too-many-instance-attributes
+    """
+    A SQLite-backed record of stored article IDs and closed archive pages.
+
+    An archive page is closed once it was crawled after its day ended plus a
+    grace period, since the websites stop adding articles to it by then, and
+    every new link found on it was stored.
+    """
+
+    def __init__(self, path, *, grace_days=1, stop_after=3):
+        """
+        Initializes the IncrementalState class.
+
+        Args:
+            path (str): The SQLite database file, created if missing.
+            grace_days (int): Number of days after which an archive is closed.
+            stop_after (int): Stop reading an archive page after this many
+                consecutive known article IDs, since pages list the newest
+                articles first. 0 reads every link.
+        """
+        self.path = path
+        self.grace_days = grace_days
+        self.stop_after = stop_after
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._ids = {}
+        for source, category, day, known_id in self._conn.execute(
+            "SELECT source, category, day, article_id FROM article_ids"
+        ):
+            self._ids.setdefault((source, category, day), set()).add(known_id)
+        self._closed = set(
+            self._conn.execute("SELECT source, category, day FROM archives WHERE closed = 1")
+        )
+        # The archives each selected URL was found in. An article listed under
+        # several categories is pending in each of them until it is stored.
+        self._pending = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """
+        Closes the database connection.
+        """
+        with self._lock:
+            self._conn.close()
+
+    def is_closed(self, source, category, day):
+        """
+        Checks whether an archive page can no longer gain articles.
+
+        Args:
+            source (str): The source name, e.g. "banglanews24".
+            category (str): The category, or "" for websites without categories.
+            day (date): The archive date.
+
+        Returns:
+            bool: True if the archive was crawled after it closed.
+        """
+        return (source, category, day.isoformat()) in self._closed
+
+    def new_links(self, source, category, day, urls, stop_after=None):
+        """
+        Selects the article links of an archive page that were never stored.
+
+        The selected links are remembered under this archive until mark_stored
+        records them, also when another archive selected them first.
+
+        Args:
+            source (str): The source name, e.g. "banglanews24".
+            category (str): The category, or "" for websites without categories.
+            day (date): The archive date.
+            urls (list): The article URLs in page order.
+            stop_after (int): Overrides the instance's stop_after, e.g. 0 for
+                URLs that are not ordered newest first.
+
+        Returns:
+            list: The unknown URLs, up to the first run of stop_after known ones.
+        """
+        if stop_after is None:
+            stop_after = self.stop_after
+        key = (source, category, day.isoformat())
+        known = self._ids.get(key, set())
+        selected = []
+        run = 0
+        for url in urls:
+            if article_id(url) in known:
+                run += 1
+                if stop_after and run >= stop_after:
+                    break
+                continue
+            run = 0
+            selected.append(url)
+        with self._lock:
+            for url in selected:
+                self._pending.setdefault(url, set()).add(key)
+        return selected
+
+    def mark_stored(self, urls):
+        """
+        Records the IDs of stored articles under every archive they were found in.
+
+        URLs that did not come from new_links are ignored.
+
+        Args:
+            urls (iterable): The URLs of the stored articles.
+        """
+        with self._lock:
+            rows = []
+            for url in urls:
+                known_id = article_id(url)
+                for key in self._pending.pop(url, ()):
+                    self._ids.setdefault(key, set()).add(known_id)
+                    rows.append(key + (known_id,))
+            if not rows:
+                return
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO article_ids (source, category, day, article_id)"
+                " VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.execute("COMMIT")
+
+    def mark_crawled(self, archives, today=None):
+        """
+        Records crawled archive pages, closing those whose day is over and
+        whose new links were all stored.
+
+        Args:
+            archives (iterable): (source, category, day) of each crawled archive.
+            today (date): The current date. Defaults to the local date.
+        """
+        cutoff = (today or date.today()) - timedelta(days=self.grace_days)
+        now = time.time()
+        with self._lock:
+            # An archive with links that were never stored stays open, so the
+            # next run retries them.
+            unfinished = set().union(*self._pending.values())
+            rows = []
+            for source, category, day in archives:
+                closed = day < cutoff and (source, category, day.isoformat()) not in unfinished
+                if closed:
+                    self._closed.add((source, category, day.isoformat()))
+                rows.append((source, category, day.isoformat(), int(closed), now))
+            if not rows:
+                return
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT INTO archives (source, category, day, closed, crawled_at)"
+                " VALUES (?, ?, ?, ?, ?)"
+                " ON CONFLICT(source, category, day) DO UPDATE SET"
+                " closed = max(closed, excluded.closed), crawled_at = excluded.crawled_at",
+                rows,
+            )
+            self._conn.execute("COMMIT")
+
+    def counts(self):
+        """
+        Returns the number of known article IDs and closed archives.
+
+        Returns:
+            dict: The "articles" and "closed_archives" counts.
+        """
+        return {
+            "articles": sum(len(ids) for ids in self._ids.values()),
+            "closed_archives": len(self._closed),
+        }
@@ -0,0 +1,356 @@
+"""
+Near-Duplicate Detection Module.
+
+This module finds articles whose content is nearly identical to an article that
+is already stored, such as wire stories published by both websites or the same
+story listed under several categories. Content is tokenized with the regex
+segmenter, reduced to a MinHash signature over word shingles, and looked up in a
+banded LSH index, so each check only compares against the few stored articles
+that share a band instead of the whole corpus. The index is kept in SQLite and
+grows incrementally across crawls.
+
+Run from the repository root to deduplicate existing crawler output:
+    python -m src.crawlers.dedup data/NewsArticle.json -o data/unique_articles
+"""
+
+import argparse
+import random
+import sqlite3
+import threading
+import time
+import zlib
+from array import array
+
+from src.crawlers.article_store import JsonlShardWriter, iter_articles
+from src.tokenization.bn_segmenter import iter_tokens
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# A prime just below 2**32: hash values and permutation coefficients stay below
+# it, so a * h + b fits in 64 bits and numpy can compute it without overflow.
+_PRIME = (1 << 32) - 5
+_TEXT_KINDS = ("word", "last", "number", "abbr")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS signatures (
+    url TEXT PRIMARY KEY,
+    original TEXT,
+    signature BLOB NOT NULL,
+    added_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS buckets (
+    band INTEGER NOT NULL,
+    bucket BLOB NOT NULL,
+    url TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS buckets_key ON buckets (band, bucket);
+"""
+
+
+def shingles(text, size=3):
+    """
+    Hashes the overlapping word n-grams of a text.
+
+    Punctuation is ignored, so differences in quoting or dandas do not change
+    the shingles.
+
+    Args:
+        text (str): The text.
+        size (int): Number of words per shingle.
+
+    Returns:
+        set: 32-bit CRC32 hashes of the shingles, empty if the text is shorter
+            than one shingle.
+    """
+    words = [text[start:end] for start, end, kind in iter_tokens(text) if kind in _TEXT_KINDS]
+    return {
+        zlib.crc32(" ".join(words[i:i + size]).encode("utf-8"))
+        for i in range(len(words) - size + 1)
+    }
+
+
+class NearDuplicateIndex:  # pylint: disable=too-many-instance-attributes
+    """
+    A persistent MinHash LSH index of article content.
+
+    Each signature is split into bands; two articles become candidates when any
+    band matches exactly, and a candidate is a duplicate when the fraction of
+    equal signature values, which estimates the Jaccard similarity of the
+    shingle sets, reaches the threshold. Texts shorter than one shingle, such
+    as the "Unknown" placeholder, are never duplicates. Duplicates are recorded
+    together with their original but not added to the buckets, so clusters do
+    not grow the lookups.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        path,
+        *,
+        num_perm=128,
+        bands=16,
+        threshold=0.8,
+        shingle_size=3,
+        seed=1,
+        drop=True,
+    ):
+        """
+        Initializes the NearDuplicateIndex class.
+
+        Args:
+            path (str): The SQLite database file, created if missing.
+            num_perm (int): Number of hash permutations in a signature.
+            bands (int): Number of LSH bands; must divide num_perm. More bands
+                find less similar candidates at the cost of more comparisons.
+            threshold (float): Minimum estimated Jaccard similarity of a duplicate.
+            shingle_size (int): Number of words per shingle.
+            seed (int): Seed of the permutation coefficients.
+            drop (bool): Whether crawlers drop duplicates. Otherwise they store
+                them with a duplicate_of field naming the original.
+
+        Raises:
+            ValueError: If bands does not divide num_perm, or if the database was
+                built with other signature settings.
+        """
+        if num_perm % bands:
+            raise ValueError(f"{bands} bands do not divide {num_perm} permutations")
+        self.path = path
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.drop = drop
+        rng = random.Random(seed)
+        self._a = [rng.randrange(1, _PRIME) for _ in range(num_perm)]
+        self._b = [rng.randrange(0, _PRIME) for _ in range(num_perm)]
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._check_settings(seed)
+        self._originals = {}
+        self._signatures = {}
+        for url, original, signature in self._conn.execute(
+            "SELECT url, original, signature FROM signatures"
+        ):
+            self._originals[url] = original
+            if original is None and signature:
+                self._signatures[url] = array("I", signature)
+        self._buckets = {}
+        for band, bucket, url in self._conn.execute("SELECT band, bucket, url FROM buckets"):
+            self._buckets.setdefault((band, bucket), []).append(url)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __contains__(self, url):
+        return url in self._originals
+
+    def __len__(self):
+        return len(self._originals)
+
+    def close(self):
+        """
+        Closes the database connection.
+        """
+        with self._lock:
+            self._conn.close()
+
+    def signature(self, text):
+        """
+        Computes the MinHash signature of a text.
+
+        Args:
+            text (str): The text.
+
+        Returns:
+            array: num_perm unsigned 32-bit minimum hash values, or None if the
+                text is shorter than one shingle.
+        """
+        hashes = shingles(text, self.shingle_size)
+        if not hashes:
+            return None
+        if numpy is not None:
+            values = numpy.fromiter(hashes, dtype=numpy.uint64, count=len(hashes))
+            a = numpy.array(self._a, dtype=numpy.uint64)[:, None]
+            b = numpy.array(self._b, dtype=numpy.uint64)[:, None]
+            minima = ((a * values + b) % _PRIME).min(axis=1)
+            return array("I", minima.astype(numpy.uint32).tobytes())
+        return array("I", [
+            min((a * h + b) % _PRIME for h in hashes) for a, b in zip(self._a, self._b)
+        ])
+
+    def query(self, text):
+        """
+        Finds the stored articles that are near-duplicates of a text.
+
+        Args:
+            text (str): The text.
+
+        Returns:
+            list: (url, similarity) of each original at or above the threshold,
+                most similar first.
+        """
+        signature = self.signature(text)
+        return self._matches(signature) if signature is not None else []
+
+    def add(self, url, text):
+        """
+        Checks a text against the index and records it.
+
+        An article that has no near-duplicate becomes an original and is added
+        to the buckets. A URL that is already indexed is not added again.
+
+        Args:
+            url (str): The article URL.
+            text (str): The article content.
+
+        Returns:
+            str: The URL of the original this article duplicates, or None.
+        """
+        if url in self._originals:
+            return self._originals[url]
+        signature = self.signature(text)
+        with self._lock:
+            if url in self._originals:
+                return self._originals[url]
+            matches = self._matches(signature) if signature is not None else []
+            original = matches[0][0] if matches else None
+            self._originals[url] = original
+            rows = []
+            if original is None and signature is not None:
+                self._signatures[url] = signature
+                for key in self._band_keys(signature):
+                    self._buckets.setdefault(key, []).append(url)
+                    rows.append((key[0], key[1], url))
+            self._conn.execute("BEGIN")
+            self._conn.execute(
+                "INSERT OR REPLACE INTO signatures (url, original, signature, added_at)"
+                " VALUES (?, ?, ?, ?)",
+                (url, original, signature.tobytes() if signature else b"", time.time()),
+            )
+            self._conn.executemany(
+                "INSERT INTO buckets (band, bucket, url) VALUES (?, ?, ?)", rows
+            )
+            self._conn.execute("COMMIT")
+        return original
+
+    def duplicates(self):
+        """
+        Returns the recorded near-duplicates grouped by their original.
+
+        Returns:
+            dict: Mapping of each original URL to the URLs of its duplicates.
+        """
+        clusters = {}
+        for url, original in self._originals.items():
+            if original is not None:
+                clusters.setdefault(original, []).append(url)
+        return clusters
+
+    def _band_keys(self, signature):
+        rows = self.rows
+        return [
+            (band, signature[band * rows:(band + 1) * rows].tobytes())
+            for band in range(self.bands)
+        ]
+
+    def _matches(self, signature):
+        candidates = {
+            url for key in self._band_keys(signature) for url in self._buckets.get(key, ())
+        }
+        matches = []
+        for url in candidates:
+            stored = self._signatures[url]
+            similarity = sum(x == y for x, y in zip(signature, stored)) / self.num_perm
+            if similarity >= self.threshold:
+                matches.append((url, similarity))
+        return sorted(matches, key=lambda match: (-match[1], match[0]))
+
+    def _check_settings(self, seed):
+        settings = {
+            "num_perm": str(self.num_perm),
+            "bands": str(self.bands),
+            "shingle_size": str(self.shingle_size),
+            "seed": str(seed),
+        }
+        stored = dict(self._conn.execute("SELECT key, value FROM meta"))
+        if not stored:
+            self._conn.executemany("INSERT INTO meta (key, value) VALUES (?, ?)",
+                                   settings.items())
+        elif stored != settings:
+            raise ValueError(f"{self.path} was built with other settings: {stored}")
+
+
+def deduplicate(paths, output_dir, index, *, field="content"):
+    """
+    Copies crawler output to new shards without its near-duplicates.
+
+    Articles that repeat a URL already copied in this run are dropped as well.
+
+    Args:
+        paths (iterable): Crawler outputs: JSON files, JSONL shards or shard directories.
+        output_dir (str): The shard directory for the unique articles.
+        index (NearDuplicateIndex): The index the articles are checked against.
+        field (str): The article field that is compared.
+
+    Returns:
+        tuple: (articles written, duplicates dropped).
+    """
+    dropped = 0
+    seen = set()
+    with JsonlShardWriter(output_dir, sync_every=1000) as sink:
+        for path in paths:
+            for article in iter_articles(path):
+                url = article.get("url")
+                original = index.add(url, article.get(field) or "")
+                if url in seen:
+                    # The same page saved twice, e.g. under two categories.
+                    dropped += 1
+                    continue
+                seen.add(url)
+                if original is None:
+                    sink.write(article)
+                elif not index.drop:
+                    sink.write(dict(article, duplicate_of=original))
+                else:
+                    dropped += 1
+    return sink.records, dropped
+
+
+def main():
+    """
+    Deduplicates crawler output from the command line.
+    """
+    parser = argparse.ArgumentParser(description="Drop near-duplicate articles.")
+    parser.add_argument("inputs", nargs="+", help="JSON files, JSONL shards or shard directories")
+    parser.add_argument("-o", "--output", default="./data/unique_articles",
+                        help="output shard directory")
+    parser.add_argument("--index", default="./data/near_duplicates.sqlite3",
+                        help="SQLite index file")
+    parser.add_argument("--threshold", type=float, default=0.8,
+                        help="minimum estimated Jaccard similarity")
+    parser.add_argument("--keep", action="store_true",
+                        help="keep duplicates with a duplicate_of field instead of dropping them")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    with NearDuplicateIndex(args.index, threshold=args.threshold, drop=not args.keep) as index:
+        written, dropped = deduplicate(args.inputs, args.output, index)
+    elapsed = time.perf_counter() - started
+    print(f"Wrote {written} articles and dropped {dropped} duplicates in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
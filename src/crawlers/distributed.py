@@ -0,0 +1,303 @@
+"""
+Distributed Crawl Module.
+
+This module splits a crawl over any number of worker processes and machines.
+The coordinator expands a date range into one task per source, category and
+archive date and puts them on a shared work queue. Each worker claims a batch
+of tasks, crawls their archives through the pipeline into its own output shards,
+and renews its leases from a background thread meanwhile. Tasks are completed
+once their articles are synced to disk. A task whose archive or any of its
+articles failed is released as failed and queued again, as are the tasks of a
+worker that dies once their leases expire, so a crawl runs at least once per
+archive.
+
+Run from the repository root:
+    python -m src.crawlers.distributed coordinate banglanews24 --queue data/crawl_queue.sqlite3 \\
+        --start 2020-01-01 --end 2024-03-31
+    python -m src.crawlers.distributed work banglanews24 --queue data/crawl_queue.sqlite3
+    python -m src.crawlers.distributed status --queue data/crawl_queue.sqlite3
+"""
+
+import argparse
+import os
+import socket
+import threading
+import time
+from datetime import datetime
+
+from src.crawlers import metrics
+from src.crawlers.article_store import JsonlShardWriter
+from src.crawlers.pipeline import CrawlPipeline
+from src.crawlers.site_crawler import SiteCrawler, add_crawl_arguments, default_engine
+from src.crawlers.sites import SITES
+from src.crawlers.work_queue import make_task, open_queue
+
+
+def archive_tasks(crawler, start, end, bases=None):
+    """
+    Expands a date range into the archive tasks of a crawler.
+
+    Args:
+        crawler (SiteCrawler): The crawler of the website.
+        start (datetime): The first archive date.
+        end (datetime): The last archive date.
+        bases (list): Base or category URLs. Defaults to the categories on the
+            homepage, or the spec's base URL for websites without categories.
+
+    Yields:
+        Task: One task per archive page the crawler would fetch.
+    """
+    if bases is None:
+        bases = crawler.fetch_all_categories() or []
+    for url in crawler.archive_urls(bases, start, end):
+        category, day = crawler.archive_key(url)
+        yield make_task(crawler.source, category, day, url)
+
+
+def coordinate(crawler, queue, start, end, bases=None):
+    """
+    Puts the archive tasks of a date range on the work queue.
+
+    Tasks already on the queue are kept as they are, so the coordinator can be
+    run again to extend a crawl.
+
+    Args:
+        crawler (SiteCrawler): The crawler of the website.
+        queue: The work queue.
+        start (datetime): The first archive date.
+        end (datetime): The last archive date.
+        bases (list): Base or category URLs, see archive_tasks().
+
+    Returns:
+        int: The number of tasks added.
+    """
+    return queue.put(archive_tasks(crawler, start, end, bases))
+
+
+def default_worker_id():
+    """
+    Returns a worker ID that is unique across machines.
+
+    Returns:
+        str: The host name and process ID, e.g. "node-3-41872".
+    """
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class CrawlWorker:
+    """
+    Claims archive tasks from a work queue and crawls them.
+
+    The crawler must have a sink, since tasks only count as done once their
+    articles are on disk.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        crawler,
+        queue,
+        worker_id=None,
+        *,
+        batch_size=16,
+        poll_interval=5.0,
+        pipeline_options=None,
+    ):
+        """
+        Initializes the CrawlWorker class.
+
+        Args:
+            crawler (SiteCrawler): The crawler, with a sink.
+            queue: The work queue.
+            worker_id (str): The ID leases are held under. Defaults to the host
+                name and process ID.
+            batch_size (int): Number of tasks claimed and crawled together.
+            poll_interval (float): Seconds to wait for other workers' leases to
+                complete or expire when the queue is empty.
+            pipeline_options (dict): Keyword arguments of CrawlPipeline.
+
+        Raises:
+            ValueError: If the crawler has no sink.
+        """
+        if crawler.sink is None:
+            raise ValueError("A crawl worker needs a crawler with a sink")
+        self.crawler = crawler
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.pipeline_options = dict(pipeline_options or {})
+        self.stats = {"completed": 0, "failed": 0, "lost": 0}
+        self._leases = _LeaseRenewer(queue, worker_id or default_worker_id())
+
+    @property
+    def queue(self):
+        """
+        The work queue.
+        """
+        return self._leases.queue
+
+    @property
+    def worker_id(self):
+        """
+        str: The ID leases are held under.
+        """
+        return self._leases.worker_id
+
+    def run(self, max_batches=None):
+        """
+        Crawls batches of tasks until no task is queued or leased.
+
+        Args:
+            max_batches (int): Stop after this many batches.
+
+        Returns:
+            dict: Counts of completed, failed and lost tasks.
+        """
+        with self._leases:
+            batches = 0
+            while max_batches is None or batches < max_batches:
+                tasks = self.queue.claim(self.worker_id, self.batch_size)
+                if not tasks:
+                    counts = self.queue.counts()
+                    if not counts["queued"] and not counts["leased"]:
+                        break
+                    time.sleep(self.poll_interval)
+                    continue
+                self.crawl(tasks)
+                batches += 1
+        print(f"Worker {self.worker_id} finished:", self.stats)
+        return self.stats
+
+    def crawl(self, tasks):
+        """
+        Crawls a batch of claimed tasks, then completes or fails each one.
+
+        Args:
+            tasks (list): Tasks claimed under this worker's ID.
+        """
+        frontier = self.crawler.frontier
+        self._leases.hold(task.task_id for task in tasks)
+        self.crawler.crawled_archives.clear()
+        try:
+            CrawlPipeline(self.crawler, **self.pipeline_options).run(
+                [task.url for task in tasks]
+            )
+            self.crawler.flush_articles()
+        finally:
+            self._leases.hold(())
+        crawled = set(self.crawler.crawled_archives)
+        for task in tasks:
+            if task.url in crawled or (frontier is not None and frontier.is_done(task.url)):
+                released = self.queue.complete(self.worker_id, task.task_id)
+                self.stats["completed" if released else "lost"] += 1
+            else:
+                released = self.queue.fail(
+                    self.worker_id, task.task_id, "archive or some of its articles not crawled"
+                )
+                self.stats["failed" if released else "lost"] += 1
+
+
+class _LeaseRenewer:
+    """
+    Renews the leases of the tasks a worker is crawling from a background thread.
+    """
+
+    def __init__(self, queue, worker_id):
+        self.queue = queue
+        self.worker_id = worker_id
+        self._held = set()
+        self._lock = threading.Lock()
+        self._stop = None
+        self._thread = None
+
+    def __enter__(self):
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(self._stop,), daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+    def hold(self, task_ids):
+        """
+        Replaces the set of task IDs whose leases are renewed.
+
+        Args:
+            task_ids (iterable): The IDs of the tasks being crawled.
+        """
+        with self._lock:
+            self._held = set(task_ids)
+
+    def _run(self, stop):
+        interval = self.queue.lease_seconds / 3
+        while not stop.wait(interval):
+            with self._lock:
+                held = set(self._held)
+            if not held:
+                continue
+            lost = held - set(self.queue.renew(self.worker_id, held))
+            if lost:
+                # Another worker may crawl these again; ours still get written.
+                print(f"Worker {self.worker_id} lost the lease of", sorted(lost))
+
+
+def _date(text):
+    return datetime.strptime(text, "%Y-%m-%d")
+
+
+def main():
+    """
+    Runs the coordinator, a worker, or prints the queue status.
+    """
+    parser = argparse.ArgumentParser(description="Crawl across several workers.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    coordinator = commands.add_parser("coordinate", help="queue the archive tasks of a date range")
+    coordinator.add_argument("site", choices=SITES)
+    coordinator.add_argument("--start", type=_date, required=True, help="first date, YYYY-MM-DD")
+    coordinator.add_argument("--end", type=_date, required=True, help="last date, YYYY-MM-DD")
+    worker = commands.add_parser("work", help="crawl tasks until the queue is empty")
+    worker.add_argument("site", choices=SITES)
+    worker.add_argument("--output", help="shard directory, data/<site>_articles by default")
+    worker.add_argument("--worker-id", help="defaults to the host name and process ID")
+    worker.add_argument("--batch-size", type=int, default=16, help="tasks per claim")
+    worker.add_argument("--parse-workers", type=int, help="parser processes")
+    add_crawl_arguments(worker)
+    metrics.add_arguments(worker)
+    status = commands.add_parser("status", help="print the number of tasks per status")
+    for command in (coordinator, worker, status):
+        command.add_argument("--queue", default="data/crawl_queue.sqlite3",
+                             help="SQLite file or redis:// URL")
+        command.add_argument("--lease", type=float, default=300.0, help="lease seconds")
+    args = parser.parse_args()
+
+    with open_queue(args.queue, lease_seconds=args.lease) as queue:
+        if args.command == "coordinate":
+            added = coordinate(SiteCrawler(spec=SITES[args.site]), queue, args.start, args.end)
+            print(f"Queued {added} archive tasks:", queue.counts())
+        elif args.command == "status":
+            print(queue.counts())
+        else:
+            worker_id = args.worker_id or default_worker_id()
+            output = args.output or f"./data/{args.site}_articles"
+            metrics.start_from_args(args)
+            try:
+                # Each worker writes its own shards, so workers never share a file.
+                with JsonlShardWriter(output, prefix=f"articles-{worker_id}") as sink:
+                    crawler = SiteCrawler(
+                        default_engine(args.cache_dir, args.replay),
+                        spec=SITES[args.site],
+                        sink=sink,
+                    )
+                    CrawlWorker(
+                        crawler,
+                        queue,
+                        worker_id,
+                        batch_size=args.batch_size,
+                        pipeline_options={"parse_workers": args.parse_workers},
+                    ).run()
+            finally:
+                metrics.finish_from_args(args)
+
+
+if __name__ == "__main__":
+    main()
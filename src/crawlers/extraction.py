@@ -0,0 +1,284 @@
+"""
+HTML Extraction Backends Module.
+
+This module provides interchangeable parsing backends behind the crawlers'
+field extractors. The BeautifulSoup backend builds a full tree with Python's
+html.parser and is always available; the lxml backend parses in C and runs
+precompiled XPath queries, and is used when lxml is installed.
+"""
+
+from bs4 import BeautifulSoup
+
+try:
+    from lxml import etree, html as lxml_html
+except ImportError:
+    etree = lxml_html = None
+
+# Text inside these elements is not document text; BeautifulSoup's get_text()
+# skips it as well.
+_NON_TEXT_TAGS = frozenset({"script", "style", "template"})
+
+
+class SoupBackend:
+    """
+    Extraction backend built on BeautifulSoup and html.parser.
+    """
+
+    name = "bs4"
+
+    def parse(self, html):
+        """
+        Parses a page.
+
+        Args:
+            html (bytes): The raw HTML of the page.
+
+        Returns:
+            BeautifulSoup: The parsed document.
+        """
+        return BeautifulSoup(html, "html.parser")
+
+    def find(self, node, tag, class_=None):
+        """
+        Finds the first descendant with the given tag and class.
+
+        Args:
+            node: The document or element to search.
+            tag (str): The tag name.
+            class_ (str): The class attribute, matched like BeautifulSoup's class_.
+
+        Returns:
+            The matching element, or None.
+        """
+        if class_ is None:
+            return node.find(tag)
+        return node.find(tag, class_=class_)
+
+    def find_all(self, node, tag, class_=None):
+        """
+        Finds all descendants with the given tag and class, in document order.
+
+        Args:
+            node: The document or element to search.
+            tag (str): The tag name.
+            class_ (str): The class attribute, matched like BeautifulSoup's class_.
+
+        Returns:
+            list: The matching elements.
+        """
+        if class_ is None:
+            return node.find_all(tag)
+        return node.find_all(tag, class_=class_)
+
+    def text(self, node, strip=False):
+        """
+        Returns the text of an element.
+
+        Args:
+            node: The element.
+            strip (bool): Strip every text fragment and drop empty ones.
+
+        Returns:
+            str: The text of the element and its descendants.
+        """
+        return node.get_text(strip=strip)
+
+    def attr(self, node, name):
+        """
+        Returns an attribute of an element.
+
+        Args:
+            node: The element.
+            name (str): The attribute name.
+
+        Returns:
+            str: The attribute value, or None if it is missing.
+        """
+        return node.get(name)
+
+    def links(self, node):
+        """
+        Returns the href of every link below a node, in document order.
+
+        Args:
+            node: The document or element to search.
+
+        Returns:
+            list: The href values.
+        """
+        return [link["href"] for link in node.find_all("a", href=True)]
+
+
+class LxmlBackend:
+    """
+    Extraction backend built on lxml with precompiled XPath queries.
+    """
+
+    name = "lxml"
+
+    def __init__(self):
+        """
+        Initializes the LxmlBackend class.
+
+        Raises:
+            ImportError: If lxml is not installed.
+        """
+        if etree is None:
+            raise ImportError("The lxml extraction backend requires the lxml package")
+        self._queries = {}
+        self._links = etree.XPath(".//a/@href")
+
+    def parse(self, html):
+        """
+        Parses a page.
+
+        Args:
+            html (bytes): The raw HTML of the page.
+
+        Returns:
+            lxml.html.HtmlElement: The root element of the parsed document, an
+                empty one for an empty or whitespace-only page, as html.parser
+                returns.
+        """
+        if isinstance(html, bytes):
+            try:
+                html = html.decode("utf-8")
+            except UnicodeDecodeError:
+                pass
+        try:
+            return lxml_html.document_fromstring(html)
+        except etree.ParserError:
+            # lxml refuses documents without any element ("Document is empty").
+            return lxml_html.document_fromstring("<html></html>")
+
+    def find(self, node, tag, class_=None):
+        """
+        Finds the first descendant with the given tag and class.
+
+        Args:
+            node: The document or element to search.
+            tag (str): The tag name.
+            class_ (str): The class attribute, matched like BeautifulSoup's class_.
+
+        Returns:
+            The matching element, or None.
+        """
+        matches = self._run(node, tag, class_, first=True)
+        return matches[0] if matches else None
+
+    def find_all(self, node, tag, class_=None):
+        """
+        Finds all descendants with the given tag and class, in document order.
+
+        Args:
+            node: The document or element to search.
+            tag (str): The tag name.
+            class_ (str): The class attribute, matched like BeautifulSoup's class_.
+
+        Returns:
+            list: The matching elements.
+        """
+        return self._run(node, tag, class_, first=False)
+
+    def text(self, node, strip=False):
+        """
+        Returns the text of an element.
+
+        Args:
+            node: The element.
+            strip (bool): Strip every text fragment and drop empty ones.
+
+        Returns:
+            str: The text of the element and its descendants.
+        """
+        if strip:
+            return "".join(part.strip() for part in _strings(node) if part.strip())
+        return "".join(_strings(node))
+
+    def attr(self, node, name):
+        """
+        Returns an attribute of an element.
+
+        Args:
+            node: The element.
+            name (str): The attribute name.
+
+        Returns:
+            str: The attribute value, or None if it is missing.
+        """
+        return node.get(name)
+
+    def links(self, node):
+        """
+        Returns the href of every link below a node, in document order.
+
+        Args:
+            node: The document or element to search.
+
+        Returns:
+            list: The href values.
+        """
+        return [str(href) for href in self._links(node)]
+
+    def _run(self, node, tag, class_, first):
+        if node is None:
+            # Match BeautifulSoup, where searching a missing element raises
+            # AttributeError that the crawlers already handle.
+            raise AttributeError(f"cannot search for <{tag}> in a missing element")
+        exact_class = None if class_ is None else " " in class_
+        key = (tag, exact_class, first)
+        if key not in self._queries:
+            if exact_class is None:
+                expression = f".//{tag}"
+            elif exact_class:
+                # A class_ value with spaces matches the whole attribute value.
+                expression = f".//{tag}[@class = $cls]"
+            else:
+                expression = (
+                    f".//{tag}[contains(concat(' ', normalize-space(@class), ' '),"
+                    " concat(' ', $cls, ' '))]"
+                )
+            if first:
+                expression = f"({expression})[1]"
+            self._queries[key] = etree.XPath(expression)
+        if class_ is None:
+            return self._queries[key](node)
+        return self._queries[key](node, cls=class_)
+
+
+def _strings(node):
+    """
+    Yields the text fragments of an element the way BeautifulSoup sees them.
+
+    Args:
+        node: The lxml element.
+
+    Yields:
+        str: Text fragments in document order, without comments or script text.
+    """
+    if node.text and node.tag not in _NON_TEXT_TAGS:
+        yield node.text
+    for child in node:
+        if isinstance(child.tag, str) and child.tag not in _NON_TEXT_TAGS:
+            yield from _strings(child)
+        if child.tail:
+            yield child.tail
+
+
+BACKENDS = {SoupBackend.name: SoupBackend, LxmlBackend.name: LxmlBackend}
+
+
+def get_backend(name=None):
+    """
+    Creates an extraction backend.
+
+    Args:
+        name (str): "bs4" or "lxml". Defaults to lxml when it is installed,
+            falling back to BeautifulSoup otherwise.
+
+    Returns:
+        The extraction backend.
+    """
+    if name is None:
+        name = LxmlBackend.name if etree is not None else SoupBackend.name
+    return BACKENDS[name]()
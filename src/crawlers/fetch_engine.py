@@ -0,0 +1,261 @@
+"""
+Asynchronous Fetch Engine Module.
+
+This module provides an asyncio based engine that fetches many URLs concurrently
+while honouring a global concurrency limit, per-host concurrency limits and
+per-host politeness delays. Per-host limits are fixed, or follow the adaptive
+rate controller of the fetcher.
+"""
+
+import asyncio
+import time
+import weakref
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from src.crawlers.http_fetcher import get_shared_fetcher
+from src.crawlers.metrics import get_metrics
+
+FetchResult = namedtuple("FetchResult", ["url", "content", "error"])
+
+
+class AsyncFetchEngine:  # pylint: disable=too-many-instance-attributes
+    """
+    Fetches batches of URLs concurrently on an asyncio event loop.
+
+    The blocking fetcher runs on a thread pool so that the crawlers can keep
+    using pooled requests sessions, while the event loop enforces the concurrency limits
+    and the politeness delay between two requests to the same host.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        *,
+        max_concurrency=16,
+        per_host_limit=4,
+        politeness_delay=0.0,
+        host_limits=None,
+        host_delays=None,
+        fetcher=None,
+        metrics=None,
+    ):
+        """
+        Initializes the AsyncFetchEngine class.
+
+        Args:
+            max_concurrency (int): Maximum number of requests in flight overall.
+            per_host_limit (int): Default maximum number of requests in flight per host.
+            politeness_delay (float): Default minimum delay in seconds between two
+                request starts on the same host.
+            host_limits (dict): Optional per-host overrides of per_host_limit. With
+                a rate controller they cap its limits instead.
+            host_delays (dict): Optional per-host overrides of politeness_delay.
+            fetcher (HttpFetcher): The blocking fetcher, defaults to the shared one.
+                If it has a rate controller, the per-host limits follow it and
+                per_host_limit is ignored.
+            metrics (CrawlMetrics): Records the time spent waiting for a slot and
+                fetching, pages fetched and fetch errors. Defaults to the shared registry.
+        """
+        self.max_concurrency = max_concurrency
+        self.per_host_limit = per_host_limit
+        self.politeness_delay = politeness_delay
+        self.host_limits = dict(host_limits or {})
+        self.host_delays = dict(host_delays or {})
+        self.fetcher = fetcher or get_shared_fetcher()
+        self.metrics = metrics or get_metrics()
+        self._in_flight = 0
+        self._executor = None
+        self._ready_at = {}
+        self._loop_slots = weakref.WeakKeyDictionary()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """
+        Shuts down the worker threads used for blocking fetches.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def host_limit(self, host):
+        """
+        Returns the concurrency limit that applies to a host now.
+
+        Args:
+            host (str): The network location of the URL.
+
+        Returns:
+            int: The maximum number of concurrent requests for the host.
+        """
+        controller = getattr(self.fetcher, "rate_controller", None)
+        if controller is None:
+            return self.host_limits.get(host, self.per_host_limit)
+        return min(controller.limit(host), self.host_limits.get(host, controller.max_limit))
+
+    def host_delay(self, host):
+        """
+        Returns the politeness delay that applies to a host.
+
+        Args:
+            host (str): The network location of the URL.
+
+        Returns:
+            float: The minimum delay in seconds between two request starts.
+        """
+        return self.host_delays.get(host, self.politeness_delay)
+
+    def fetch_all(self, urls):
+        """
+        Fetches all URLs concurrently and waits for them to finish.
+
+        Args:
+            urls (iterable): The URLs to fetch.
+
+        Returns:
+            list: FetchResult tuples in the same order as the input URLs.
+        """
+        urls = list(urls)
+        if not urls:
+            return []
+        return asyncio.run(self.gather(urls))
+
+    def get(self, url):
+        """
+        Fetches a single URL through the engine.
+
+        Args:
+            url (str): The URL to fetch.
+
+        Returns:
+            bytes: The raw response body.
+
+        Raises:
+            Exception: The error of the fetcher if the request failed, usually
+                a requests.RequestException.
+        """
+        result = self.fetch_all([url])[0]
+        if result.error is not None:
+            raise result.error
+        return result.content
+
+    async def gather(self, urls):
+        """
+        Fetches all URLs concurrently from a running event loop.
+
+        Args:
+            urls (iterable): The URLs to fetch.
+
+        Returns:
+            list: FetchResult tuples in the same order as the input URLs.
+        """
+        return await asyncio.gather(*(self.fetch(url) for url in urls))
+
+    async def fetch(self, url):
+        """
+        Fetches one URL from a running event loop.
+
+        Concurrent calls on the same event loop share the global and per-host
+        limits, so long-running callers can submit URLs one at a time.
+
+        Args:
+            url (str): The URL to fetch.
+
+        Returns:
+            FetchResult: The body of the page, or the error that occurred. Any
+                exception of the fetcher is returned, not raised, so one failed
+                URL never aborts a batch.
+        """
+        host = urlsplit(url).netloc
+        global_slots, host_slots = self._slots(asyncio.get_running_loop())
+        if host not in host_slots:
+            host_slots[host] = _HostSlots()
+        slots = host_slots[host]
+        queued = time.perf_counter()
+        # Take the host slot and wait out the politeness delay before taking
+        # a global slot, so a busy or slow host never pins global capacity.
+        await slots.acquire(lambda: self.host_limit(host))
+        try:
+            await self._wait_for_turn(host, slots.lock)
+            async with global_slots:
+                started = time.perf_counter()
+                self.metrics.observe("fetch_wait", started - queued)
+                self._in_flight += 1
+                self.metrics.gauge("fetches_in_flight", self._in_flight)
+                loop = asyncio.get_running_loop()
+                try:
+                    content = await loop.run_in_executor(
+                        self._get_executor(), self.fetcher.fetch, url
+                    )
+                except Exception as e:  # pylint: disable=broad-exception-caught
+                    # Anything raised by the fetcher, such as an OSError of the
+                    # response cache, fails this URL instead of the whole batch.
+                    self.metrics.error("fetch", e)
+                    return FetchResult(url, None, e)
+                finally:
+                    self._in_flight -= 1
+                    self.metrics.gauge("fetches_in_flight", self._in_flight)
+                    self.metrics.observe("fetch", time.perf_counter() - started)
+        finally:
+            await slots.release()
+        self.metrics.count("pages_fetched", host=host)
+        return FetchResult(url, content, None)
+
+    def _slots(self, loop):
+        # asyncio primitives are bound to one event loop, so each loop gets
+        # its own set while the politeness schedule is shared by all of them.
+        if loop not in self._loop_slots:
+            self._loop_slots[loop] = (asyncio.Semaphore(self.max_concurrency), {})
+        return self._loop_slots[loop]
+
+    async def _wait_for_turn(self, host, host_lock):
+        delay = self.host_delay(host)
+        if delay <= 0:
+            return
+        async with host_lock:
+            wait = self._ready_at.get(host, 0.0) - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._ready_at[host] = time.monotonic() + delay
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_concurrency, thread_name_prefix="fetch"
+            )
+        return self._executor
+
+
+class _HostSlots:
+    """
+    Counts the requests in flight to one host against a limit that may change.
+    """
+
+    def __init__(self):
+        self.condition = asyncio.Condition()
+        self.lock = asyncio.Lock()
+        self.in_flight = 0
+
+    async def acquire(self, limit):
+        """
+        Waits until fewer requests than limit() are in flight, then takes a slot.
+
+        Args:
+            limit (callable): Returns the current limit.
+        """
+        async with self.condition:
+            await self.condition.wait_for(lambda: self.in_flight < limit())
+            self.in_flight += 1
+
+    async def release(self):
+        """
+        Frees a slot and wakes the waiting requests, since the limit may have grown.
+        """
+        async with self.condition:
+            self.in_flight -= 1
+            self.condition.notify_all()
@@ -0,0 +1,225 @@
+"""
+URL Frontier Module.
+
+This module provides a persistent URL state store backed by SQLite. It remembers
+which archive and article URLs were seen, are pending, are done or have failed,
+so that a crawl can resume after a crash and skip pages that are already stored
+or already scheduled, before any network request is made.
+"""
+
+import sqlite3
+import threading
+import time
+
+SEEN = "seen"
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS urls (
+    url TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    updated_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS urls_status ON urls (kind, status);
+"""
+
+
+class UrlFrontier:
+    """
+    A SQLite-backed store of URL crawl states with an in-memory membership index.
+
+    A URL moves from seen (discovered) to pending (claimed for fetching) to done
+    (stored on disk) or failed. Claims are tracked per process, so a URL pending
+    from a crashed run is claimed again on the next run.
+    """
+
+    def __init__(self, path, max_attempts=3):
+        """
+        Initializes the UrlFrontier class.
+
+        Args:
+            path (str): The SQLite database file, created if missing.
+            max_attempts (int): Number of failed attempts after which a URL is skipped.
+        """
+        self.path = path
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._index = {
+            url: (status, attempts)
+            for url, status, attempts in self._conn.execute(
+                "SELECT url, status, attempts FROM urls"
+            )
+        }
+        self._claimed = set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __contains__(self, url):
+        return url in self._index
+
+    def __len__(self):
+        return len(self._index)
+
+    def close(self):
+        """
+        Closes the database connection.
+        """
+        with self._lock:
+            self._conn.close()
+
+    def status(self, url):
+        """
+        Returns the crawl state of a URL.
+
+        Args:
+            url (str): The URL.
+
+        Returns:
+            str: seen, pending, done or failed, or None for an unknown URL.
+        """
+        state = self._index.get(url)
+        return state[0] if state else None
+
+    def is_done(self, url):
+        """
+        Checks whether a URL has already been crawled and stored.
+
+        Args:
+            url (str): The URL.
+
+        Returns:
+            bool: True if the URL is done.
+        """
+        return self.status(url) == DONE
+
+    def add(self, urls, kind="article"):
+        """
+        Records newly discovered URLs as seen.
+
+        Args:
+            urls (iterable): The discovered URLs.
+            kind (str): The kind of page, e.g. "archive" or "article".
+
+        Returns:
+            list: The URLs that were not known before.
+        """
+        new_urls = [url for url in dict.fromkeys(urls) if url not in self._index]
+        self._write(new_urls, kind, SEEN)
+        return new_urls
+
+    def claim(self, urls, kind="article"):
+        """
+        Selects the URLs that still need fetching and marks them pending.
+
+        URLs that are done, already claimed by this process, or failed too many
+        times are skipped, as are duplicates within urls.
+
+        Args:
+            urls (iterable): The candidate URLs.
+            kind (str): The kind of page, e.g. "archive" or "article".
+
+        Returns:
+            list: The URLs the caller should fetch, in input order.
+        """
+        claimed = []
+        with self._lock:
+            for url in dict.fromkeys(urls):
+                status, attempts = self._index.get(url, (None, 0))
+                if url in self._claimed or status == DONE:
+                    continue
+                if status == FAILED and attempts >= self.max_attempts:
+                    continue
+                self._claimed.add(url)
+                claimed.append(url)
+        self._write(claimed, kind, PENDING)
+        return claimed
+
+    def mark_done(self, urls, kind="article"):
+        """
+        Marks URLs as crawled and stored.
+
+        Args:
+            urls (iterable): The URLs.
+            kind (str): The kind of page, e.g. "archive" or "article".
+        """
+        self._write(list(urls), kind, DONE)
+
+    def mark_failed(self, url, error, kind="article"):
+        """
+        Marks a URL as failed and counts the attempt.
+
+        Args:
+            url (str): The URL.
+            error (Exception): The error that occurred.
+            kind (str): The kind of page, e.g. "archive" or "article".
+        """
+        self._write([url], kind, FAILED, error=str(error))
+
+    def unfinished(self, kind="article"):
+        """
+        Returns the URLs that were discovered or claimed but never finished.
+
+        A failed URL counts as unfinished until it has failed max_attempts
+        times, so a resumed crawl retries it.
+
+        Args:
+            kind (str): The kind of page, e.g. "archive" or "article".
+
+        Returns:
+            list: The seen, pending and retryable failed URLs of that kind.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT url FROM urls WHERE kind = ?"
+                " AND (status IN (?, ?) OR (status = ? AND attempts < ?))",
+                (kind, SEEN, PENDING, FAILED, self.max_attempts),
+            ).fetchall()
+        return [url for (url,) in rows]
+
+    def counts(self):
+        """
+        Returns the number of URLs in each state.
+
+        Returns:
+            dict: Mapping of status to count.
+        """
+        counts = {}
+        for status, _ in self._index.values():
+            counts[status] = counts.get(status, 0) + 1
+        return counts
+
+    def _write(self, urls, kind, status, error=None):
+        if not urls:
+            return
+        now = time.time()
+        with self._lock:
+            rows = []
+            for url in urls:
+                attempts = self._index.get(url, (None, 0))[1]
+                if status == FAILED:
+                    attempts += 1
+                self._index[url] = (status, attempts)
+                rows.append((url, kind, status, attempts, error, now))
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT INTO urls (url, kind, status, attempts, error, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT(url) DO UPDATE SET status = excluded.status,"
+                " attempts = excluded.attempts, error = excluded.error,"
+                " updated_at = excluded.updated_at",
+                rows,
+            )
+            self._conn.execute("COMMIT")
@@ -0,0 +1,412 @@
+"""
+Pooled HTTP Fetcher Module.
+
+This module provides the HTTP layer shared by the crawlers: one keep-alive
+session with a connection pool, compressed transfers, retries with jittered
+exponential backoff for transient failures, and an optional response cache that
+revalidates pages with conditional requests or replays them offline.
+"""
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from src.crawlers.metrics import get_metrics
+
+try:
+    import brotli  # pylint: disable=unused-import
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class CacheMiss(requests.RequestException):
+    """
+    Raised in replay mode for a URL that is not in the response cache.
+    """
+
+
+def parse_retry_after(value):
+    """
+    Parses a Retry-After header into a delay in seconds.
+
+    Args:
+        value (str): The header value, either seconds or an HTTP date.
+
+    Returns:
+        float: The delay in seconds, or None if the value is not usable.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+def _counting_pool(base, on_new_connection, metrics=None):
+    """
+    Creates a connection pool class that reports every new connection.
+
+    Args:
+        base (type): The urllib3 connection pool class to extend.
+        on_new_connection (callable): Called with the host and port of each new connection.
+        metrics (CrawlMetrics): Optional registry in which the time spent
+            connecting (DNS lookup, TCP and TLS handshakes) is recorded.
+
+    Returns:
+        type: The connection pool subclass.
+    """
+
+    class CountingPool(base):  # pylint: disable=too-few-public-methods
+        """
+        Connection pool that reports the connections it opens.
+        """
+
+        def _new_conn(self):
+            on_new_connection(self.host, self.port)
+            conn = super()._new_conn()
+            if metrics is not None:
+                connect = conn.connect
+
+                def timed_connect():
+                    with metrics.timer("connect"):
+                        connect()
+
+                conn.connect = timed_connect
+            return conn
+
+    return CountingPool
+
+
+def _cached_response(url, entry, body):
+    """
+    Builds a response from a cache entry.
+
+    Args:
+        url (str): The requested URL.
+        entry (CacheEntry): The cache entry.
+        body (bytes): The cached body.
+
+    Returns:
+        requests.Response: A 200 response carrying the cached body and validators.
+    """
+    response = requests.Response()
+    response.url = url
+    response.status_code = 200
+    response.reason = "OK"
+    response._content = body  # pylint: disable=protected-access
+    for name, value in (
+        ("Content-Type", entry.content_type),
+        ("ETag", entry.etag),
+        ("Last-Modified", entry.last_modified),
+    ):
+        if value is not None:
+            response.headers[name] = value
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+    return response
+
+
+class CountingAdapter(HTTPAdapter):
+    """
+    Transport adapter that reports every new connection it opens.
+    """
+
+    def __init__(self, on_new_connection, metrics=None, **kwargs):
+        """
+        Initializes the CountingAdapter class.
+
+        Args:
+            on_new_connection (callable): Called with the host and port of each new connection.
+            metrics (CrawlMetrics): Optional registry recording connection setup times.
+            **kwargs: Keyword arguments passed to HTTPAdapter.
+        """
+        self.on_new_connection = on_new_connection
+        self.metrics = metrics
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        """
+        Initializes the pool manager with counting connection pools.
+        """
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _counting_pool(HTTPConnectionPool, self.on_new_connection, self.metrics),
+            "https": _counting_pool(HTTPSConnectionPool, self.on_new_connection, self.metrics),
+        }
+
+
+class HttpFetcher:  # pylint: disable=too-many-instance-attributes
+    """
+    A thread-safe fetcher that reuses pooled keep-alive connections.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        *,
+        pool_size=16,
+        max_retries=4,
+        backoff_factor=0.5,
+        max_backoff=60.0,
+        timeout=10,
+        user_agent="bd-article-crawler",
+        cache=None,
+        replay=False,
+        metrics=None,
+        rate_controller=None,
+    ):
+        """
+        Initializes the HttpFetcher class.
+
+        Args:
+            pool_size (int): Maximum number of kept-alive connections per host.
+            max_retries (int): Number of retries after the first attempt.
+            backoff_factor (float): Base delay in seconds of the exponential backoff.
+            max_backoff (float): Upper bound in seconds of a single backoff delay.
+            timeout (float): Default request timeout in seconds.
+            user_agent (str): The User-Agent header sent with every request.
+            cache (ResponseCache): Stores successful responses and revalidates
+                them with If-None-Match/If-Modified-Since on later requests.
+            replay (bool): Serve every request from the cache without touching
+                the network, raising CacheMiss for uncached URLs.
+            metrics (CrawlMetrics): Records connection, request and server wait
+                times, bytes downloaded and errors. Defaults to the shared registry.
+            rate_controller (AdaptiveRateController): Receives the latency and
+                status of every attempt. A fetch engine using this fetcher then
+                follows its per-host concurrency limits.
+
+        Raises:
+            ValueError: If replay is requested without a cache.
+        """
+        if replay and cache is None:
+            raise ValueError("Replay mode requires a response cache")
+        self.cache = cache
+        self.replay = replay
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.metrics = metrics or get_metrics()
+        self.rate_controller = rate_controller
+        self.session = requests.Session()
+        self.session.headers.update(
+            {"User-Agent": user_agent, "Accept-Encoding": ACCEPT_ENCODING}
+        )
+        adapter = CountingAdapter(
+            self._on_new_connection,
+            metrics=self.metrics,
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def close(self):
+        """
+        Closes all pooled connections.
+        """
+        self.session.close()
+
+    def fetch(self, url):
+        """
+        Fetches a URL and returns its body.
+
+        Args:
+            url (str): The URL to fetch.
+
+        Returns:
+            bytes: The decoded response body.
+
+        Raises:
+            requests.RequestException: If the request failed after all retries.
+        """
+        content = self.get(url).content
+        self.metrics.count("bytes_downloaded", len(content), host=urlsplit(url).netloc)
+        return content
+
+    def get(self, url, timeout=None, headers=None):
+        """
+        Sends a GET request, retrying transient failures.
+
+        Connection errors, timeouts and 429/5xx responses are retried with
+        jittered exponential backoff. A Retry-After header takes precedence
+        over the computed backoff. With a cache, a cached page is requested
+        conditionally and a 304 Not Modified answer is served from the cache.
+
+        Args:
+            url (str): The URL to fetch.
+            timeout (float): The request timeout in seconds.
+            headers (dict): Extra request headers.
+
+        Returns:
+            requests.Response: The final response.
+
+        Raises:
+            requests.RequestException: If the request failed after all retries.
+            CacheMiss: If the URL is not cached in replay mode.
+        """
+        if self.cache is None:
+            return self._send(url, timeout, headers)
+        host = urlsplit(url).netloc
+        entry = self.cache.lookup(url)
+        body = self.cache.read(entry) if entry is not None else None
+        if self.replay:
+            if body is None:
+                raise CacheMiss(f"Not in the response cache: {url}")
+            self._count(host, "cache_hits")
+            return _cached_response(url, entry, body)
+        headers = dict(headers or {})
+        if body is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+        response = self._send(url, timeout, headers)
+        if response.status_code == 304 and body is not None:
+            response.close()
+            self.cache.refresh(entry)
+            self._count(host, "not_modified")
+            return _cached_response(url, entry, body)
+        if response.status_code == 200:
+            self.cache.store(
+                url,
+                response.content,
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+                content_type=response.headers.get("Content-Type"),
+            )
+        return response
+
+    def _send(self, url, timeout, headers):
+        host = urlsplit(url).netloc
+        attempt = 0
+        while True:
+            try:
+                response = self._attempt(host, url, timeout or self.timeout, headers)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self._count(host, "errors")
+                self.metrics.error("http_request", e)
+                if attempt >= self.max_retries:
+                    raise
+                error, retry_after = e, None
+            else:
+                self._count(host, "requests")
+                # Time from sending the request until the response headers arrived.
+                self.metrics.observe("server_wait", response.elapsed.total_seconds())
+                if response.status_code not in RETRY_STATUSES:
+                    return response
+                if attempt >= self.max_retries:
+                    response.raise_for_status()
+                error = f"HTTP {response.status_code}"
+                self.metrics.error("http_request", error)
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                response.close()
+            attempt += 1
+            self._count(host, "retries")
+            delay = self.backoff_delay(attempt, retry_after)
+            print(f"Retrying {url} in {delay:.1f}s (attempt {attempt}):", error)
+            time.sleep(delay)
+
+    def _attempt(self, host, url, timeout, headers):
+        if self.rate_controller is None:
+            with self.metrics.timer("http_request"):
+                return self.session.get(url, timeout=timeout, headers=headers)
+        self.rate_controller.begin(host)
+        started = time.perf_counter()
+        status, timed_out = None, False
+        try:
+            with self.metrics.timer("http_request"):
+                response = self.session.get(url, timeout=timeout, headers=headers)
+            status = response.status_code
+            return response
+        except requests.Timeout:
+            timed_out = True
+            raise
+        finally:
+            # Every begin() needs its record(), whatever the request raised, or
+            # the host keeps a request in flight forever.
+            self.rate_controller.record(
+                host, time.perf_counter() - started, status=status, timed_out=timed_out
+            )
+
+    def backoff_delay(self, attempt, retry_after=None):
+        """
+        Computes the delay before a retry.
+
+        Args:
+            attempt (int): The retry number, starting at 1.
+            retry_after (float): The delay requested by the server, if any.
+
+        Returns:
+            float: The delay in seconds.
+        """
+        if retry_after is not None:
+            return min(retry_after, self.max_backoff)
+        ceiling = min(self.max_backoff, self.backoff_factor * 2 ** (attempt - 1))
+        return random.uniform(ceiling / 2, ceiling)
+
+    def stats(self):
+        """
+        Returns per-host request, connection reuse, retry and cache counters.
+
+        Returns:
+            dict: Mapping of host to a dictionary of counters.
+        """
+        with self._lock:
+            return {
+                host: dict(
+                    counters,
+                    reused=max(0, counters["requests"] - counters["connections"]),
+                )
+                for host, counters in self._stats.items()
+            }
+
+    def _on_new_connection(self, host, port):
+        self._count(host if port in (None, 80, 443) else f"{host}:{port}", "connections")
+
+    def _count(self, host, counter):
+        with self._lock:
+            counters = self._stats.setdefault(
+                host,
+                {
+                    "requests": 0,
+                    "connections": 0,
+                    "retries": 0,
+                    "errors": 0,
+                    "not_modified": 0,
+                    "cache_hits": 0,
+                },
+            )
+            counters[counter] += 1
+
+
+_SHARED_FETCHER = None
+_SHARED_LOCK = threading.Lock()
+
+
+def get_shared_fetcher():
+    """
+    Returns the process-wide fetcher shared by all crawlers.
+
+    Returns:
+        HttpFetcher: The shared fetcher, created on first use.
+    """
+    global _SHARED_FETCHER  # pylint: disable=global-statement
+    with _SHARED_LOCK:
+        if _SHARED_FETCHER is None:
+            _SHARED_FETCHER = HttpFetcher()
+        return _SHARED_FETCHER
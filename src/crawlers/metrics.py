@@ -0,0 +1,563 @@
+"""
+Crawl Metrics Module.
+
+This module records what a crawl spends its time on: latency histograms per
+stage (connecting, waiting for the server, HTML parsing, field extraction,
+serialization), bytes downloaded, pages per second, errors by type and queue
+depths. Metrics are exposed as Prometheus text over HTTP or written as periodic
+JSON snapshots, and profile mode keeps one cProfile per stage. Parser
+processes drain() what they recorded and the parent merge()s it, so their
+stages appear in the parent's metrics and profiles.
+"""
+
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Upper bounds in seconds of the latency histogram buckets.
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+PREFIX = "bdcrawler"
+
+
+class Histogram:
+    """
+    A cumulative latency histogram with fixed buckets.
+    """
+
+    def __init__(self, buckets=BUCKETS):
+        """
+        Initializes the Histogram class.
+
+        Args:
+            buckets (tuple): Increasing upper bounds in seconds.
+        """
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        """
+        Records one duration.
+
+        Args:
+            seconds (float): The duration.
+        """
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+    def merge(self, counts, total, count):
+        """
+        Adds the observations of another histogram with the same buckets.
+
+        Args:
+            counts (list): Its per-bucket counts.
+            total (float): Its sum of durations.
+            count (int): Its number of observations.
+        """
+        self.counts = [mine + theirs for mine, theirs in zip(self.counts, counts)]
+        self.total += total
+        self.count += count
+
+    def cumulative(self):
+        """
+        Returns the cumulative bucket counts, as Prometheus reports them.
+
+        Returns:
+            list: (upper bound, count) pairs, ending with ("+Inf", count).
+        """
+        running = 0
+        pairs = []
+        for bound, count in zip(self.buckets + ("+Inf",), self.counts):
+            running += count
+            pairs.append((bound, running))
+        return pairs
+
+    def quantile(self, q):
+        """
+        Estimates a quantile as the upper bound of the bucket holding it.
+
+        Args:
+            q (float): The quantile, between 0 and 1.
+
+        Returns:
+            float: The bucket bound in seconds, None if empty or above the last bucket.
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        for bound, running in self.cumulative():
+            if running >= rank:
+                return None if bound == "+Inf" else bound
+        return None
+
+
+# The attributes are three metric tables, the profiles and the two export
+# threads, which share one lock.
+class CrawlMetrics:  # pylint: disable=too-many-instance-attributes
+    """
+    A thread-safe registry of stage histograms, counters and gauges.
+    """
+
+    def __init__(self, profile=False):
+        """
+        Initializes the CrawlMetrics class.
+
+        Args:
+            profile (bool): Run a cProfile profiler for each timed stage, and
+                keep one profile per stage. A nested stage pauses the profiler
+                of the stage around it, so each profile holds its own stage.
+        """
+        self.profile = profile
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+        self._gauges = {}
+        self._profiles = {}
+        self._local = threading.local()
+        self._server = None
+        self._snapshot_stop = None
+
+    @contextmanager
+    def timer(self, stage):
+        """
+        Times a block and records it in the stage histogram.
+
+        Args:
+            stage (str): The stage name, e.g. "html_parse".
+
+        Yields:
+            None
+        """
+        profiler = self._start_profile() if self.profile else None
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started)
+            if profiler is not None:
+                self._stop_profile(stage, profiler)
+
+    def drain(self):
+        """
+        Returns and clears the histograms, counters and profiles recorded so far.
+
+        Gauges are left out, as they describe the process that sets them.
+
+        Returns:
+            dict: Plain, picklable data for merge().
+        """
+        with self._lock:
+            drained = {
+                "histograms": {
+                    stage: (histogram.counts, histogram.total, histogram.count)
+                    for stage, histogram in self._histograms.items()
+                },
+                "counters": self._counters,
+                "profiles": {stage: stats.stats for stage, stats in self._profiles.items()},
+            }
+            self._histograms = {}
+            self._counters = {}
+            self._profiles = {}
+        return drained
+
+    def merge(self, drained):
+        """
+        Adds metrics drained from another registry, e.g. in a parser process.
+
+        Args:
+            drained (dict): The result of drain().
+        """
+        with self._lock:
+            for stage, observations in drained["histograms"].items():
+                histogram = self._histograms.get(stage)
+                if histogram is None:
+                    histogram = self._histograms[stage] = Histogram()
+                histogram.merge(*observations)
+            for key, value in drained["counters"].items():
+                self._counters[key] = self._counters.get(key, 0) + value
+            for stage, raw in drained["profiles"].items():
+                self._add_profile(stage, _RawProfile(raw))
+
+    def observe(self, stage, seconds):
+        """
+        Records a duration in the stage histogram.
+
+        Args:
+            stage (str): The stage name.
+            seconds (float): The duration.
+        """
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = Histogram()
+            histogram.observe(seconds)
+
+    def count(self, name, value=1, **labels):
+        """
+        Adds to a counter.
+
+        Args:
+            name (str): The counter name, e.g. "bytes_downloaded".
+            value (float): The amount to add.
+            **labels: Label values, e.g. stage="fetch", type="Timeout".
+        """
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def error(self, stage, error):
+        """
+        Counts an error by stage and type.
+
+        Args:
+            stage (str): The stage the error occurred in.
+            error: The exception, or a short description such as "HTTP 503".
+        """
+        kind = error if isinstance(error, str) else type(error).__name__
+        self.count("errors", stage=stage, type=kind)
+
+    def gauge(self, name, value, **labels):
+        """
+        Sets a gauge to its current value.
+
+        Args:
+            name (str): The gauge name, e.g. "queue_depth".
+            value (float): The current value.
+            **labels: Label values, e.g. queue="page".
+        """
+        with self._lock:
+            self._gauges[(name, tuple(sorted(labels.items())))] = value
+
+    def snapshot(self):
+        """
+        Returns every metric as plain data.
+
+        Returns:
+            dict: Uptime, pages per second, the stage histograms with count,
+                sum, mean and p50/p95/p99 estimates, counters and gauges.
+        """
+        with self._lock:
+            uptime = time.time() - self.started
+            pages = sum(
+                value for (name, _), value in self._counters.items() if name == "pages_fetched"
+            )
+            return {
+                "timestamp": time.time(),
+                "uptime": uptime,
+                "pages_per_second": pages / uptime if uptime > 0 else 0.0,
+                "stages": {
+                    stage: {
+                        "count": histogram.count,
+                        "sum": histogram.total,
+                        "mean": histogram.total / histogram.count,
+                        "p50": histogram.quantile(0.5),
+                        "p95": histogram.quantile(0.95),
+                        "p99": histogram.quantile(0.99),
+                    }
+                    for stage, histogram in sorted(self._histograms.items())
+                },
+                "counters": [
+                    {"name": name, "labels": dict(labels), "value": value}
+                    for (name, labels), value in sorted(self._counters.items())
+                ],
+                "gauges": [
+                    {"name": name, "labels": dict(labels), "value": value}
+                    for (name, labels), value in sorted(self._gauges.items())
+                ],
+            }
+
+    def to_prometheus(self):
+        """
+        Renders every metric in the Prometheus text exposition format.
+
+        Returns:
+            str: The metrics page.
+        """
+        lines = []
+        with self._lock:
+            if self._histograms:
+                lines.append(f"# TYPE {PREFIX}_stage_seconds histogram")
+            for stage, histogram in sorted(self._histograms.items()):
+                for bound, running in histogram.cumulative():
+                    labels = _labels((("stage", stage), ("le", bound)))
+                    lines.append(f"{PREFIX}_stage_seconds_bucket{labels} {running}")
+                labels = _labels((("stage", stage),))
+                lines.append(f"{PREFIX}_stage_seconds_sum{labels} {histogram.total}")
+                lines.append(f"{PREFIX}_stage_seconds_count{labels} {histogram.count}")
+            for kind, metrics, suffix in (
+                ("counter", self._counters, "_total"),
+                ("gauge", self._gauges, ""),
+            ):
+                typed = set()
+                for (name, labels), value in sorted(metrics.items()):
+                    if name not in typed:
+                        lines.append(f"# TYPE {PREFIX}_{name}{suffix} {kind}")
+                        typed.add(name)
+                    lines.append(f"{PREFIX}_{name}{suffix}{_labels(labels)} {value}")
+        lines.append(f"{PREFIX}_uptime_seconds {time.time() - self.started}")
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port, host="127.0.0.1"):
+        """
+        Serves the Prometheus text at /metrics from a background thread.
+
+        Args:
+            port (int): The TCP port, 0 picks a free one.
+            host (str): The interface to listen on.
+
+        Returns:
+            int: The port the server listens on.
+        """
+        metrics = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            """
+            Answers GET /metrics with the Prometheus text.
+            """
+
+            def do_GET(self):  # pylint: disable=invalid-name
+                """
+                Handles a GET request.
+                """
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.to_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):  # pylint: disable=arguments-differ
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self._server.server_address[1]
+
+    def start_snapshots(self, path, interval=10.0):
+        """
+        Writes a JSON snapshot to a file periodically from a background thread.
+
+        Each snapshot replaces the previous one atomically.
+
+        Args:
+            path (str): The JSON file.
+            interval (float): Seconds between two snapshots.
+        """
+        self._snapshot_stop = threading.Event()
+
+        def run(stop):
+            while not stop.wait(interval):
+                self.write_snapshot(path)
+
+        threading.Thread(target=run, args=(self._snapshot_stop,), daemon=True).start()
+
+    def write_snapshot(self, path):
+        """
+        Writes the current snapshot to a JSON file.
+
+        Args:
+            path (str): The JSON file.
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        temporary = f"{path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=2)
+        os.replace(temporary, path)
+
+    def dump_profiles(self, directory, limit=30):
+        """
+        Writes one cProfile file and one text summary per profiled stage.
+
+        Args:
+            directory (str): The output directory, created if missing.
+            limit (int): Number of functions listed in each text summary.
+
+        Returns:
+            list: The stages that were written.
+        """
+        os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            profiles = dict(self._profiles)
+        for stage, stats in profiles.items():
+            stats.dump_stats(os.path.join(directory, f"{stage}.prof"))
+            text = io.StringIO()
+            stats.stream = text
+            stats.sort_stats("cumulative").print_stats(limit)
+            with open(os.path.join(directory, f"{stage}.txt"), "w", encoding="utf-8") as f:
+                f.write(text.getvalue())
+        return sorted(profiles)
+
+    def close(self):
+        """
+        Stops the metrics server and the snapshot thread.
+        """
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self._snapshot_stop is not None:
+            self._snapshot_stop.set()
+            self._snapshot_stop = None
+
+    def _start_profile(self):
+        # cProfile allows one active profiler per thread, so a nested stage
+        # pauses the profiler of the stage around it until it ends.
+        stack = self._local.__dict__.setdefault("profilers", [])
+        if stack:
+            stack[-1].disable()
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            if stack:
+                stack[-1].enable()
+            return None
+        stack.append(profiler)
+        return profiler
+
+    def _stop_profile(self, stage, profiler):
+        profiler.disable()
+        stack = self._local.profilers
+        stack.pop()
+        if stack:
+            stack[-1].enable()
+        with self._lock:
+            self._add_profile(stage, profiler)
+
+    def _add_profile(self, stage, profile):
+        if stage in self._profiles:
+            self._profiles[stage].add(profile)
+        else:
+            self._profiles[stage] = pstats.Stats(profile)
+
+
+class _RawProfile:  # pylint: disable=too-few-public-methods
+    # The stats of a profile drained in another process, in the form
+    # pstats.Stats loads from a profiler.
+    def __init__(self, stats):
+        self.stats = stats
+
+    def create_stats(self):
+        """
+        Keeps the stats as they are; pstats.Stats calls this before reading them.
+        """
+
+
+def _labels(pairs):
+    if not pairs:
+        return ""
+    body = ",".join(f'{name}="{_escape(value)}"' for name, value in pairs)
+    return "{" + body + "}"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def timed(stage):
+    """
+    Decorates a method so that each call is timed in a stage histogram.
+
+    The instance must have a metrics attribute holding a CrawlMetrics.
+
+    Args:
+        stage (str): The stage name.
+
+    Returns:
+        callable: The decorator.
+    """
+
+    def decorate(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.metrics.timer(stage):
+                return method(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+_SHARED_METRICS = None
+_SHARED_LOCK = threading.Lock()
+
+
+def get_metrics():
+    """
+    Returns the process-wide metrics registry shared by all components.
+
+    Returns:
+        CrawlMetrics: The shared registry, created on first use.
+    """
+    global _SHARED_METRICS  # pylint: disable=global-statement
+    with _SHARED_LOCK:
+        if _SHARED_METRICS is None:
+            _SHARED_METRICS = CrawlMetrics()
+        return _SHARED_METRICS
+
+
+def add_arguments(parser):
+    """
+    Adds the metrics options to a command-line parser.
+
+    Args:
+        parser (argparse.ArgumentParser): The parser.
+    """
+    parser.add_argument("--metrics-port", type=int,
+                        help="serve Prometheus metrics at http://127.0.0.1:PORT/metrics")
+    parser.add_argument("--metrics-json", help="write a JSON metrics snapshot to this file")
+    parser.add_argument("--metrics-interval", type=float, default=10.0,
+                        help="seconds between two JSON snapshots")
+    parser.add_argument("--profile", metavar="DIR",
+                        help="profile each stage with cProfile and write the results to DIR")
+
+
+def start_from_args(args):
+    """
+    Configures the shared metrics registry from parsed command-line options.
+
+    Args:
+        args (argparse.Namespace): Options added by add_arguments().
+
+    Returns:
+        CrawlMetrics: The shared registry.
+    """
+    metrics = get_metrics()
+    metrics.profile = bool(args.profile)
+    if args.metrics_port is not None:
+        port = metrics.serve(args.metrics_port)
+        print(f"Serving metrics at http://127.0.0.1:{port}/metrics")
+    if args.metrics_json:
+        metrics.start_snapshots(args.metrics_json, args.metrics_interval)
+    return metrics
+
+
+def finish_from_args(args):
+    """
+    Writes the final snapshot and profiles and stops the metrics threads.
+
+    Args:
+        args (argparse.Namespace): Options added by add_arguments().
+    """
+    metrics = get_metrics()
+    if args.metrics_json:
+        metrics.write_snapshot(args.metrics_json)
+    if args.profile:
+        stages = metrics.dump_profiles(args.profile)
+        print("Wrote profiles of", ", ".join(stages), "to", args.profile)
+    metrics.close()
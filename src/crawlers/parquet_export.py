@@ -0,0 +1,246 @@
+"""
+Columnar Export Module.
+
+This module converts crawler output into a Parquet dataset partitioned by source
+website and publication date, so that downstream jobs read only the columns and
+partitions they need. Articles are streamed in batches, so corpora larger than
+memory can be converted.
+
+Run from the repository root:
+    python -m src.crawlers.parquet_export data/NewsArticle.json -o data/articles_parquet
+"""
+
+import argparse
+import os
+import uuid
+from datetime import datetime
+from urllib.parse import urlsplit
+
+from src.crawlers.article_store import iter_articles
+from src.crawlers.bn_dates import BANGLADESH_TZ, parse_bengali_date
+from src.crawlers.sites import SITES
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = ds = pq = None
+
+FIELDS = ("title", "date", "author", "content", "category", "url")
+
+# Source name of each crawled host, e.g. "www.bd-pratidin.com": "bdpratidin".
+SOURCES = {spec.host: spec.name for spec in SITES.values()}
+
+# Number of characters of the ISO date kept for each partition granularity.
+GRANULARITIES = {"year": 4, "month": 7, "day": 10}
+
+UNKNOWN_PARTITION = "unknown"
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("The columnar export requires the pyarrow package")
+
+
+def article_schema(granularity="month"):
+    """
+    Returns the Arrow schema of the exported articles.
+
+    Args:
+        granularity (str): The date partition granularity, "year", "month" or "day".
+
+    Returns:
+        pyarrow.Schema: The crawler fields, the parsed publication time, and the
+            source and date partition columns.
+    """
+    _require_pyarrow()
+    return pa.schema(
+        [(field, pa.string()) for field in FIELDS]
+        + [
+            ("published", pa.timestamp("ms", tz="+06:00")),
+            ("source", pa.string()),
+            (granularity, pa.string()),
+        ]
+    )
+
+
+def source_of(url):
+    """
+    Returns the short name of the website an article URL belongs to.
+
+    Args:
+        url (str): The article URL.
+
+    Returns:
+        str: The source name, e.g. "bdpratidin", or the host for other websites.
+    """
+    host = urlsplit(url or "").netloc
+    return SOURCES.get(host, host.removeprefix("www.") or UNKNOWN_PARTITION)
+
+
+def _batches(articles, granularity, batch_size, seen=None):
+    """
+    Groups articles into record batches with the derived columns filled in.
+
+    Args:
+        articles (iterable): The article dictionaries.
+        granularity (str): The date partition granularity.
+        batch_size (int): Number of articles per batch.
+        seen (set): URLs to skip, to which every written URL is added. None
+            keeps every article.
+
+    Yields:
+        pyarrow.RecordBatch: The articles of each batch.
+    """
+    schema = article_schema(granularity)
+    width = GRANULARITIES[granularity]
+    columns = {name: [] for name in schema.names}
+    for article in articles:
+        url = article.get("url")
+        if seen is not None:
+            if url in seen:
+                continue
+            seen.add(url)
+        for field in FIELDS:
+            columns[field].append(article.get(field))
+        # Articles crawled as records carry the parsed timestamp.
+        timestamp = article.get("published")
+        if timestamp is not None:
+            published = datetime.fromtimestamp(timestamp, BANGLADESH_TZ)
+        else:
+            published = parse_bengali_date(article.get("date"))
+        columns["published"].append(published)
+        columns["source"].append(source_of(url))
+        columns[granularity].append(
+            published.date().isoformat()[:width] if published else UNKNOWN_PARTITION
+        )
+        if len(columns["url"]) >= batch_size:
+            yield pa.RecordBatch.from_pydict(columns, schema=schema)
+            columns = {name: [] for name in schema.names}
+    if columns["url"]:
+        yield pa.RecordBatch.from_pydict(columns, schema=schema)
+
+
+def export_articles(  # pylint: disable=too-many-arguments
+    paths,
+    output_dir,
+    *,
+    granularity="month",
+    batch_size=10000,
+    compression="zstd",
+    dedup=True,
+):
+    """
+    Writes articles to a Parquet dataset partitioned by source and date.
+
+    The dataset uses Hive-style directories, e.g.
+    output_dir/source=banglanews24/month=2024-03/part-<export id>-0.parquet.
+    Articles whose date cannot be parsed go to the "unknown" date partition.
+    Each export writes new files next to the existing ones, so exporting new
+    shards into an existing dataset adds their articles to it.
+
+    Args:
+        paths (iterable): Crawler outputs: JSON files, JSONL shards or shard directories.
+        output_dir (str): The dataset directory.
+        granularity (str): The date partition granularity, "year", "month" or "day".
+        batch_size (int): Number of articles converted at a time.
+        compression (str): The Parquet compression codec.
+        dedup (bool): Keep only the first article with each URL, and skip the
+            URLs the dataset already holds, so exporting a shard twice adds
+            nothing.
+
+    Returns:
+        int: The number of articles written.
+
+    Raises:
+        ValueError: If the granularity is unknown.
+    """
+    _require_pyarrow()
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity: {granularity}")
+    schema = article_schema(granularity)
+    written = 0
+    seen = None
+    if dedup:
+        seen = set()
+        if os.path.isdir(output_dir):
+            existing = read_articles(output_dir, columns=["url"])
+            seen.update(existing.column("url").to_pylist())
+
+    def articles():
+        for path in paths:
+            yield from iter_articles(path)
+
+    def counted(batches):
+        nonlocal written
+        for batch in batches:
+            written += batch.num_rows
+            yield batch
+
+    ds.write_dataset(
+        counted(_batches(articles(), granularity, batch_size, seen)),
+        output_dir,
+        schema=schema,
+        format="parquet",
+        partitioning=ds.partitioning(
+            pa.schema([("source", pa.string()), (granularity, pa.string())]), flavor="hive"
+        ),
+        file_options=ds.ParquetFileFormat().make_write_options(compression=compression),
+        # Unique file names keep the files of earlier exports in the
+        # partitions this one writes to.
+        basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+        existing_data_behavior="overwrite_or_ignore",
+    )
+    return written
+
+
+def read_articles(dataset_dir, columns=None, filter=None):  # pylint: disable=redefined-builtin
+    """
+    Reads articles from an exported dataset.
+
+    Only the requested columns are decoded, and the filter is pushed down to
+    skip partitions and row groups that cannot match.
+
+    Args:
+        dataset_dir (str): The dataset directory written by export_articles.
+        columns (list): The columns to read, all columns by default.
+        filter (pyarrow.compute.Expression): A row filter, e.g.
+            (pc.field("source") == "bdpratidin") & (pc.field("month") == "2024-04").
+
+    Returns:
+        pyarrow.Table: The matching articles.
+    """
+    _require_pyarrow()
+    dataset = ds.dataset(dataset_dir, format="parquet", partitioning="hive")
+    return dataset.to_table(columns=columns, filter=filter)
+
+
+def main():
+    """
+    Converts crawler output to a partitioned Parquet dataset.
+    """
+    parser = argparse.ArgumentParser(description="Export articles to a Parquet dataset.")
+    parser.add_argument("inputs", nargs="+", help="JSON files, JSONL shards or shard directories")
+    parser.add_argument("-o", "--output", default="./data/articles_parquet",
+                        help="dataset directory")
+    parser.add_argument("--granularity", choices=GRANULARITIES, default="month",
+                        help="date partition granularity")
+    parser.add_argument("--batch-size", type=int, default=10000, help="articles per batch")
+    parser.add_argument("--compression", default="zstd", help="Parquet compression codec")
+    args = parser.parse_args()
+
+    count = export_articles(
+        args.inputs,
+        args.output,
+        granularity=args.granularity,
+        batch_size=args.batch_size,
+        compression=args.compression,
+    )
+    print(f"Exported {count} articles to {args.output}")
+    for path in sorted(ds.dataset(args.output, format="parquet").files):
+        print(" ", path, pq.ParquetFile(path).metadata.num_rows, "rows")
+
+
+if __name__ == "__main__":
+    main()
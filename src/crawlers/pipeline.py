@@ -0,0 +1,309 @@
+"""
+Crawl Pipeline Module.
+
+This module runs a crawl as a chain of stages connected by bounded queues:
+archive URL generation, archive link extraction, article fetching and article
+extraction. Network-bound stages run as coroutines on the fetch engine, while
+HTML parsing runs on a process pool, so fetching and parsing overlap. Each
+parser process sends the stage timings and profiles it recorded back with its
+results, and they are merged into the pipeline's metrics.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from src.crawlers.metrics import get_metrics
+
+_DONE = object()
+_WORKER_CRAWLER = None
+
+
+def _init_worker(crawler_class, kwargs, profile):
+    global _WORKER_CRAWLER  # pylint: disable=global-statement
+    _WORKER_CRAWLER = crawler_class(**kwargs)
+    _WORKER_CRAWLER.metrics.profile = profile
+
+
+def _call_worker(method_name, url, html):
+    metrics = _WORKER_CRAWLER.metrics
+    try:
+        result = getattr(_WORKER_CRAWLER, method_name)(url, html)
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        # Raised again by the pipeline, once the metrics of the call are merged.
+        return None, e, metrics.drain()
+    return result, None, metrics.drain()
+
+
+class CrawlPipeline:  # pylint: disable=too-many-instance-attributes,too-few-public-methods
+    """
+    Runs a crawler's stages concurrently, connected by bounded queues.
+
+    The crawler must provide extract_archive_links(url, html),
+    new_article_links(url, links), extract_article(url, html),
+    store_article(article), the crawled_archives list and a frontier attribute
+    (which may be None), and worker_args() returning the keyword arguments
+    (such as the extraction backend name and site spec) from which the parser
+    processes build their own instance.
+
+    An archive is added to crawled_archives once its page was read and none of
+    the articles first found on it failed, so an archive with failed articles
+    is neither marked done nor closed, and is read again by the next run.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        crawler,
+        *,
+        archive_workers=2,
+        fetch_workers=16,
+        parse_workers=None,
+        queue_size=256,
+        metrics=None,
+    ):
+        """
+        Initializes the CrawlPipeline class.
+
+        Args:
+            crawler: The crawler whose engine, extractors and article list are used.
+            archive_workers (int): Number of concurrent archive page fetches.
+            fetch_workers (int): Number of concurrent article fetches.
+            parse_workers (int): Number of parser processes, 0 parses in-process.
+                Defaults to the number of CPUs.
+            queue_size (int): Capacity of each queue between two stages.
+            metrics (CrawlMetrics): Records queue depths, the time each page
+                spends in extraction including the trip to the parser processes,
+                and the stages timed in those processes. Defaults to the shared
+                registry.
+        """
+        self.crawler = crawler
+        self.archive_workers = archive_workers
+        self.fetch_workers = fetch_workers
+        if parse_workers is None:
+            parse_workers = os.cpu_count() or 1
+        self.parse_workers = parse_workers
+        self.queue_size = queue_size
+        self.metrics = metrics or get_metrics()
+        self.stats = {}
+        self._seen = set()
+        self._archive_of = {}
+        self._incomplete = set()
+        self._pool = None
+
+    def crawl(self, start, end, base_urls=None):
+        """
+        Crawls the articles of a date range.
+
+        The articles are taken from the website's sitemaps when they cover the
+        range, and from its archive pages otherwise.
+
+        Args:
+            start (datetime): The first day of the range.
+            end (datetime): The last day of the range.
+            base_urls (list): Base or category URLs of the archives. Defaults to
+                the categories on the homepage, fetched only if archives are read.
+
+        Returns:
+            dict: Counters of archives, links, fetched pages, articles and failures.
+        """
+        article_urls = self.crawler.discover_articles(start, end)
+        if article_urls is not None:
+            return self.run((), article_urls)
+        if base_urls is None:
+            base_urls = self.crawler.fetch_all_categories() or []
+        return self.run(self.crawler.archive_urls(base_urls, start, end))
+
+    def run(self, archive_urls, article_urls=()):
+        """
+        Crawls every archive page and stores the extracted articles in the crawler.
+
+        Args:
+            archive_urls (iterable): The archive page URLs, e.g. from archive_urls().
+            article_urls (iterable): Article URLs to fetch directly, e.g. from
+                discover_articles().
+
+        Returns:
+            dict: Counters of archives, links, fetched pages, articles and failures.
+        """
+        self.stats = {
+            "archives": 0,
+            "links": 0,
+            "fetched": 0,
+            "articles": 0,
+            "failed": 0,
+        }
+        if self.parse_workers > 0:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.parse_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(type(self.crawler), self.crawler.worker_args(), self.metrics.profile),
+            )
+        try:
+            asyncio.run(self._run(archive_urls, article_urls))
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+        print("Pipeline finished:", self.stats)
+        return self.stats
+
+    async def _run(self, archive_urls, article_urls):
+        archive_queue = asyncio.Queue(self.queue_size)
+        article_queue = asyncio.Queue(self.queue_size)
+        page_queue = asyncio.Queue(self.queue_size)
+        # Two parse slots per process keep every process busy while results
+        # travel back to the event loop.
+        stages = [
+            (archive_queue, self.archive_workers,
+             lambda: self._archive_worker(archive_queue, article_queue)),
+            (article_queue, self.fetch_workers,
+             lambda: self._fetch_worker(article_queue, page_queue)),
+            (page_queue, max(1, self.parse_workers) * 2,
+             lambda: self._parse_worker(page_queue)),
+        ]
+        workers = [
+            [asyncio.create_task(worker()) for _ in range(max(1, count))]
+            for _, count, worker in stages
+        ]
+        sampler = asyncio.create_task(self._sample_queues(
+            {"archive": archive_queue, "article": article_queue, "page": page_queue}
+        ))
+        await self._resume(article_queue)
+        article_urls = list(article_urls)
+        if self.crawler.frontier is not None:
+            self.crawler.frontier.add(article_urls)
+        for url in article_urls:
+            await self._enqueue_article(url, article_queue)
+        await self._produce(archive_urls, archive_queue)
+        # Shut the stages down in order so each one drains its input first.
+        for (queue, _, _), stage_workers in zip(stages, workers):
+            for _ in stage_workers:
+                await queue.put(_DONE)
+            await asyncio.gather(*stage_workers)
+        sampler.cancel()
+        self.crawler.crawled_archives[:] = [
+            url for url in self.crawler.crawled_archives if url not in self._incomplete
+        ]
+
+    async def _sample_queues(self, queues, interval=0.5):
+        while True:
+            for name, queue in queues.items():
+                self.metrics.gauge("queue_depth", queue.qsize(), queue=name)
+            await asyncio.sleep(interval)
+
+    async def _resume(self, article_queue):
+        frontier = self.crawler.frontier
+        if frontier is None:
+            return
+        for url in frontier.unfinished():
+            await self._enqueue_article(url, article_queue)
+
+    async def _produce(self, archive_urls, archive_queue):
+        frontier = self.crawler.frontier
+        for url in archive_urls:
+            if frontier is not None and frontier.is_done(url):
+                print("Skipping archive that is already crawled:", url)
+                continue
+            await archive_queue.put(url)
+
+    async def _enqueue_article(self, url, article_queue):
+        frontier = self.crawler.frontier
+        if url in self._seen or (frontier is not None and frontier.is_done(url)):
+            return
+        self._seen.add(url)
+        self.stats["links"] += 1
+        await article_queue.put(url)
+
+    async def _archive_worker(self, archive_queue, article_queue):
+        while (url := await archive_queue.get()) is not _DONE:
+            print(f"Fetching articles from archive URL: {url}")
+            result = await self.crawler.engine.fetch(url)
+            if result.error is not None:
+                print("Failed to parse archive:", url, result.error)
+                self._fail(url, result.error, kind="archive")
+                continue
+            self.stats["archives"] += 1
+            try:
+                links = await self._call("extract_archive_links", url, result.content)
+                links = self.crawler.new_article_links(url, links)
+                if self.crawler.frontier is not None:
+                    self.crawler.frontier.add(links)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                # A worker that dies leaves its queue undrained and blocks the
+                # stage before it, so each failure only costs its own page.
+                print("Failed to extract archive links:", url, e)
+                self.metrics.error("extract_archive_links", e)
+                self._fail(url, e, kind="archive")
+                continue
+            for link in links:
+                self._archive_of.setdefault(link, url)
+                await self._enqueue_article(link, article_queue)
+            self.crawler.crawled_archives.append(url)
+
+    async def _fetch_worker(self, article_queue, page_queue):
+        frontier = self.crawler.frontier
+        while (url := await article_queue.get()) is not _DONE:
+            try:
+                if frontier is not None and not frontier.claim([url]):
+                    continue
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                print("Failed to claim article:", url, e)
+                self.metrics.error("claim", e)
+                self.stats["failed"] += 1
+                continue
+            result = await self.crawler.engine.fetch(url)
+            if result.error is not None:
+                print("Failed to parse article:", url, result.error)
+                self._fail(url, result.error)
+                continue
+            self.stats["fetched"] += 1
+            await page_queue.put(result)
+
+    async def _parse_worker(self, page_queue):
+        while (result := await page_queue.get()) is not _DONE:
+            try:
+                article = await self._call("extract_article", result.url, result.content)
+            except AttributeError as e:
+                print("Failed to find necessary elements in the article:", result.url, e)
+                self.metrics.error("extract_article", e)
+                self._fail(result.url, e)
+                continue
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                print("Failed to extract article:", result.url, e)
+                self.metrics.error("extract_article", e)
+                self._fail(result.url, e)
+                continue
+            try:
+                self.crawler.store_article(article)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                print("Failed to store article:", result.url, e)
+                self.metrics.error("store_article", e)
+                self._fail(result.url, e)
+                continue
+            self.stats["articles"] += 1
+
+    def _fail(self, url, error, kind="article"):
+        self.stats["failed"] += 1
+        if url in self._archive_of:
+            self._incomplete.add(self._archive_of[url])
+        if self.crawler.frontier is not None:
+            self.crawler.frontier.mark_failed(url, error, kind=kind)
+
+    async def _call(self, method_name, url, html):
+        if self._pool is None:
+            return getattr(self.crawler, method_name)(url, html)
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        try:
+            result, error, measured = await loop.run_in_executor(
+                self._pool, _call_worker, method_name, url, html
+            )
+        finally:
+            self.metrics.observe(f"pool_{method_name}", time.perf_counter() - started)
+        self.metrics.merge(measured)
+        if error is not None:
+            raise error
+        return result
@@ -0,0 +1,218 @@
+"""
+Adaptive Rate Control Module.
+
+This module adapts the number of concurrent requests per host to how the host
+responds, in the manner of TCP congestion control (AIMD). The limit grows by
+one after every window of requests whose 95th percentile latency and error rate
+stay healthy, and is cut multiplicatively when the host answers 429 or 503,
+times out, or slows down past the latency target. Limits are kept in SQLite, so
+the next run starts at the highest rate the host sustained.
+"""
+
+import sqlite3
+import threading
+import time
+from collections import deque
+
+from src.crawlers.metrics import get_metrics
+
+# Answers meaning that the host wants fewer requests, not that the page failed.
+THROTTLE_STATUSES = frozenset({429, 503})
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS host_limits (
+    host TEXT PRIMARY KEY,
+    host_limit REAL NOT NULL,
+    updated_at REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+class _HostState:  # pylint: disable=too-few-public-methods
+    """
+    The limit of one host and the requests observed since it last changed.
+    """
+
+    def __init__(self, limit, window):
+        self.limit = limit
+        self.latencies = deque(maxlen=window)
+        self.errors = 0
+        self.last_decrease = 0.0
+        self.in_flight = 0
+        self.busiest = 0
+
+
+class AdaptiveRateController:  # pylint: disable=too-many-instance-attributes
+    """
+    Raises or lowers the per-host concurrency limit from observed responses.
+
+    The fetcher reports the start of every attempt with begin() and its outcome
+    with record(), and the fetch engine asks limit() before starting a request.
+    A limit only grows while the host is actually sent that many requests at
+    once, so an idle host is never credited with a rate it has not served.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        path=None,
+        *,
+        initial_limit=2,
+        min_limit=1,
+        max_limit=32,
+        target_p95=2.0,
+        max_error_rate=0.05,
+        decrease=0.5,
+        window=20,
+        cooldown=1.0,
+        metrics=None,
+    ):
+        """
+        Initializes the AdaptiveRateController class.
+
+        Args:
+            path (str): Optional SQLite database file the limits are kept in,
+                created if missing. Without it, limits last for this run only.
+            initial_limit (int): The limit of a host seen for the first time.
+            min_limit (int): The lowest limit.
+            max_limit (int): The highest limit.
+            target_p95 (float): Seconds the 95th percentile latency of a window
+                may reach before the limit is cut.
+            max_error_rate (float): Fraction of failed requests in a window
+                above which the limit stops growing.
+            decrease (float): Factor the limit is multiplied by when cut.
+            window (int): Number of requests observed before the limit grows.
+            cooldown (float): Seconds after a cut during which further throttled
+                answers do not cut again, since they were sent at the old limit.
+            metrics (CrawlMetrics): Receives the limit of each host as a gauge.
+                Defaults to the shared registry.
+        """
+        self.path = path
+        self.initial_limit = initial_limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.target_p95 = target_p95
+        self.max_error_rate = max_error_rate
+        self.decrease = decrease
+        self.window = window
+        self.cooldown = cooldown
+        self.metrics = metrics or get_metrics()
+        self._lock = threading.Lock()
+        self._hosts = {}
+        self._conn = None
+        if path is not None:
+            self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+            for host, limit in self._conn.execute("SELECT host, host_limit FROM host_limits"):
+                limit = min(max(limit, min_limit), max_limit)
+                self._hosts[host] = _HostState(limit, window)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """
+        Closes the database connection.
+        """
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def limit(self, host):
+        """
+        Returns the number of concurrent requests currently allowed for a host.
+
+        Args:
+            host (str): The network location of the URL.
+
+        Returns:
+            int: The limit, between min_limit and max_limit.
+        """
+        with self._lock:
+            return int(self._state(host).limit)
+
+    def limits(self):
+        """
+        Returns the current limit of every known host.
+
+        Returns:
+            dict: Mapping of host to its limit.
+        """
+        with self._lock:
+            return {host: int(state.limit) for host, state in self._hosts.items()}
+
+    def begin(self, host):
+        """
+        Records the start of one request attempt.
+
+        Args:
+            host (str): The network location of the URL.
+        """
+        with self._lock:
+            state = self._state(host)
+            state.in_flight += 1
+            state.busiest = max(state.busiest, state.in_flight)
+
+    def record(self, host, seconds, *, status=None, timed_out=False):
+        """
+        Records the outcome of one request attempt started with begin().
+
+        Args:
+            host (str): The network location of the URL.
+            seconds (float): How long the attempt took.
+            status (int): The HTTP status, or None if no response arrived.
+            timed_out (bool): Whether the attempt failed with a timeout.
+        """
+        throttled = status in THROTTLE_STATUSES or timed_out
+        failed = status is None or status >= 500
+        with self._lock:
+            state = self._state(host)
+            state.in_flight = max(0, state.in_flight - 1)
+            now = time.monotonic()
+            if throttled:
+                if now - state.last_decrease >= self.cooldown:
+                    self._cut(host, state, now)
+                return
+            state.latencies.append(seconds)
+            state.errors += failed
+            if len(state.latencies) < self.window:
+                return
+            latencies = sorted(state.latencies)
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            if p95 > self.target_p95:
+                self._cut(host, state, now)
+            elif (
+                state.errors / len(latencies) <= self.max_error_rate
+                and state.busiest >= int(state.limit)
+            ):
+                self._set(host, state, min(self.max_limit, state.limit + 1))
+            state.latencies.clear()
+            state.errors = 0
+            state.busiest = state.in_flight
+
+    def _state(self, host):
+        if host not in self._hosts:
+            self._hosts[host] = _HostState(self.initial_limit, self.window)
+        return self._hosts[host]
+
+    def _cut(self, host, state, now):
+        state.last_decrease = now
+        state.latencies.clear()
+        state.errors = 0
+        self._set(host, state, max(self.min_limit, state.limit * self.decrease))
+
+    def _set(self, host, state, limit):
+        if limit == state.limit:
+            return
+        state.limit = limit
+        self.metrics.gauge("host_concurrency_limit", int(limit), host=host)
+        if self._conn is not None:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO host_limits (host, host_limit, updated_at) "
+                "VALUES (?, ?, ?)",
+                (host, limit, time.time()),
+            )
@@ -0,0 +1,257 @@
+"""
+HTTP Response Cache Module.
+
+This module provides an on-disk, content-addressed cache of HTTP responses.
+Bodies are stored once per SHA-256 digest, and an SQLite index maps each URL to
+its body together with the ETag and Last-Modified validators used for
+conditional requests. The cache is bounded by total size and by entry age:
+expired entries are misses, and are swept out as new responses are stored.
+"""
+
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import namedtuple
+
+CacheEntry = namedtuple(
+    "CacheEntry",
+    ["url", "digest", "etag", "last_modified", "content_type", "stored_at", "size"],
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    url TEXT PRIMARY KEY,
+    digest TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    content_type TEXT,
+    stored_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    size INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS entries_digest ON entries (digest);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at);
+CREATE INDEX IF NOT EXISTS entries_stored ON entries (stored_at);
+"""
+
+
+class ResponseCache:
+    """
+    A content-addressed on-disk cache of response bodies and their validators.
+    """
+
+    def __init__(self, directory, max_bytes=None, max_age=None):
+        """
+        Initializes the ResponseCache class.
+
+        Args:
+            directory (str): The cache directory, created if missing.
+            max_bytes (int): Evict least recently used entries above this total size.
+            max_age (float): Expire entries stored or revalidated longer ago than
+                this many seconds.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        os.makedirs(os.path.join(directory, "objects"), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            os.path.join(directory, "index.sqlite3"),
+            check_same_thread=False,
+            isolation_level=None,
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        # Bodies shared by several URLs are stored, and counted, once.
+        self._bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM"
+            " (SELECT MAX(size) AS size FROM entries GROUP BY digest)"
+        ).fetchone()[0]
+        self._next_sweep = 0.0
+        self.evict()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """
+        Closes the cache index.
+        """
+        with self._lock:
+            self._conn.close()
+
+    def lookup(self, url):
+        """
+        Looks up the cached response of a URL.
+
+        Args:
+            url (str): The URL.
+
+        Returns:
+            CacheEntry: The entry, or None if the URL is not cached or its entry
+                has expired.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, digest, etag, last_modified, content_type, stored_at, size"
+                " FROM entries WHERE url = ?",
+                (url,),
+            ).fetchone()
+        entry = CacheEntry(*row) if row else None
+        if entry is not None and self._expired(entry.stored_at, time.time()):
+            return None
+        return entry
+
+    def read(self, entry):
+        """
+        Reads the body of a cache entry and marks it as recently used.
+
+        Args:
+            entry (CacheEntry): The entry.
+
+        Returns:
+            bytes: The cached body, or None if the body file has gone missing.
+        """
+        try:
+            with open(self._object_path(entry.digest), "rb") as f:
+                body = f.read()
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            self._conn.execute(
+                "UPDATE entries SET accessed_at = ? WHERE url = ?", (time.time(), entry.url)
+            )
+        return body
+
+    def store(self, url, body, etag=None, last_modified=None, content_type=None):
+        """
+        Stores a response body and its validators.
+
+        Args:
+            url (str): The URL.
+            body (bytes): The response body.
+            etag (str): The ETag response header.
+            last_modified (str): The Last-Modified response header.
+            content_type (str): The Content-Type response header.
+
+        Returns:
+            CacheEntry: The new entry.
+        """
+        digest = hashlib.sha256(body).hexdigest()
+        now = time.time()
+        entry = CacheEntry(url, digest, etag, last_modified, content_type, now, len(body))
+        with self._lock:
+            # The body is written under the lock, so _release cannot delete a
+            # file that an entry is about to refer to.
+            if not self._in_use(digest):
+                self._write_object(digest, body)
+                self._bytes += len(body)
+            previous = self._conn.execute(
+                "SELECT digest, size FROM entries WHERE url = ?", (url,)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, digest, etag, last_modified, content_type, now, now, len(body)),
+            )
+            if previous and previous[0] != digest:
+                self._release(*previous)
+            over = self.max_bytes is not None and self._bytes > self.max_bytes
+            sweep = self.max_age is not None and now >= self._next_sweep
+        if over or sweep:
+            self.evict()
+        return entry
+
+    def refresh(self, entry):
+        """
+        Records that an entry was revalidated by the server.
+
+        Args:
+            entry (CacheEntry): The entry confirmed as unchanged.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE entries SET stored_at = ?, accessed_at = ? WHERE url = ?",
+                (now, now, entry.url),
+            )
+
+    def total_bytes(self):
+        """
+        Returns the total size of the cached bodies referenced by URLs.
+
+        Returns:
+            int: The size in bytes, counting a body shared by several URLs once.
+        """
+        with self._lock:
+            return self._bytes
+
+    def evict(self):
+        """
+        Removes expired entries, then least recently used ones above max_bytes.
+
+        Returns:
+            int: The number of entries removed.
+        """
+        removed = 0
+        now = time.time()
+        with self._lock:
+            if self.max_age is not None:
+                expired = self._conn.execute(
+                    "SELECT url, digest, size FROM entries WHERE stored_at < ?",
+                    (now - self.max_age,),
+                ).fetchall()
+                removed += self._remove(expired)
+                # Sweep again once a tenth of the lifetime has passed, so an
+                # entry outlives max_age by at most that much on disk.
+                self._next_sweep = now + self.max_age / 10
+            while self.max_bytes is not None and self._bytes > self.max_bytes:
+                # Removing an entry frees nothing while another URL shares its
+                # body, so the oldest entries go until the distinct bodies fit.
+                victim = self._conn.execute(
+                    "SELECT url, digest, size FROM entries ORDER BY accessed_at LIMIT 1"
+                ).fetchone()
+                if victim is None:
+                    break
+                removed += self._remove([victim])
+        return removed
+
+    def _expired(self, stored_at, now):
+        return self.max_age is not None and stored_at < now - self.max_age
+
+    def _in_use(self, digest):
+        return self._conn.execute(
+            "SELECT 1 FROM entries WHERE digest = ? LIMIT 1", (digest,)
+        ).fetchone() is not None
+
+    def _write_object(self, digest, body):
+        path = self._object_path(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, "wb") as f:
+            f.write(body)
+        os.replace(tmp_path, path)
+
+    def _remove(self, rows):
+        for url, digest, size in rows:
+            self._conn.execute("DELETE FROM entries WHERE url = ?", (url,))
+            self._release(digest, size)
+        return len(rows)
+
+    def _release(self, digest, size):
+        # Bodies are shared between URLs with identical content, so a body is
+        # only deleted, and its size subtracted, once no entry refers to it.
+        if not self._in_use(digest):
+            self._bytes -= size
+            try:
+                os.remove(self._object_path(digest))
+            except FileNotFoundError:
+                pass
+
+    def _object_path(self, digest):
+        return os.path.join(self.directory, "objects", digest[:2], digest[2:])
@@ -0,0 +1,586 @@
+"""
+Site Crawler Module.
+
+This module provides the crawler core shared by every news website: archive
+URL generation or sitemap discovery, link and field extraction driven by a
+SiteSpec, concurrent fetching through the fetch engine, and storage with optional frontier,
+incremental state, near-duplicate index and streaming sink. A website is
+crawled by giving SiteCrawler its spec, so it needs no code of its own.
+"""
+
+import argparse
+import json
+import os
+from datetime import datetime
+
+import requests
+
+from src.crawlers.article_record import ArticleRecord
+from src.crawlers.bn_dates import BANGLADESH_TZ
+from src.crawlers.crawl_state import IncrementalState
+from src.crawlers.dedup import NearDuplicateIndex
+from src.crawlers.extraction import get_backend
+from src.crawlers.fetch_engine import AsyncFetchEngine
+from src.crawlers.frontier import UrlFrontier
+from src.crawlers.http_fetcher import HttpFetcher
+from src.crawlers.metrics import add_arguments as add_metrics_arguments
+from src.crawlers.metrics import get_metrics, timed
+from src.crawlers.rate_control import AdaptiveRateController
+from src.crawlers.response_cache import ResponseCache
+from src.crawlers.sitemaps import SitemapDiscovery
+
+# Shared by the command-line crawls of every website.
+HOST_LIMITS_FILE = "./data/host_limits.sqlite3"
+NEAR_DUPLICATES_FILE = "./data/near_duplicates.sqlite3"
+INCREMENTAL_STATE_FILE = "./data/incremental_state.sqlite3"
+
+
+class SiteCrawler:  # pylint: disable=too-many-instance-attributes
+    """
+    Crawls the daily archives of a news website described by a SiteSpec.
+
+    Subclasses may set spec as a class attribute instead of passing it.
+    """
+
+    spec = None
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        engine=None,
+        *,
+        backend=None,
+        frontier=None,
+        sink=None,
+        dedup=None,
+        state=None,
+        spec=None,
+        metrics=None,
+        discovery="sitemap",
+    ):
+        """
+        Initializes the SiteCrawler class.
+
+        Args:
+            engine (AsyncFetchEngine): The engine used to fetch pages concurrently.
+            backend (str): The HTML extraction backend, "lxml" or "bs4".
+            frontier (UrlFrontier): Optional persistent URL state used to resume
+                crawls and skip pages that are already stored.
+            sink (JsonlShardWriter): Optional writer that receives each article as
+                soon as it is extracted, instead of keeping it in articles.
+            dedup (NearDuplicateIndex): Optional index that drops, or marks with
+                duplicate_of, articles whose content nearly repeats a stored one.
+            state (IncrementalState): Optional record of stored article IDs per
+                category and date. With it, closed archives and links to stored
+                articles are skipped, so a scheduled crawl only fetches new pages.
+            spec (SiteSpec): The website. Defaults to the class attribute.
+            metrics (CrawlMetrics): Records the time spent in each crawl stage.
+                Defaults to the shared registry.
+            discovery (str): "sitemap" finds the articles of a date range in the
+                website's sitemaps and feeds when they cover it, and reads the
+                archive pages otherwise. "archive" always reads the archive pages.
+
+        Raises:
+            ValueError: If no spec is given, or the discovery mode is unknown.
+        """
+        self.spec = spec or self.spec
+        if self.spec is None:
+            raise ValueError("SiteCrawler needs a SiteSpec")
+        if discovery not in ("sitemap", "archive"):
+            raise ValueError(f"Unknown discovery mode: {discovery}")
+        self.discovery = discovery
+        self.articles = []
+        self.crawled_archives = []
+        self.metrics = metrics or get_metrics()
+        self.engine = engine or AsyncFetchEngine(metrics=self.metrics)
+        self.backend = get_backend(backend)
+        self.frontier = frontier
+        self.sink = sink
+        self.dedup = dedup
+        self.state = state
+        # Discovered articles whose publication date is only known from their
+        # page, mapped to the first and last day of the range they were found for.
+        self._unconfirmed = {}
+        # Selectors are bound to the backend once, not per page.
+        self._fields = self.spec.compile(self.backend)
+        self._categories = (
+            self.spec.categories.compile(self.backend) if self.spec.categories else None
+        )
+        if sink is not None:
+            # Articles only count as done once the sink has synced them to disk.
+            sink.on_flush = self.mark_stored
+
+    @property
+    def source(self):
+        """
+        str: The source name of the website, e.g. "bdpratidin".
+        """
+        return self.spec.name
+
+    def worker_args(self):
+        """
+        Returns the arguments that build this crawler in a parser process.
+
+        Returns:
+            dict: Keyword arguments for the crawler class.
+        """
+        return {"backend": self.backend.name, "spec": self.spec}
+
+    def fetch_all_categories(self, base_url=None):
+        """
+        Fetches the category URLs listed on the homepage.
+
+        Args:
+            base_url (str): The homepage URL. Defaults to the spec's base URL.
+
+        Returns:
+            list: The category URLs, [base_url] for websites without categories,
+                or None if the homepage could not be fetched.
+        """
+        base_url = base_url or self.spec.base_url
+        if self._categories is None:
+            return [base_url]
+        try:
+            print("Fetching all categories from URL:", base_url)
+            return self.extract_category_links(self.backend.parse(self.engine.get(base_url)))
+        except requests.exceptions.RequestException as e:
+            print("Failed to fetch categories:", e)
+            return None
+
+    @timed("extract_categories")
+    def extract_category_links(self, soup):
+        """
+        Extracts the category URLs from the homepage.
+
+        Args:
+            soup: The homepage parsed by the extraction backend.
+
+        Returns:
+            list: List of category URLs.
+        """
+        return list(self._categories(soup))
+
+    @timed("fetch_articles")
+    def fetch_articles(self, base_urls, start, end):
+        """
+        Fetches the articles of a date range, from the sitemaps if they cover
+        it and otherwise from every archive, one page at a time.
+
+        Args:
+            base_urls (list): Base or category URLs, or a single URL.
+            start (datetime): The start date for fetching articles.
+            end (datetime): The end date for fetching articles.
+        """
+        try:
+            article_urls = self.discover_articles(start, end)
+            if article_urls is not None:
+                self.fetch_article_pages(article_urls)
+                return
+            for archive_url in self.archive_urls(base_urls, start, end):
+                self.parse_archive(archive_url)
+        except requests.exceptions.RequestException as e:
+            print("Failed to fetch articles:", e)
+
+    @timed("discover")
+    def discover_articles(self, start, end):
+        """
+        Lists the articles of a date range from the website's sitemaps and feeds.
+
+        Articles the incremental state has already stored are left out. Their
+        IDs are recorded under the archive that lists them and their
+        publication date, as archive_key() gives them for archive pages. An
+        article a sitemap dates by its modification time only is checked
+        against the date on its page when it is stored, and is dropped if it
+        was published outside the range.
+
+        Args:
+            start (datetime): The first day of the range.
+            end (datetime): The last day of the range.
+
+        Returns:
+            list: The article URLs, or None if discovery is off, the website has
+                no readable sitemap, or its sitemaps do not reach back to start
+                or hold too many documents. The archive pages have to be read then.
+        """
+        if self.discovery != "sitemap" or self.spec.article_pattern is None:
+            return None
+        discovery = SitemapDiscovery(self.engine)
+        sitemap_urls = discovery.locate(self.spec)
+        entries = discovery.discover(sitemap_urls, start, end) if sitemap_urls else None
+        if entries is None:
+            print("No sitemap covers the date range, reading the archive pages")
+            return None
+        groups, unconfirmed = {}, []
+        for entry in entries:
+            category = self.spec.archive_category(entry.url)
+            if category is None:
+                continue
+            if entry.published is None:
+                unconfirmed.append(entry.url)
+            else:
+                day = entry.published.astimezone(BANGLADESH_TZ).date()
+                groups.setdefault((category, day), []).append(entry.url)
+        article_urls = []
+        for (category, day), urls in groups.items():
+            if self.state is not None:
+                urls = self._new_links(category, day, urls, stop_after=0)
+            article_urls.extend(urls)
+        self._unconfirmed.update(dict.fromkeys(unconfirmed, (start.date(), end.date())))
+        article_urls.extend(unconfirmed)
+        print(
+            f"Discovered {len(article_urls)} articles in "
+            f"{discovery.stats['documents']} sitemaps, "
+            f"{len(unconfirmed)} of them dated by their modification time only"
+        )
+        return article_urls
+
+    def archive_urls(self, base_urls, start, end):
+        """
+        Generates the archive page URLs for a date range.
+
+        Archives the incremental state has closed are skipped.
+
+        Args:
+            base_urls (list): Base or category URLs, or a single URL.
+            start (datetime): The start date for fetching articles.
+            end (datetime): The end date for fetching articles.
+
+        Yields:
+            str: The URL of each daily archive page.
+        """
+        for url in self.spec.archive_urls(base_urls, start, end):
+            if self.state is not None and self.state.is_closed(
+                self.source, *self.archive_key(url)
+            ):
+                print("Skipping archive that is closed:", url)
+                continue
+            yield url
+
+    def archive_key(self, url):
+        """
+        Returns the category and date of an archive page.
+
+        Args:
+            url (str): The archive URL.
+
+        Returns:
+            tuple: (category, date).
+        """
+        return self.spec.archive_key(url)
+
+    def new_article_links(self, archive_url, article_urls):
+        """
+        Drops the links to articles the incremental state has already stored.
+
+        Args:
+            archive_url (str): The URL of the archive page.
+            article_urls (list): The article URLs in page order.
+
+        Returns:
+            list: The article URLs that still need fetching.
+        """
+        if self.state is None:
+            return article_urls
+        category, day = self.archive_key(archive_url)
+        return self._new_links(category, day, article_urls)
+
+    def _new_links(self, category, day, urls, stop_after=None):
+        urls = self.state.new_links(self.source, category, day, urls, stop_after)
+        if self.frontier is None:
+            return urls
+        # An article listed under several categories may already be stored
+        # from another one. It is recorded under this archive as well instead
+        # of being fetched, so the archive can close.
+        done = {url for url in urls if self.frontier.is_done(url)}
+        self.state.mark_stored(done)
+        return [url for url in urls if url not in done]
+
+    def _confirm_page_date(self, article, window):
+        # Sitemaps only gave a modification time, so the article is recorded
+        # under the publication date on its page instead, and is only kept if
+        # that date is in the range. An undated page cannot be ruled out.
+        if article.published is None:
+            return True
+        day = datetime.fromtimestamp(article.published, BANGLADESH_TZ).date()
+        if self.state is not None:
+            category = self.spec.archive_category(article.url)
+            self.state.new_links(self.source, category, day, [article.url], stop_after=0)
+        return window[0] <= day <= window[1]
+
+    @timed("parse_archive")
+    def parse_archive(self, url):
+        """
+        Parses the archive page and fetches its articles concurrently.
+
+        Args:
+            url (str): The URL of the archive page.
+        """
+        if self.frontier is not None and self.frontier.is_done(url):
+            print("Skipping archive that is already crawled:", url)
+            return
+        try:
+            print(f"Fetching articles from archive URL: {url}")
+            article_urls = self.extract_archive_links(url, self.engine.get(url))
+        except requests.exceptions.RequestException as e:
+            print("Failed to parse archive:", url, e)
+            if self.frontier is not None:
+                self.frontier.mark_failed(url, e, kind="archive")
+            return
+        self.fetch_article_pages(self.new_article_links(url, article_urls))
+        self.crawled_archives.append(url)
+
+    def fetch_article_pages(self, article_urls):
+        """
+        Fetches article pages concurrently and stores their articles.
+
+        Args:
+            article_urls (list): The article URLs.
+        """
+        if self.frontier is not None:
+            self.frontier.add(article_urls)
+            article_urls = self.frontier.claim(article_urls)
+        for result in self.engine.fetch_all(article_urls):
+            if result.error is not None:
+                print("Failed to parse article:", result.url, result.error)
+                if self.frontier is not None:
+                    self.frontier.mark_failed(result.url, result.error)
+                continue
+            self.parse_article_content(result.url, result.content)
+
+    @timed("extract_archive")
+    def extract_archive_links(self, url, html):
+        """
+        Extracts the article URLs from a fetched archive page.
+
+        Args:
+            url (str): The URL of the archive page.
+            html (bytes): The raw HTML of the archive page.
+
+        Returns:
+            list: Article URLs in page order, without duplicates.
+        """
+        with self.metrics.timer("html_parse"):
+            document = self.backend.parse(html)
+        return self.spec.article_links(self.backend.links(document), url)
+
+    @timed("parse_article")
+    def parse_article(self, url):
+        """
+        Fetches and parses an individual article page.
+
+        Args:
+            url (str): The URL of the article page.
+        """
+        try:
+            print(f"Fetching article from URL: {url}")
+            self.parse_article_content(url, self.engine.get(url))
+        except requests.exceptions.RequestException as e:
+            print("Failed to parse article:", url, e)
+
+    def parse_article_content(self, url, html):
+        """
+        Extracts and stores the fields of a fetched article page.
+
+        Args:
+            url (str): The URL of the article page.
+            html (bytes): The raw HTML of the article page.
+        """
+        try:
+            self.store_article(self.extract_article(url, html))
+        except AttributeError as e:
+            print("Failed to find necessary elements in the article:", url, e)
+            self.metrics.error("extract_article", e)
+            if self.frontier is not None:
+                self.frontier.mark_failed(url, e)
+
+    @timed("extract_article")
+    def extract_article(self, url, html):
+        """
+        Extracts the article fields from a fetched article page.
+
+        Args:
+            url (str): The URL of the article page.
+            html (bytes): The raw HTML of the article page.
+
+        Returns:
+            ArticleRecord: The spec's fields, the URL and the parsed publication time.
+
+        Raises:
+            AttributeError: If the page lacks an element the extraction relies on.
+        """
+        with self.metrics.timer("html_parse"):
+            document = self.backend.parse(html)
+        return ArticleRecord(
+            url, **{name: extract(document) for name, extract in self._fields.items()}
+        )
+
+    @timed("store_article")
+    def store_article(self, article):
+        """
+        Stores an extracted article in the sink, or in articles without one.
+
+        An article a sitemap dated by its modification time only is dropped,
+        and marked stored, if its page gives a publication date outside the
+        discovered range.
+
+        Args:
+            article (ArticleRecord): The extracted article.
+        """
+        window = self._unconfirmed.pop(article.url, None)
+        if window is not None and not self._confirm_page_date(article, window):
+            print("Skipping article published outside the date range:", article.url)
+            self.mark_stored([article.url])
+            return
+        if self.dedup is not None:
+            with self.metrics.timer("dedup"):
+                original = self.dedup.add(article.url, article.content)
+            if original is not None and self.dedup.drop:
+                print("Skipping near-duplicate of", original, "at", article.url)
+                self.mark_stored([article.url])
+                return
+            article.duplicate_of = original
+        if self.sink is not None:
+            with self.metrics.timer("sink_write"):
+                self.sink.write(article)
+        else:
+            self.articles.append(article)
+
+    def mark_stored(self, urls):
+        """
+        Records articles as stored in the frontier and the incremental state.
+
+        Args:
+            urls (list): The URLs of the articles on disk.
+        """
+        if self.frontier is not None:
+            self.frontier.mark_done(urls)
+        if self.state is not None:
+            self.state.mark_stored(urls)
+
+    def mark_archives_crawled(self):
+        """
+        Records the crawled archives in the frontier and the incremental state.
+        """
+        if self.frontier is not None:
+            self.frontier.mark_done(self.crawled_archives, kind="archive")
+        if self.state is not None:
+            self.state.mark_crawled(
+                (self.source,) + self.archive_key(url) for url in self.crawled_archives
+            )
+
+    def flush_articles(self):
+        """
+        Syncs the sink to disk and marks the crawled archives as done.
+        """
+        self.sink.flush()
+        self.mark_archives_crawled()
+        print("Article data flushed to", self.sink.directory)
+
+    @timed("save_json")
+    def save_articles_to_json(self, output_file):
+        """
+        Saves the extracted articles to a JSON file.
+
+        Args:
+            output_file (str): The path to the output JSON file.
+        """
+        articles = [article.to_dict() for article in self.articles]
+        resumable = self.frontier is not None or self.state is not None
+        if resumable and os.path.exists(output_file):
+            # A resumed crawl skips stored articles, so keep the ones saved by
+            # earlier runs instead of overwriting them.
+            with open(output_file, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+            new_urls = {article["url"] for article in articles}
+            articles = [a for a in stored if a["url"] not in new_urls] + articles
+        with open(output_file, "w", encoding="utf-8") as f:
+            json.dump(articles, f, ensure_ascii=False, indent=4)
+        # Pages only count as done once they are on disk, so a crash before
+        # this point re-crawls them on the next run.
+        self.mark_stored([article.url for article in self.articles])
+        self.mark_archives_crawled()
+        print("Article data saved to JSON file")
+
+
+def default_engine(cache_dir=None, replay=False):
+    """
+    Builds the fetch engine of the command-line crawls.
+
+    Its per-host limits start from the ones learned by earlier runs of any
+    crawler, stored in HOST_LIMITS_FILE.
+
+    Args:
+        cache_dir (str): Cache responses in this directory and revalidate them
+            on later runs.
+        replay (bool): Serve every page from the cache without network access.
+
+    Returns:
+        AsyncFetchEngine: The engine.
+
+    Raises:
+        ValueError: If replay is requested without a cache directory.
+    """
+    controller = AdaptiveRateController(HOST_LIMITS_FILE)
+    cache = ResponseCache(cache_dir) if cache_dir is not None else None
+    fetcher = HttpFetcher(rate_controller=controller, cache=cache, replay=replay)
+    return AsyncFetchEngine(fetcher=fetcher)
+
+
+def default_crawler(crawler_class, sink, cache_dir=None, replay=False, state_file=None):
+    """
+    Builds a crawler for a command-line crawl of its website.
+
+    The crawler resumes from data/<source>_frontier.sqlite3 and shares one
+    near-duplicate index with every website, so syndicated stories are kept once.
+
+    Args:
+        crawler_class (type): A SiteCrawler subclass with a spec.
+        sink (JsonlShardWriter): The writer the articles are streamed to.
+        cache_dir (str): Passed to default_engine().
+        replay (bool): Passed to default_engine().
+        state_file (str): Crawl incrementally, recording stored articles and
+            closed archives in this SQLite file.
+
+    Returns:
+        SiteCrawler: The crawler.
+    """
+    return crawler_class(
+        default_engine(cache_dir, replay),
+        frontier=UrlFrontier(f"./data/{crawler_class.spec.name}_frontier.sqlite3"),
+        sink=sink,
+        dedup=NearDuplicateIndex(NEAR_DUPLICATES_FILE),
+        state=IncrementalState(state_file) if state_file is not None else None,
+    )
+
+
+def add_crawl_arguments(parser):
+    """
+    Adds the fetching options of the command-line crawls to a parser.
+
+    Args:
+        parser (argparse.ArgumentParser): The parser.
+    """
+    parser.add_argument("--cache-dir", metavar="DIR",
+                        help="cache responses in DIR and revalidate them on later runs")
+    parser.add_argument("--replay", action="store_true",
+                        help="serve every page from --cache-dir without network access")
+
+
+def parse_crawl_arguments(description):
+    """
+    Parses the fetching, incremental state and metrics options of a
+    single-website crawl.
+
+    Args:
+        description (str): The description shown by --help.
+
+    Returns:
+        argparse.Namespace: The parsed options.
+    """
+    parser = argparse.ArgumentParser(description=description)
+    add_crawl_arguments(parser)
+    parser.add_argument("--incremental", "--state", dest="state", nargs="?",
+                        const=INCREMENTAL_STATE_FILE, metavar="FILE",
+                        help="skip stored articles and closed archives recorded in FILE,"
+                             f" {INCREMENTAL_STATE_FILE} by default")
+    add_metrics_arguments(parser)
+    return parser.parse_args()
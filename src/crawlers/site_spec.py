@@ -0,0 +1,316 @@
+"""
+Site Specification Module.
+
+This module describes a news website declaratively: how its archive pages are
+addressed, which links on them are articles, and where each article field sits
+in the page. Selectors and URL patterns are compiled when a spec is defined,
+and SiteSpec.compile() binds them to an extraction backend once per crawler, so
+extracting an article is one parse followed by one lookup per field.
+
+Selectors are written as steps separated by " > ", each one searching the
+descendants of the previous match:
+
+    "ol[breadcrumb] > li*"
+
+A step is a tag name, optionally followed by a class in brackets (matched like
+BeautifulSoup's class_, so "[row p-3]" matches that exact class attribute), and
+a "*" to match every element instead of the first. Later steps run on each of
+those elements.
+"""
+
+import re
+from datetime import date, timedelta
+from urllib.parse import urlsplit
+
+_STEP = re.compile(r"^(?P<tag>[\w-]+)(?:\[(?P<class_>[^\]]+)\])?(?P<many>\*)?$")
+
+
+def parse_selector(selector):
+    """
+    Parses a selector into its steps.
+
+    Args:
+        selector (str): The selector, e.g. "div[row p-3] > span".
+
+    Returns:
+        tuple: (tag, class_, many) for each step.
+
+    Raises:
+        ValueError: If a step is malformed.
+    """
+    steps = []
+    for step in selector.split(" > "):
+        match = _STEP.match(step.strip())
+        if match is None:
+            raise ValueError(f"Invalid selector step {step!r} in {selector!r}")
+        steps.append((match["tag"], match["class_"], bool(match["many"])))
+    return tuple(steps)
+
+
+# A field holds one attribute per declared option, like SiteSpec below.
+class Field:  # pylint: disable=too-few-public-methods,too-many-instance-attributes
+    """
+    Declares how one article field is extracted from a page.
+
+    The field takes the text, or an attribute, of the element the selector
+    matches. With a "*" step it takes one value per matched element; these are
+    picked by index, passed to clean, or joined.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        selector,
+        *,
+        attr=None,
+        strip=False,
+        index=None,
+        join="\n",
+        clean=None,
+        default="Unknown",
+    ):
+        """
+        Initializes the Field class.
+
+        Args:
+            selector (str): The selector, e.g. "ol[breadcrumb] > li*".
+            attr (str): Take this attribute instead of the element text.
+            strip (bool): Strip every text fragment and drop empty ones.
+            index (int): With a "*" step, the matched element to use.
+            join (str): With a "*" step, the separator of the values, or None
+                to keep them as a list.
+            clean (callable): Applied to the value. With a "*" step and no index
+                it receives the list of values instead of join. Must be a
+                module-level function so that specs can be sent to parser processes.
+            default: The value when the first step matches nothing. None makes
+                the field required: a missing element raises AttributeError.
+        """
+        self.selector = selector
+        self.steps = parse_selector(selector)
+        self.attr = attr
+        self.strip = strip
+        self.index = index
+        self.join = join
+        self.clean = clean
+        self.default = default
+        self.many = any(many for _, _, many in self.steps)
+
+    def compile(self, backend):
+        """
+        Binds the field to an extraction backend.
+
+        Args:
+            backend: The extraction backend.
+
+        Returns:
+            callable: Takes a parsed document and returns the field value.
+
+        Raises:
+            AttributeError: At extraction time, if an element after the first
+                step is missing, or the first one for a required field.
+        """
+        steps = self.steps
+
+        def value(node):
+            if self.attr is not None:
+                return backend.attr(node, self.attr)
+            return backend.text(node, strip=self.strip)
+
+        def step(node, position):
+            tag, class_, many = steps[position]
+            found = (backend.find_all if many else backend.find)(node, tag, class_)
+            return descend(found, position + 1)
+
+        def descend(found, position):
+            if position == len(steps):
+                return found
+            if isinstance(found, list):
+                return [match for node in found for match in _as_list(step(node, position))]
+            return step(found, position)
+
+        def extract(document):
+            tag, class_, many = steps[0]
+            found = (backend.find_all if many else backend.find)(document, tag, class_)
+            if (many and not found) or (not many and found is None):
+                if self.default is None:
+                    raise AttributeError(f"No element matches {self.selector!r}")
+                return self.default
+            nodes = descend(found, 1)
+            if not self.many:
+                return self._finish(value(nodes))
+            if self.index is not None:
+                return self._finish(value(nodes[self.index]))
+            values = [value(node) for node in nodes]
+            if self.clean is not None:
+                return self.clean(values)
+            return values if self.join is None else self.join.join(values)
+
+        return extract
+
+    def _finish(self, value):
+        value = value.strip()
+        return self.clean(value) if self.clean is not None else value
+
+
+# The attributes are the spec's declared options, read by the crawler and by
+# sitemap discovery; grouping them would only add indirection.
+class SiteSpec:  # pylint: disable=too-many-instance-attributes
+    """
+    Declares how a news website is crawled.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        name,
+        *,
+        base_url,
+        archive_url,
+        archive_pattern,
+        article_link,
+        article_url,
+        fields,
+        categories=None,
+        article_pattern=None,
+        sitemaps=None,
+    ):
+        """
+        Initializes the SiteSpec class.
+
+        Args:
+            name (str): The source name, e.g. "bdpratidin".
+            base_url (str): The archive base URL, or the homepage listing the
+                categories if categories is given.
+            archive_url (str): Template of a daily archive URL, formatted with
+                base (the base URL or a category URL) and date, e.g.
+                "{base}?date={date:%Y/%m/%d}".
+            archive_pattern (str): Regular expression matching an archive URL,
+                with the named groups category, year, month and day.
+            article_link (str): Regular expression an archive link (href) must
+                match completely to be an article.
+            article_url (str): Template turning a matching href into the article
+                URL, formatted with href and origin (the archive's scheme and host).
+            fields (dict): Mapping of article field name, one of the FIELDS of
+                ArticleRecord, to Field.
+            categories (Field): Optional field extracting the category URLs from
+                the homepage. Without it, base_url is the only archive base.
+            article_pattern (str): Optional regular expression matching an
+                absolute article URL. With categories, its named group category
+                is the category of the archive that lists the article. It
+                selects the articles among sitemap entries; without it,
+                articles are only discovered from archive pages.
+            sitemaps (tuple): The sitemap and feed URLs. None looks them up in
+                the robots.txt of base_url, an empty tuple disables sitemaps.
+        """
+        self.name = name
+        self.base_url = base_url
+        self.archive_url = archive_url
+        self.archive_pattern = re.compile(archive_pattern)
+        self.article_link = re.compile(article_link)
+        self.article_url = article_url
+        self.fields = fields
+        self.categories = categories
+        self.article_pattern = re.compile(article_pattern) if article_pattern else None
+        self.sitemaps = sitemaps
+
+    @property
+    def host(self):
+        """
+        str: The network location of the website, e.g. "www.bd-pratidin.com".
+        """
+        return urlsplit(self.base_url).netloc
+
+    def archive_urls(self, bases, start, end):
+        """
+        Generates the daily archive URLs of each base for a date range.
+
+        Args:
+            bases (list): Base or category URLs, or a single URL.
+            start (datetime): The first archive date.
+            end (datetime): The last archive date.
+
+        Yields:
+            str: The archive URLs, base by base.
+        """
+        if isinstance(bases, str):
+            bases = [bases]
+        for base in bases:
+            current_date = start
+            while current_date <= end:
+                yield self.archive_url.format(base=base, date=current_date)
+                current_date += timedelta(days=1)
+
+    def archive_key(self, url):
+        """
+        Returns the category and date of an archive URL.
+
+        Args:
+            url (str): The archive URL.
+
+        Returns:
+            tuple: (category, date), e.g. ("cricket", date(2024, 3, 31)).
+
+        Raises:
+            ValueError: If the URL does not match archive_pattern.
+        """
+        match = self.archive_pattern.match(url)
+        if match is None:
+            raise ValueError(f"Not a {self.name} archive URL: {url}")
+        day = date(int(match["year"]), int(match["month"]), int(match["day"]))
+        return match["category"], day
+
+    def article_links(self, hrefs, archive_url):
+        """
+        Selects the article links among the links of an archive page.
+
+        Args:
+            hrefs (list): The href of every link on the page, in page order.
+            archive_url (str): The URL of the archive page.
+
+        Returns:
+            list: Article URLs in page order, without duplicates.
+        """
+        parts = urlsplit(archive_url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        article_urls = {}
+        for href in hrefs:
+            if self.article_link.fullmatch(href):
+                article_urls[self.article_url.format(href=href, origin=origin)] = None
+        return list(article_urls)
+
+    def archive_category(self, url):
+        """
+        Checks whether an absolute URL is an article and returns the category of
+        the archive that lists it, as archive_key() does for that archive.
+
+        Websites without categories list every article in the archive of
+        base_url, e.g. "first-page" for BD Pratidin.
+
+        Args:
+            url (str): The URL, e.g. from a sitemap.
+
+        Returns:
+            str: The category, "" if the pattern has none, or None if the URL
+                is not an article or the spec has no article_pattern.
+        """
+        match = self.article_pattern.match(url) if self.article_pattern else None
+        if match is None:
+            return None
+        if self.categories is None:
+            archive_url = self.archive_url.format(base=self.base_url, date=date.today())
+            return self.archive_key(archive_url)[0]
+        return match.groupdict().get("category") or ""
+
+    def compile(self, backend):
+        """
+        Binds every field to an extraction backend.
+
+        Args:
+            backend: The extraction backend.
+
+        Returns:
+            dict: Mapping of field name to a callable taking a parsed document.
+        """
+        return {name: field.compile(backend) for name, field in self.fields.items()}
+
+
+def _as_list(result):
+    return result if isinstance(result, list) else [result]
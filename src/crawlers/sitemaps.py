@@ -0,0 +1,270 @@
+"""
+Sitemap Discovery Module.
+
+This module finds the articles of a date range from a website's XML sitemaps,
+Google News sitemaps and RSS or Atom feeds instead of its archive pages. The
+documents are read with a streaming parser that keeps one entry in memory at a
+time, sitemap indexes are followed level by level with concurrent fetches, and
+index entries last modified before the date range are skipped. The sitemaps are
+listed by the website's spec or found in its robots.txt.
+
+News sitemaps and feeds usually list the last few days only, so discovery only
+answers for a date range its documents reach back to, and within the document
+limit; otherwise the crawler reads the archive pages instead. Entries are
+selected by their publication date. A modification time (lastmod) only shows
+that an article was published no later than it, so entries dated by one alone
+are kept from the start of the range on and dated from the article page.
+"""
+
+import gzip
+import io
+import re
+import xml.etree.ElementTree as ET
+from collections import namedtuple
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from urllib.parse import urljoin, urlsplit
+
+import requests
+
+from src.crawlers.bn_dates import BANGLADESH_TZ
+
+SitemapEntry = namedtuple("SitemapEntry", ["url", "published", "lastmod"])
+
+_SITEMAP_LINE = re.compile(rb"^\s*sitemap\s*:\s*(\S+)", re.IGNORECASE | re.MULTILINE)
+# Sitemap <url>, sitemap index <sitemap>, RSS <item> and Atom <entry> elements.
+_ENTRY_TAGS = frozenset({"url", "sitemap", "item", "entry"})
+_ROOT_TAGS = frozenset({"urlset", "sitemapindex", "rss", "feed", "RDF"})
+_PUBLISHED_TAGS = ("publication_date", "pubDate", "published")
+_MODIFIED_TAGS = ("lastmod", "updated")
+
+
+def parse_timestamp(text):
+    """
+    Parses a W3C (ISO 8601) or RFC 822 timestamp.
+
+    Args:
+        text (str): The timestamp, e.g. "2024-03-31T10:15:00+06:00",
+            "2024-03-31" or "Sun, 31 Mar 2024 10:15:00 +0600".
+
+    Returns:
+        datetime: A timezone-aware datetime, in Bangladesh time when the text
+            has no offset, or None if the text is not a timestamp.
+    """
+    text = (text or "").strip()
+    try:
+        parsed = datetime.fromisoformat(text.replace("Z", "+00:00"))
+    except ValueError:
+        try:
+            parsed = parsedate_to_datetime(text)
+        except (TypeError, ValueError, IndexError):
+            return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=BANGLADESH_TZ)
+
+
+def sitemaps_from_robots(content, robots_url):
+    """
+    Lists the sitemaps announced in a robots.txt file.
+
+    Args:
+        content (bytes): The robots.txt body.
+        robots_url (str): The URL it was fetched from, to resolve relative paths.
+
+    Returns:
+        list: The sitemap URLs.
+    """
+    return [
+        urljoin(robots_url, match.decode("utf-8", "replace"))
+        for match in _SITEMAP_LINE.findall(content)
+    ]
+
+
+def iter_entries(content):
+    """
+    Streams the entries of a sitemap, sitemap index, RSS or Atom document.
+
+    Args:
+        content (bytes): The document, gzip compressed or not.
+
+    Yields:
+        tuple: (kind, url, published, modified) where kind is "sitemap" for an
+            entry of a sitemap index and "url" otherwise, and either timestamp
+            may be None.
+
+    Raises:
+        xml.etree.ElementTree.ParseError: If the document is not XML.
+        ValueError: If it is XML but neither a sitemap nor a feed, such as the
+            HTML of an error page.
+    """
+    stream = io.BytesIO(content)
+    if content[:2] == b"\x1f\x8b":
+        stream = gzip.GzipFile(fileobj=stream)
+    depth = 0
+    root = None
+    for event, element in ET.iterparse(stream, events=("start", "end")):
+        tag = _local_name(element.tag)
+        if root is None:
+            root = tag
+            if root not in _ROOT_TAGS:
+                raise ValueError(f"Not a sitemap or feed: <{root}>")
+        if tag not in _ENTRY_TAGS:
+            continue
+        # Only top-level entries count; an Atom <entry> can nest a <url>.
+        if event == "start":
+            depth += 1
+            continue
+        depth -= 1
+        if depth:
+            continue
+        url, published, modified = _entry_fields(element)
+        if url:
+            yield ("sitemap" if tag == "sitemap" else "url"), url, published, modified
+        element.clear()
+
+
+class SitemapDiscovery:
+    """
+    Lists the article URLs a website's sitemaps and feeds publish in a date range.
+    """
+
+    def __init__(self, engine, *, max_documents=500):
+        """
+        Initializes the SitemapDiscovery class.
+
+        Args:
+            engine (AsyncFetchEngine): Fetches the documents, one level of the
+                sitemap index tree at a time.
+            max_documents (int): Upper bound on the documents read per discovery.
+                Websites with more are crawled from their archive pages.
+        """
+        self.engine = engine
+        self.max_documents = max_documents
+        self.stats = {}
+
+    def locate(self, spec):
+        """
+        Returns the sitemaps and feeds of a website.
+
+        Args:
+            spec (SiteSpec): The website.
+
+        Returns:
+            list: The spec's sitemaps, or those announced in the robots.txt of
+                its base URL, which may be none.
+        """
+        if spec.sitemaps is not None:
+            return list(spec.sitemaps)
+        parts = urlsplit(spec.base_url)
+        robots_url = f"{parts.scheme}://{parts.netloc}/robots.txt"
+        result = self.engine.fetch_all([robots_url])[0]
+        if result.error is not None:
+            return []
+        return sitemaps_from_robots(result.content, robots_url)
+
+    def discover(self, sitemap_urls, start, end):
+        """
+        Reads sitemaps and feeds and selects the entries of a date range.
+
+        Args:
+            sitemap_urls (list): The sitemap, sitemap index and feed URLs.
+            start (datetime): The first day of the range.
+            end (datetime): The last day of the range.
+
+        Returns:
+            list: SitemapEntry tuples published within the range, or only
+                modified since its start, in document order. None if no
+                document could be read, none reaches back to the start of the
+                range, or the sitemaps hold more than max_documents documents.
+        """
+        window = (start.date(), end.date())
+        self.stats = {"documents": 0, "unreadable": 0, "entries": 0, "undated": 0,
+                      "unconfirmed": 0}
+        entries, seen, oldest = {}, set(), None
+        level = list(dict.fromkeys(sitemap_urls))
+        while level:
+            if self.stats["documents"] + len(level) > self.max_documents:
+                # A partial listing would silently miss articles.
+                print(f"Sitemaps hold more than {self.max_documents} documents")
+                return None
+            seen.update(level)
+            children = []
+            for result in self.engine.fetch_all(level):
+                self.stats["documents"] += 1
+                try:
+                    day = self._read(result, window, entries, children)
+                except (ET.ParseError, ValueError, OSError, EOFError,
+                        requests.RequestException) as e:
+                    print("Failed to read sitemap:", result.url, e)
+                    self.stats["unreadable"] += 1
+                    continue
+                if day is not None and (oldest is None or day < oldest):
+                    oldest = day
+            level = [url for url in dict.fromkeys(children) if url not in seen]
+        if self.stats["documents"] == self.stats["unreadable"]:
+            return None
+        if oldest is None or oldest > window[0]:
+            print("Sitemaps do not reach back to", window[0])
+            return None
+        return list(entries.values())
+
+    def _read(self, result, window, entries, children):
+        # Adds the selected entries of one document and its index entries that
+        # may hold some, and returns the oldest day the document mentions.
+        if result.error is not None:
+            raise result.error
+        oldest = None
+        for kind, url, published, modified in iter_entries(result.content):
+            day = _day(published or modified)
+            if day is not None and (oldest is None or day < oldest):
+                oldest = day
+            if kind == "sitemap":
+                # An index entry modified before the range holds no article of it.
+                if day is None or day >= window[0]:
+                    children.append(url)
+            else:
+                self._select(SitemapEntry(url, published, modified), window, entries)
+        return oldest
+
+    def _select(self, entry, window, entries):
+        self.stats["entries"] += 1
+        if entry.published is not None:
+            if not window[0] <= _day(entry.published) <= window[1]:
+                return
+        elif entry.lastmod is not None:
+            if _day(entry.lastmod) < window[0]:
+                return
+            self.stats["unconfirmed"] += 1
+        else:
+            self.stats["undated"] += 1
+            return
+        current = entries.get(entry.url)
+        if current is None or current.published is None:
+            entries[entry.url] = entry
+
+
+def _day(timestamp):
+    return timestamp.astimezone(BANGLADESH_TZ).date() if timestamp is not None else None
+
+
+def _local_name(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def _entry_fields(element):
+    url, dates = None, {}
+    for child in element.iter():
+        tag = _local_name(child.tag)
+        if tag in ("loc", "link") and url is None:
+            # RSS links are text, Atom links are an href attribute.
+            url = (child.get("href") or child.text or "").strip() or None
+        elif tag in _PUBLISHED_TAGS + _MODIFIED_TAGS and tag not in dates:
+            dates[tag] = child.text
+    return url, _first_timestamp(dates, _PUBLISHED_TAGS), _first_timestamp(dates, _MODIFIED_TAGS)
+
+
+def _first_timestamp(dates, tags):
+    for tag in tags:
+        timestamp = parse_timestamp(dates.get(tag))
+        if timestamp is not None:
+            return timestamp
+    return None
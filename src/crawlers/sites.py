@@ -0,0 +1,103 @@
+"""
+Site Specifications Module.
+
+This module holds the declarative specs of the crawled news websites. Adding a
+website means adding a SiteSpec here; SiteCrawler provides the fetching,
+parsing, deduplication and storage for every spec.
+"""
+
+from src.crawlers.site_spec import Field, SiteSpec
+
+# BanglaNews24 articles end with a dateline or a credit line that is not part
+# of the article text.
+_BN24_TRAILERS = ("বাংলাদেশ সময়:", "সৌজন্যে:")
+
+
+def bn24_content(paragraphs):
+    """
+    Joins the sentences of BanglaNews24 paragraphs, dropping the trailers.
+
+    Args:
+        paragraphs (list): The text of each paragraph.
+
+    Returns:
+        str: The sentences of every paragraph up to its dateline or credit line.
+    """
+    sentences = []
+    for paragraph in paragraphs:
+        for sentence in paragraph.replace("\n", " ").strip().split("."):
+            if sentence.strip().startswith(_BN24_TRAILERS):
+                break
+            sentences.append(sentence)
+    return " ".join(sentences)
+
+
+def bn24_date(text):
+    """
+    Removes the "updated" label from a BanglaNews24 date.
+
+    Args:
+        text (str): The date text.
+
+    Returns:
+        str: The date.
+    """
+    return text.replace("আপডেট:", "").strip()
+
+
+def bn24_author(text):
+    """
+    Keeps the author of a BanglaNews24 byline.
+
+    Args:
+        text (str): The byline, e.g. "স্টাফ করেসপন্ডেন্ট | বাংলানিউজটোয়েন্টিফোর.কম".
+
+    Returns:
+        str: The part before the first "|".
+    """
+    return text.split("|")[0]
+
+
+BDPRATIDIN = SiteSpec(
+    "bdpratidin",
+    base_url="https://www.bd-pratidin.com/first-page/",
+    archive_url="{base}{date:%Y/%m/%d}/{date.day}",
+    archive_pattern=(
+        r"^https?://[^/]+/(?P<category>.+)/(?P<year>\d{4})/(?P<month>\d{2})/(?P<day>\d{2})/\d+$"
+    ),
+    # Relative links such as "country/2024/03/30/982345".
+    article_link=r"[^/]*/20[^/]*/[^/]*/[^/]*/[^/]*",
+    article_url="{origin}/{href}",
+    article_pattern=r"^https?://[^/]+/[^/]+/\d{4}/\d{2}/\d{2}/\d+$",
+    fields={
+        "title": Field("h1", strip=True),
+        "date": Field("div[row p-3] > span", strip=True),
+        "author": Field("div[news-info ps-3 my-3] > h2", strip=True),
+        "content": Field("p*", strip=True, join="\n"),
+        "category": Field("ol[breadcrumb] > li*", strip=True, index=-2),
+    },
+)
+
+BANGLANEWS24 = SiteSpec(
+    "banglanews24",
+    base_url="https://www.banglanews24.com/",
+    archive_url="{base}?date={date:%Y/%m/%d}",
+    archive_pattern=(
+        r"^https?://[^/]+/(?P<category>[^?]*?)/?"
+        r"\?date=(?P<year>\d{4})/(?P<month>\d{2})/(?P<day>\d{2})$"
+    ),
+    # Absolute links such as "https://www.banglanews24.com/cricket/news/bd/1306708.details".
+    article_link=r"[^/]*/[^/]*/[^/]*/[^/]*/news/bd/[^/]*",
+    article_url="{href}",
+    article_pattern=r"^https?://[^/]+/(?P<category>[^/]+)/news/bd/\d+\.details$",
+    fields={
+        "title": Field("img[lazy-load]", attr="alt"),
+        "date": Field("span[time]", clean=bn24_date),
+        "author": Field("div[row news-source] > span", clean=bn24_author),
+        "content": Field("article > p*", clean=bn24_content, default=None),
+        "category": Field("div[section-page-title] > h1"),
+    },
+    categories=Field("li[dropdown]* > a", attr="href", join=None, default=[]),
+)
+
+SITES = {spec.name: spec for spec in (BDPRATIDIN, BANGLANEWS24)}
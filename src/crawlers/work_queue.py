@@ -0,0 +1,536 @@
+"""
+Work Queue Module.
+
+This module provides the lease-based task queue shared by a crawl coordinator
+and its workers. A task is the daily archive page of one source and category.
+A worker claims tasks under a lease, renews the lease while it crawls them, and
+completes or fails each one. A lease that is not renewed in time expires, and
+its task is queued again, so the tasks of a crashed worker are picked up by the
+others.
+
+Two backends share one interface: SqliteWorkQueue keeps the queue in a SQLite
+file for the workers of one machine, and RedisWorkQueue keeps it on a Redis
+compatible server for workers spread over several machines.
+"""
+
+import contextlib
+import json
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+QUEUED = "queued"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+Task = namedtuple("Task", ["task_id", "source", "category", "day", "url", "attempts"])
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    task_id TEXT NOT NULL UNIQUE,
+    source TEXT NOT NULL,
+    category TEXT NOT NULL,
+    day TEXT NOT NULL,
+    url TEXT NOT NULL,
+    status TEXT NOT NULL,
+    worker TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, lease_expires);
+"""
+
+
+def make_task(source, category, day, url):
+    """
+    Builds a queued task for an archive page.
+
+    Args:
+        source (str): The source name, e.g. "banglanews24".
+        category (str): The category, or "" for websites without categories.
+        day (date): The archive date.
+        url (str): The archive URL.
+
+    Returns:
+        Task: The task, identified by source, category and day.
+    """
+    day = day.isoformat()
+    return Task(f"{source}|{category}|{day}", source, category, day, url, 0)
+
+
+def open_queue(location, **kwargs):
+    """
+    Opens the work queue at a location.
+
+    Args:
+        location (str): A redis:// or rediss:// URL, or the path of a SQLite file.
+        **kwargs: Options of the queue class.
+
+    Returns:
+        SqliteWorkQueue or RedisWorkQueue: The queue.
+
+    Raises:
+        ImportError: If a Redis URL is given without the redis package.
+    """
+    if location.startswith(("redis://", "rediss://")):
+        if redis is None:
+            raise ImportError("A Redis work queue requires the redis package")
+        return RedisWorkQueue(redis.Redis.from_url(location), **kwargs)
+    return SqliteWorkQueue(location, **kwargs)
+
+
+class SqliteWorkQueue:
+    """
+    A lease-based work queue in a SQLite file.
+
+    Every claim runs in an immediate transaction, so any number of worker
+    processes on the machine can share the file.
+    """
+
+    def __init__(self, path, *, lease_seconds=300.0, max_attempts=5):
+        """
+        Initializes the SqliteWorkQueue class.
+
+        Args:
+            path (str): The SQLite database file, created if missing.
+            lease_seconds (float): How long a claim lasts unless it is renewed.
+            max_attempts (int): Number of claims after which a task that still
+                fails or expires is marked failed instead of queued again.
+        """
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None, timeout=60
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """
+        Closes the database connection.
+        """
+        with self._lock:
+            self._conn.close()
+
+    def put(self, tasks):
+        """
+        Queues tasks that are not in the queue yet.
+
+        Args:
+            tasks (iterable): Tasks built with make_task().
+
+        Returns:
+            int: The number of tasks added.
+        """
+        now = time.time()
+        with self._transaction():
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO tasks "
+                "(task_id, source, category, day, url, status, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (task.task_id, task.source, task.category, task.day, task.url, QUEUED, now)
+                    for task in tasks
+                ),
+            )
+            return self._conn.total_changes - before
+
+    def claim(self, worker, limit=1):
+        """
+        Leases queued tasks to a worker, queuing expired leases again first.
+
+        Args:
+            worker (str): The worker ID.
+            limit (int): Maximum number of tasks to claim.
+
+        Returns:
+            list: The claimed tasks, oldest first.
+        """
+        now = time.time()
+        with self._transaction():
+            self._requeue_expired(now)
+            rows = self._conn.execute(
+                "SELECT task_id, source, category, day, url, attempts FROM tasks "
+                "WHERE status = ? ORDER BY rowid LIMIT ?",
+                (QUEUED, limit),
+            ).fetchall()
+            self._conn.executemany(
+                "UPDATE tasks SET status = ?, worker = ?, lease_expires = ?, "
+                "attempts = attempts + 1, updated_at = ? WHERE task_id = ?",
+                ((LEASED, worker, now + self.lease_seconds, now, row[0]) for row in rows),
+            )
+        return [Task(*row[:5], row[5] + 1) for row in rows]
+
+    def renew(self, worker, task_ids):
+        """
+        Extends the leases a worker still holds.
+
+        Args:
+            worker (str): The worker ID.
+            task_ids (iterable): The IDs of the worker's tasks.
+
+        Returns:
+            list: The IDs whose lease was extended. The others were lost to expiry.
+        """
+        now = time.time()
+        renewed = []
+        with self._transaction():
+            for task_id in task_ids:
+                cursor = self._conn.execute(
+                    "UPDATE tasks SET lease_expires = ?, updated_at = ? "
+                    "WHERE task_id = ? AND status = ? AND worker = ? AND lease_expires >= ?",
+                    (now + self.lease_seconds, now, task_id, LEASED, worker, now),
+                )
+                if cursor.rowcount:
+                    renewed.append(task_id)
+        return renewed
+
+    def complete(self, worker, task_id):
+        """
+        Marks a leased task as done.
+
+        Args:
+            worker (str): The worker ID.
+            task_id (str): The task ID.
+
+        Returns:
+            bool: False if the worker no longer held the lease.
+        """
+        with self._transaction():
+            cursor = self._conn.execute(
+                "UPDATE tasks SET status = ?, lease_expires = NULL, updated_at = ? "
+                "WHERE task_id = ? AND status = ? AND worker = ?",
+                (DONE, time.time(), task_id, LEASED, worker),
+            )
+            return cursor.rowcount > 0
+
+    def fail(self, worker, task_id, error):
+        """
+        Releases a leased task after a failure, queuing it again unless it has
+        used all its attempts.
+
+        Args:
+            worker (str): The worker ID.
+            task_id (str): The task ID.
+            error: The error, stored as text.
+
+        Returns:
+            bool: False if the worker no longer held the lease.
+        """
+        with self._transaction():
+            cursor = self._conn.execute(
+                "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, "
+                "lease_expires = NULL, error = ?, updated_at = ? "
+                "WHERE task_id = ? AND status = ? AND worker = ?",
+                (self.max_attempts, FAILED, QUEUED, str(error), time.time(),
+                 task_id, LEASED, worker),
+            )
+            return cursor.rowcount > 0
+
+    def requeue_expired(self):
+        """
+        Queues the tasks whose lease expired again.
+
+        Returns:
+            int: The number of expired leases.
+        """
+        with self._transaction():
+            return self._requeue_expired(time.time())
+
+    def counts(self):
+        """
+        Returns the number of tasks per status.
+
+        Returns:
+            dict: Mapping of status to count.
+        """
+        counts = dict.fromkeys((QUEUED, LEASED, DONE, FAILED), 0)
+        with self._lock:
+            counts.update(
+                self._conn.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status")
+            )
+        return counts
+
+    def _requeue_expired(self, now):
+        cursor = self._conn.execute(
+            "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, "
+            "error = CASE WHEN attempts >= ? THEN 'lease expired' ELSE error END, "
+            "lease_expires = NULL, updated_at = ? WHERE status = ? AND lease_expires < ?",
+            (self.max_attempts, FAILED, QUEUED, self.max_attempts, now, LEASED, now),
+        )
+        return cursor.rowcount
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+
+# Each script runs atomically on the server, so a worker that dies between two
+# commands can never leave a task neither queued nor leased.
+_PUT = """
+if redis.call('HSETNX', KEYS[1], ARGV[1], ARGV[2]) == 0 then return 0 end
+redis.call('RPUSH', KEYS[2], ARGV[1])
+return 1
+"""
+
+_CLAIM = """
+local claimed = {}
+for _ = 1, tonumber(ARGV[3]) do
+    local id = redis.call('LPOP', KEYS[1])
+    if not id then break end
+    redis.call('ZADD', KEYS[2], ARGV[2], id)
+    redis.call('HSET', KEYS[3], id, ARGV[1])
+    redis.call('HINCRBY', KEYS[4], id, 1)
+    table.insert(claimed, id)
+end
+return claimed
+"""
+
+_REQUEUE_EXPIRED = """
+local expired = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', '(' .. ARGV[1])
+for _, id in ipairs(expired) do
+    redis.call('ZREM', KEYS[1], id)
+    redis.call('HDEL', KEYS[2], id)
+    if tonumber(redis.call('HGET', KEYS[4], id) or '0') >= tonumber(ARGV[2]) then
+        redis.call('HSET', KEYS[5], id, 'lease expired')
+    else
+        redis.call('RPUSH', KEYS[3], id)
+    end
+end
+return #expired
+"""
+
+_RENEW = """
+local renewed = {}
+for i = 4, #ARGV do
+    local id = ARGV[i]
+    local expires = redis.call('ZSCORE', KEYS[1], id)
+    if redis.call('HGET', KEYS[2], id) == ARGV[1] and expires
+            and tonumber(expires) >= tonumber(ARGV[3]) then
+        redis.call('ZADD', KEYS[1], ARGV[2], id)
+        table.insert(renewed, id)
+    end
+end
+return renewed
+"""
+
+_RELEASE = """
+if redis.call('HGET', KEYS[2], ARGV[2]) ~= ARGV[1] then return 0 end
+redis.call('ZREM', KEYS[1], ARGV[2])
+redis.call('HDEL', KEYS[2], ARGV[2])
+if ARGV[3] == 'done' then
+    redis.call('SADD', KEYS[3], ARGV[2])
+elseif tonumber(redis.call('HGET', KEYS[5], ARGV[2]) or '0') >= tonumber(ARGV[4]) then
+    redis.call('HSET', KEYS[6], ARGV[2], ARGV[5])
+else
+    redis.call('RPUSH', KEYS[4], ARGV[2])
+end
+return 1
+"""
+
+
+class RedisWorkQueue:
+    """
+    A lease-based work queue on a Redis compatible server.
+
+    Queued task IDs are a list, leases a sorted set scored by expiry time, and
+    every state change runs as a server-side script.
+    """
+
+    def __init__(self, client, *, name="bdcrawler", lease_seconds=300.0, max_attempts=5):
+        """
+        Initializes the RedisWorkQueue class.
+
+        Args:
+            client: A redis.Redis client, or any client with the same commands.
+            name (str): The prefix of the queue's keys.
+            lease_seconds (float): How long a claim lasts unless it is renewed.
+            max_attempts (int): Number of claims after which a task that still
+                fails or expires is marked failed instead of queued again.
+        """
+        self.client = client
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._keys = {
+            key: f"{name}:{key}"
+            for key in ("tasks", "queue", "leases", "owners", "attempts", "done", "failed")
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """
+        Closes the client's connections.
+        """
+        self.client.close()
+
+    def put(self, tasks):
+        """
+        Queues tasks that are not in the queue yet.
+
+        Args:
+            tasks (iterable): Tasks built with make_task().
+
+        Returns:
+            int: The number of tasks added.
+        """
+        added = 0
+        for task in tasks:
+            record = json.dumps([task.source, task.category, task.day, task.url])
+            added += self.client.eval(
+                _PUT, 2, self._keys["tasks"], self._keys["queue"], task.task_id, record
+            )
+        return added
+
+    def claim(self, worker, limit=1):
+        """
+        Leases queued tasks to a worker, queuing expired leases again first.
+
+        Args:
+            worker (str): The worker ID.
+            limit (int): Maximum number of tasks to claim.
+
+        Returns:
+            list: The claimed tasks, oldest first.
+        """
+        self.requeue_expired()
+        keys = self._keys
+        task_ids = [
+            _text(task_id)
+            for task_id in self.client.eval(
+                _CLAIM, 4, keys["queue"], keys["leases"], keys["owners"], keys["attempts"],
+                worker, time.time() + self.lease_seconds, limit,
+            )
+        ]
+        if not task_ids:
+            return []
+        records = self.client.hmget(keys["tasks"], task_ids)
+        attempts = self.client.hmget(keys["attempts"], task_ids)
+        return [
+            Task(task_id, *json.loads(record), int(count))
+            for task_id, record, count in zip(task_ids, records, attempts)
+        ]
+
+    def renew(self, worker, task_ids):
+        """
+        Extends the leases a worker still holds.
+
+        Args:
+            worker (str): The worker ID.
+            task_ids (iterable): The IDs of the worker's tasks.
+
+        Returns:
+            list: The IDs whose lease was extended. The others were lost to expiry.
+        """
+        task_ids = list(task_ids)
+        if not task_ids:
+            return []
+        now = time.time()
+        # A lease that already expired stays lost, as in SqliteWorkQueue, even
+        # if no claim has queued its task again yet.
+        renewed = self.client.eval(
+            _RENEW, 2, self._keys["leases"], self._keys["owners"],
+            worker, now + self.lease_seconds, now, *task_ids,
+        )
+        return [_text(task_id) for task_id in renewed]
+
+    def complete(self, worker, task_id):
+        """
+        Marks a leased task as done.
+
+        Args:
+            worker (str): The worker ID.
+            task_id (str): The task ID.
+
+        Returns:
+            bool: False if the worker no longer held the lease.
+        """
+        return self._release(worker, task_id, DONE, "")
+
+    def fail(self, worker, task_id, error):
+        """
+        Releases a leased task after a failure, queuing it again unless it has
+        used all its attempts.
+
+        Args:
+            worker (str): The worker ID.
+            task_id (str): The task ID.
+            error: The error, stored as text.
+
+        Returns:
+            bool: False if the worker no longer held the lease.
+        """
+        return self._release(worker, task_id, FAILED, str(error))
+
+    def requeue_expired(self):
+        """
+        Queues the tasks whose lease expired again.
+
+        Returns:
+            int: The number of expired leases.
+        """
+        keys = self._keys
+        return self.client.eval(
+            _REQUEUE_EXPIRED, 5,
+            keys["leases"], keys["owners"], keys["queue"], keys["attempts"], keys["failed"],
+            time.time(), self.max_attempts,
+        )
+
+    def counts(self):
+        """
+        Returns the number of tasks per status.
+
+        Returns:
+            dict: Mapping of status to count.
+        """
+        keys = self._keys
+        return {
+            QUEUED: self.client.llen(keys["queue"]),
+            LEASED: self.client.zcard(keys["leases"]),
+            DONE: self.client.scard(keys["done"]),
+            FAILED: self.client.hlen(keys["failed"]),
+        }
+
+    def _release(self, worker, task_id, outcome, error):
+        keys = self._keys
+        released = self.client.eval(
+            _RELEASE, 6,
+            keys["leases"], keys["owners"], keys["done"], keys["queue"],
+            keys["attempts"], keys["failed"],
+            worker, task_id, outcome, self.max_attempts, error,
+        )
+        return bool(released)
+
+
+def _text(value):
+    return value.decode("utf-8") if isinstance(value, bytes) else value
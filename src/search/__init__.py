@@ -0,0 +1,3 @@
+"""
+Search over the crawled Bengali news corpus.
+"""
@@ -0,0 +1,666 @@
+"""
+Inverted Index Module.
+
+This module indexes crawler output for keyword, phrase, category, source and
+date queries without loading the corpus into memory. The title and content of
+every article are tokenized with the regex segmenter (or the indic word
+tokenizer) and written to immutable segments, one per batch of articles. A
+segment stores, per term, the documents and word positions as variable-byte
+encoded gaps in blocks of 128 documents, with a skip table of the last document
+of every block, so intersecting a rare term with a frequent one only decodes
+the blocks it needs. Categories and sources are indexed as reserved terms, and
+publication timestamps as a sorted column for date ranges. All files are
+memory-mapped and read in place.
+
+Indexing is incremental: articles whose URL is already indexed are skipped, and
+new ones go to new segments listed in the manifest, which merge() compacts.
+Only one writer may update an index at a time, and it removes the unlisted
+segments a crashed writer left behind; readers see the segments listed when
+they were opened.
+
+Run from the repository root:
+    python -m src.search.inverted_index build data/NewsArticle.json data/bdpratidin_articles
+    python -m src.search.inverted_index search '"সাকিব আল হাসান" টেস্ট' --category ক্রিকেট
+"""
+
+import argparse
+import hashlib
+import heapq
+import json
+import math
+import os
+import re
+import shutil
+import time
+import unicodedata
+from array import array
+from collections import namedtuple
+from datetime import datetime
+
+from src.crawlers.article_record import ArticleRecord
+from src.crawlers.article_store import iter_articles
+from src.crawlers.bn_dates import BANGLADESH_TZ
+from src.crawlers.parquet_export import source_of
+from src.search.segments import (
+    FORMAT,
+    NO_DATE,
+    Cursor,
+    Segment,
+    SegmentBuilder,
+    encode_varints,
+    has_phrase,
+)
+from src.tokenization.bn_segmenter import iter_tokens
+
+METHODS = ("native", "indic")
+MANIFEST = "manifest.json"
+
+Hit = namedtuple("Hit", ["url", "title", "date", "category", "source", "published", "score"])
+
+# Categories and sources are terms no token can be, since tokens hold no NUL.
+_CATEGORY = "\0category\0"
+_SOURCE = "\0source\0"
+# Positions of the content start after a gap, so phrases do not span the title.
+_TITLE_GAP = 1
+_TOKEN_KINDS = frozenset({"word", "last", "number", "abbr"})
+_DIGITS = str.maketrans("০১২৩৪৫৬৭৮৯", "0123456789")
+_ALNUM = re.compile(r"\w")
+_QUERY = re.compile(r'"([^"]*)"?|(\S+)')
+# BM25 parameters.
+_K1 = 1.2
+_B = 0.75
+
+
+def index_terms(text, method="native"):
+    """
+    Splits text into the terms the index stores.
+
+    Text is NFC normalized, Bengali digits become ASCII digits and Latin
+    letters are case-folded, so queries match however they were typed.
+    Punctuation is dropped.
+
+    Args:
+        text (str): The text.
+        method (str): "native" for the regex segmenter, or "indic" for the
+            indic word tokenizer of bn_tokenizer_v2.
+
+    Returns:
+        list: The terms in order.
+
+    Raises:
+        ValueError: If the method is unknown.
+    """
+    text = unicodedata.normalize("NFC", text or "").casefold()
+    if method == "native":
+        # Only numbers are translated; translating the whole text costs more
+        # than segmenting it.
+        return [
+            text[start:end].translate(_DIGITS) if kind == "number" else text[start:end]
+            for start, end, kind in iter_tokens(text)
+            if kind in _TOKEN_KINDS
+        ]
+    if method == "indic":
+        # pylint: disable=import-outside-toplevel
+        from src.tokenization.bn_tokenizer_v2 import tokenize_words
+
+        return [token for token in tokenize_words(text.translate(_DIGITS)) if _ALNUM.search(token)]
+    raise ValueError(f"Unknown tokenization method: {method}")
+
+
+def parse_query(text, method="native"):
+    """
+    Splits a query into phrases.
+
+    Quoted text is a phrase; any other word is a phrase of its own terms, so a
+    hyphenated word such as "বাংলাদেশ-শ্রীলঙ্কা" must match as written.
+
+    Args:
+        text (str): The query, e.g. '"সাকিব আল হাসান" টেস্ট'.
+        method (str): The tokenization method of the index.
+
+    Returns:
+        list: One tuple of terms per phrase, without empty phrases.
+    """
+    phrases = []
+    for quoted, word in _QUERY.findall(text or ""):
+        terms = tuple(index_terms(quoted or word, method))
+        if terms:
+            phrases.append(terms)
+    return phrases
+
+
+def url_key(url):
+    """
+    Hashes an article URL into the 64-bit key the index deduplicates on.
+
+    Args:
+        url (str): The article URL.
+
+    Returns:
+        int: The key.
+    """
+    return int.from_bytes(hashlib.blake2b(url.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _timestamp(value):
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=BANGLADESH_TZ)
+        return int(value.timestamp())
+    return int(value)
+
+
+def _read_manifest(directory):
+    path = os.path.join(directory, MANIFEST)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_manifest(directory, manifest):
+    path = os.path.join(directory, MANIFEST)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(path + ".tmp", path)
+
+
+class IndexWriter:  # pylint: disable=too-many-instance-attributes
+    """
+    Adds articles to an index directory, one segment per batch.
+    """
+
+    def __init__(self, directory, *, method="native", segment_size=20000):
+        """
+        Initializes the IndexWriter class.
+
+        Args:
+            directory (str): The index directory, created if missing.
+            method (str): The tokenization method of a new index. An existing
+                index keeps the method it was built with.
+            segment_size (int): Number of articles buffered in memory before
+                they are written as a segment.
+
+        Raises:
+            ValueError: If the method is unknown.
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.manifest = _read_manifest(directory) or {
+            "format": FORMAT,
+            "method": method,
+            "segments": [],
+            "next_segment": 0,
+        }
+        self.method = self.manifest["method"]
+        if self.method not in METHODS:
+            raise ValueError(f"Unknown tokenization method: {self.method}")
+        # A writer that stopped before publishing a segment left its directory
+        # unlisted, and the next segment would be written under the same name.
+        listed = set(self.manifest["segments"])
+        for name in os.listdir(directory):
+            if name.startswith("segment-") and name not in listed:
+                shutil.rmtree(os.path.join(directory, name))
+        self.segment_size = segment_size
+        self.stats = {"added": 0, "duplicates": 0}
+        self._segments = [
+            Segment(os.path.join(directory, name)) for name in self.manifest["segments"]
+        ]
+        self._reset()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _reset(self):
+        self._documents = []
+        self._keys = set()
+        self._postings = {}
+        self._tokens = 0
+
+    def add(self, article):
+        """
+        Buffers an article for the next segment.
+
+        Args:
+            article (ArticleRecord or dict): The article.
+
+        Returns:
+            bool: False if an article with the same URL is already indexed.
+        """
+        if isinstance(article, dict):
+            article = ArticleRecord.from_dict(article)
+        if not article.url:
+            return False
+        key = url_key(article.url)
+        if key in self._keys or any(segment.has_url(key) for segment in self._segments):
+            self.stats["duplicates"] += 1
+            return False
+        source = source_of(article.url)
+        occurrences, length = self._occurrences(article, source)
+        self._add_postings(len(self._documents), occurrences)
+        stored = {
+            "url": article.url,
+            "title": article.title,
+            "date": article.date,
+            "category": article.category,
+            "source": source,
+            "published": article.published,
+        }
+        published = NO_DATE if article.published is None else article.published
+        self._documents.append((stored, published, length, key))
+        self._keys.add(key)
+        self._tokens += length
+        self.stats["added"] += 1
+        if len(self._documents) >= self.segment_size:
+            self.flush()
+        return True
+
+    def _occurrences(self, article, source):
+        # The positions of each term, and the category and source filters
+        # without positions. Returns them with the number of indexed tokens.
+        title = index_terms(article.title, self.method)
+        content = index_terms(article.content, self.method)
+        occurrences = {}
+        for position, term in enumerate(title):
+            occurrences.setdefault(term, []).append(position)
+        offset = len(title) + _TITLE_GAP
+        for position, term in enumerate(content, offset):
+            occurrences.setdefault(term, []).append(position)
+        for field, value in ((_CATEGORY, article.category), (_SOURCE, source)):
+            if value:
+                occurrences[field + value] = []
+        return occurrences, len(title) + len(content)
+
+    def _add_postings(self, doc, occurrences):
+        for term, positions in occurrences.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                # Documents, term frequencies, encoded positions and their lengths.
+                postings = self._postings[term] = (array("I"), array("I"), bytearray(), array("I"))
+            docs, tfs, encoded, lengths = postings
+            size = len(encoded)
+            if positions:
+                encode_varints([b - a for a, b in zip([0] + positions, positions)], encoded)
+            docs.append(doc)
+            tfs.append(len(positions))
+            lengths.append(len(encoded) - size)
+
+    def add_all(self, articles):
+        """
+        Adds articles and writes the last segment.
+
+        Args:
+            articles (iterable): The articles.
+
+        Returns:
+            int: The number of articles added.
+        """
+        added = sum(self.add(article) for article in articles)
+        self.flush()
+        return added
+
+    def flush(self):
+        """
+        Writes the buffered articles as a segment and lists it in the manifest.
+        """
+        if not self._documents:
+            return
+        postings = self._postings
+        name = self._new_segment()
+        lengths = array("I", (document[2] for document in self._documents))
+        builder = SegmentBuilder(os.path.join(self.directory, name), lengths)
+        for term in sorted(postings, key=lambda t: t.encode("utf-8")):
+            builder.add_term(term.encode("utf-8"), self._buffered_postings(postings[term]))
+        builder.finish(self._documents, {"tokens": self._tokens})
+        self._publish([name], [])
+        self._reset()
+
+    def merge(self):
+        """
+        Rewrites every segment as one, so queries open a single segment.
+        """
+        self.flush()
+        if len(self._segments) < 2:
+            return
+        segments = self._segments
+        bases, total = [], 0
+        for segment in segments:
+            bases.append(total)
+            total += segment.documents
+        documents = self._merged_documents(segments)
+        name = self._new_segment()
+        lengths = array("I", (document[2] for document in documents))
+        builder = SegmentBuilder(os.path.join(self.directory, name), lengths)
+        for term, parts in self._merged_terms(segments):
+            builder.add_term(term, self._merged_postings(segments, bases, parts))
+        builder.finish(documents, {"tokens": sum(s.meta["tokens"] for s in segments)})
+        self._publish([name], [segment.path for segment in segments])
+
+    @staticmethod
+    def _merged_documents(segments):
+        documents = []
+        for segment in segments:
+            for doc in range(segment.documents):
+                stored = segment.document(doc)
+                key = url_key(stored["url"])
+                documents.append((stored, segment.published[doc], segment.lengths[doc], key))
+        return documents
+
+    @staticmethod
+    def _merged_terms(segments):
+        # Yields each term in byte order with the (segment position, term
+        # index) of every segment holding it.
+        merged = heapq.merge(
+            *(IndexWriter._terms(segment, position) for position, segment in enumerate(segments))
+        )
+        pending = next(merged, None)
+        while pending is not None:
+            term, parts = pending[0], []
+            while pending is not None and pending[0] == term:
+                parts.append(pending[1:])
+                pending = next(merged, None)
+            yield term, parts
+
+    @staticmethod
+    def _terms(segment, position):
+        for index in range(segment.term_count):
+            yield segment.term(index)[0], position, index
+
+    @staticmethod
+    def _buffered_postings(postings):
+        docs, tfs, encoded, lengths = postings
+        offset = 0
+        for doc, tf, length in zip(docs, tfs, lengths):
+            yield doc, tf, encoded[offset : offset + length]
+            offset += length
+
+    @staticmethod
+    def _merged_postings(segments, bases, parts):
+        for position, index in parts:
+            segment = segments[position]
+            for doc, tf, span in Cursor(segment, segment.term(index)[1]):
+                yield bases[position] + doc, tf, bytes(segment.positions[span[0] : span[1]])
+
+    def _new_segment(self):
+        name = f"segment-{self.manifest['next_segment']:06d}"
+        self.manifest["next_segment"] += 1
+        return name
+
+    def _publish(self, added, removed):
+        removed_names = {os.path.basename(path) for path in removed}
+        self.manifest["segments"] = [
+            name for name in self.manifest["segments"] if name not in removed_names
+        ] + added
+        _write_manifest(self.directory, self.manifest)
+        for segment in self._segments:
+            if segment.path in removed:
+                segment.close()
+        self._segments = [s for s in self._segments if s.path not in removed]
+        self._segments += [Segment(os.path.join(self.directory, name)) for name in added]
+        # Readers that opened the old segments keep their mapped files, which
+        # stay valid on POSIX after removal.
+        for path in removed:
+            shutil.rmtree(path)
+
+    def close(self):
+        """
+        Writes the buffered articles and releases the segments.
+        """
+        self.flush()
+        for segment in self._segments:
+            segment.close()
+        self._segments = []
+
+
+class InvertedIndex:
+    """
+    Answers term, phrase and filter queries over an index directory.
+    """
+
+    def __init__(self, directory):
+        """
+        Initializes the InvertedIndex class.
+
+        Args:
+            directory (str): The index directory.
+
+        Raises:
+            FileNotFoundError: If the directory holds no index.
+        """
+        manifest = _read_manifest(directory)
+        if manifest is None:
+            raise FileNotFoundError(f"No index in {directory}")
+        self.directory = directory
+        self.method = manifest["method"]
+        self.segments = [Segment(os.path.join(directory, name)) for name in manifest["segments"]]
+        self.documents = sum(segment.documents for segment in self.segments)
+        tokens = sum(segment.meta["tokens"] for segment in self.segments)
+        self.average_length = tokens / self.documents if self.documents else 0.0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """
+        Releases the mapped files.
+        """
+        for segment in self.segments:
+            segment.close()
+        self.segments = []
+
+    def search(  # pylint: disable=too-many-arguments,too-many-locals
+        self,
+        query="",
+        *,
+        category=None,
+        source=None,
+        start=None,
+        end=None,
+        limit=10,
+        order="relevance",
+    ):
+        """
+        Finds the articles matching a query and filters.
+
+        Every phrase of the query must occur in the title or content. Results
+        are ranked by BM25, or by publication time.
+
+        Args:
+            query (str): Words and quoted phrases, e.g. '"সাকিব আল হাসান" টেস্ট'.
+            category (str): Only articles of this category, e.g. "ক্রিকেট".
+            source (str): Only articles of this source, e.g. "banglanews24".
+            start (datetime): Only articles published at or after this time,
+                in Bangladesh time if naive. A number is an epoch timestamp.
+            end (datetime): Only articles published at or before this time.
+            limit (int): The number of hits returned.
+            order (str): "relevance" or "newest".
+
+        Returns:
+            list: Hit tuples, best first.
+
+        Raises:
+            ValueError: If neither a query nor a filter is given, or the order
+                is unknown.
+        """
+        if order not in ("relevance", "newest"):
+            raise ValueError(f"Unknown order: {order}")
+        phrases = parse_query(query, self.method)
+        filters = [f"{_CATEGORY}{category}"] if category else []
+        filters += [f"{_SOURCE}{source}"] if source else []
+        start, end = _timestamp(start), _timestamp(end)
+        if not phrases and not filters and start is None and end is None:
+            raise ValueError("A search needs a query or a filter")
+        terms = list(dict.fromkeys(term for phrase in phrases for term in phrase))
+
+        entries, doc_freq = [], dict.fromkeys(terms, 0)
+        for segment in self.segments:
+            found = {key: segment.lookup(key.encode("utf-8")) for key in terms + filters}
+            entries.append(found)
+            for term in terms:
+                if found[term] is not None:
+                    doc_freq[term] += found[term][2]
+        weights = {
+            term: math.log(1 + (self.documents - df + 0.5) / (df + 0.5))
+            for term, df in doc_freq.items()
+        }
+        top = []
+
+        def floor():
+            # The score a document must reach to enter a full list of hits.
+            if order == "relevance" and len(top) == limit:
+                return top[0][0][0]
+            return None
+
+        for position, (segment, found) in enumerate(zip(self.segments, entries)):
+            if limit <= 0 or any(entry is None for entry in found.values()):
+                continue
+            for doc, score in self._matches(
+                segment, found, phrases=phrases, weights=weights, period=(start, end), floor=floor
+            ):
+                published = segment.published[doc]
+                key = (score, published) if order == "relevance" else (published, score)
+                if len(top) < limit:
+                    heapq.heappush(top, (key, position, doc))
+                elif (key, position, doc) > top[0]:
+                    heapq.heapreplace(top, (key, position, doc))
+        hits = []
+        for (first, second), position, doc in sorted(top, reverse=True):
+            score = first if order == "relevance" else second
+            stored = self.segments[position].document(doc)
+            hits.append(Hit(
+                stored["url"], stored["title"], stored["date"], stored["category"],
+                stored["source"], stored["published"], score,
+            ))
+        return hits
+
+    def _matches(  # pylint: disable=too-many-arguments,too-many-locals
+        self, segment, found, *, phrases, weights, period, floor
+    ):
+        """
+        Yields the documents of a segment that match, with their scores.
+
+        The rarest term or filter leads: its blocks are decoded in turn and the
+        other terms are sought in the same documents. A lead block is skipped
+        when even its best possible score stays below floor().
+        """
+        start, end = period
+        cursors = {key: Cursor(segment, entry) for key, entry in found.items()}
+        if not cursors:
+            for doc in segment.dated(start, end):
+                yield doc, 0.0
+            return
+        lead_key = min(cursors, key=lambda key: cursors[key].doc_freq)
+        lead = cursors.pop(lead_key)
+        lead_weight = weights.get(lead_key, 0.0)
+        rest = sum(
+            max(self._bound(weights[key], *segment.bound(i)) for i in range(c.first, c.end))
+            for key, c in cursors.items()
+            if key in weights
+        )
+        dated = start is not None or end is not None
+        for index in range(lead.first, lead.end):
+            threshold = floor()
+            if threshold is not None and (
+                self._bound(lead_weight, *segment.bound(index)) + rest < threshold
+            ):
+                continue
+            docs, tfs, offsets = segment.block(index, lead.first)
+            for i, doc in enumerate(docs):
+                if dated:
+                    published = segment.published[doc]
+                    if published == NO_DATE or (start is not None and published < start) or (
+                        end is not None and published > end
+                    ):
+                        continue
+                matched = {lead_key: (tfs[i], (offsets[i], offsets[i + 1]))}
+                for key, cursor in cursors.items():
+                    posting = cursor.seek(doc)
+                    if posting is None:
+                        break
+                    matched[key] = posting
+                else:
+                    if all(
+                        len(phrase) == 1 or has_phrase(segment, [matched[t][1] for t in phrase])
+                        for phrase in phrases
+                    ):
+                        yield doc, sum(
+                            self._bound(weight, matched[term][0], segment.lengths[doc])
+                            for term, weight in weights.items()
+                        )
+
+    def _bound(self, weight, tf, length):
+        """
+        Returns the BM25 score of a term in a document of the given length.
+        """
+        if not tf:
+            return 0.0
+        norm = _K1 * (1 - _B + _B * length / self.average_length) if self.average_length else _K1
+        return weight * tf * (_K1 + 1) / (tf + norm)
+
+
+def _date(text):
+    return datetime.strptime(text, "%Y-%m-%d")
+
+
+def main():
+    """
+    Builds, merges or searches an index from the command line.
+    """
+    parser = argparse.ArgumentParser(description="Index and search crawled articles.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="add new articles to the index")
+    build.add_argument("inputs", nargs="+", help="JSON files, JSONL shards or shard directories")
+    build.add_argument("--method", choices=METHODS, default="native",
+                       help="tokenizer of a new index")
+    build.add_argument("--segment-size", type=int, default=20000, help="articles per segment")
+    build.add_argument("--merge", action="store_true", help="merge the segments afterwards")
+    merge = commands.add_parser("merge", help="merge the segments into one")
+    search = commands.add_parser("search", help="print the articles matching a query")
+    search.add_argument("query", nargs="?", default="", help='words and "quoted phrases"')
+    search.add_argument("--category", help="category name as shown on the website")
+    search.add_argument("--source", help="source name, e.g. banglanews24")
+    search.add_argument("--start", type=_date, help="first date, YYYY-MM-DD")
+    search.add_argument("--end", type=_date, help="last date, YYYY-MM-DD")
+    search.add_argument("--limit", type=int, default=10, help="number of hits")
+    search.add_argument("--newest", action="store_true", help="order by publication time")
+    for command in (build, merge, search):
+        command.add_argument("--index", default="./data/search_index", help="index directory")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    if args.command == "search":
+        end = args.end.replace(hour=23, minute=59, second=59) if args.end else None
+        with InvertedIndex(args.index) as index:
+            hits = index.search(
+                args.query, category=args.category, source=args.source, start=args.start,
+                end=end, limit=args.limit, order="newest" if args.newest else "relevance",
+            )
+        elapsed = time.perf_counter() - started
+        for hit in hits:
+            print(f"{hit.score:7.2f}  {hit.date}  [{hit.category}]  {hit.title}")
+            print(f"         {hit.url}")
+        print(f"{len(hits)} hits in {elapsed * 1000:.1f} ms")
+        return
+    with IndexWriter(args.index, method=getattr(args, "method", "native"),
+                     segment_size=getattr(args, "segment_size", 20000)) as writer:
+        if args.command == "build":
+            articles = (article for path in args.inputs for article in iter_articles(path))
+            writer.add_all(articles)
+            print("Indexed:", writer.stats)
+        if args.command == "merge" or args.merge:
+            writer.merge()
+        print(f"{len(writer.manifest['segments'])} segments, {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
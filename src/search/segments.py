@@ -0,0 +1,402 @@
+"""
+Index Segment Module.
+
+This module holds the on-disk format of the inverted index. A segment is an
+immutable directory of files: a sorted term dictionary, postings and word
+positions as variable-byte encoded gaps in blocks of BLOCK_SIZE documents, a
+skip table with the last document and the score bounds of every block, and
+document columns for stored fields, lengths, publication timestamps and URL
+keys. SegmentBuilder writes a segment from terms in sorted order, and Segment
+memory-maps one for reading.
+"""
+
+import bisect
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+FORMAT = 1
+BLOCK_SIZE = 128
+# Articles without a parsed date sort before every date.
+NO_DATE = -(2**63)
+
+# Term offset and length in terms.bin, document frequency, first skip entry
+# and number of blocks.
+_TERM = struct.Struct("<QIIII")
+
+
+def encode_varints(values, out):
+    """
+    Appends unsigned integers as variable-byte codes.
+
+    Args:
+        values (list): The integers, at least 0.
+        out (bytearray): The buffer.
+    """
+    if max(values) < 0x80:
+        # Most gaps and frequencies fit in one byte each.
+        out += bytes(values)
+        return
+    for value in values:
+        while value >= 0x80:
+            out.append((value & 0x7F) | 0x80)
+            value >>= 7
+        out.append(value)
+
+
+def decode_varints(data):
+    """
+    Decodes a run of variable-byte codes.
+
+    Args:
+        data (bytes): The codes.
+
+    Returns:
+        list: The integers.
+    """
+    values = []
+    value = shift = 0
+    for byte in data:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            values.append(value)
+            value = shift = 0
+    return values
+
+
+def _write_array(path, typecode, values):
+    with open(path, "wb") as f:
+        array(typecode, values).tofile(f)
+
+
+class SegmentBuilder:  # pylint: disable=too-many-instance-attributes
+    """
+    Writes one segment from terms in sorted order.
+    """
+
+    def __init__(self, path, lengths):
+        os.makedirs(path)
+        self.path = path
+        self.lengths = lengths
+        self._terms = bytearray()
+        self._entries = bytearray()
+        self._skip_docs = array("I")
+        self._skip_offsets = array("Q")
+        self._skip_bounds = array("I")
+        self._postings = open(os.path.join(path, "postings.bin"), "wb")  # pylint: disable=consider-using-with
+        self._positions = open(os.path.join(path, "positions.bin"), "wb")  # pylint: disable=consider-using-with
+        self._postings_size = 0
+        self._positions_size = 0
+        self.term_count = 0
+
+    def add_term(self, term, postings):
+        """
+        Writes the postings of the next term in byte order.
+
+        Args:
+            term (bytes): The UTF-8 term.
+            postings (iterable): (doc, tf, positions) in document order, where
+                positions is the variable-byte encoded position gaps.
+        """
+        first_block = len(self._skip_docs)
+        doc_freq = 0
+        previous = 0
+        block, block_positions, count = bytearray(), bytearray(), 0
+        max_tf, min_length = 0, 2**32 - 1
+        for doc, tf, positions in postings:
+            encode_varints((doc - previous, tf, len(positions)), block)
+            block_positions += positions
+            previous = doc
+            max_tf = max(max_tf, tf)
+            min_length = min(min_length, self.lengths[doc])
+            count += 1
+            if count == BLOCK_SIZE:
+                self._write_block(previous, block, block_positions, (max_tf, min_length))
+                doc_freq += count
+                block, block_positions, count = bytearray(), bytearray(), 0
+                max_tf, min_length = 0, 2**32 - 1
+        if count:
+            self._write_block(previous, block, block_positions, (max_tf, min_length))
+            doc_freq += count
+        if not doc_freq:
+            return
+        self._entries += _TERM.pack(
+            len(self._terms), len(term), doc_freq, first_block, len(self._skip_docs) - first_block
+        )
+        self._terms += term
+        self.term_count += 1
+
+    def _write_block(self, last_doc, block, positions, bounds):
+        self._skip_docs.append(last_doc)
+        self._skip_offsets.extend((self._postings_size, self._positions_size))
+        # The highest term frequency and shortest document bound the score of
+        # every document in the block.
+        self._skip_bounds.extend(bounds)
+        self._postings.write(block)
+        self._positions.write(positions)
+        self._postings_size += len(block)
+        self._positions_size += len(positions)
+
+    def finish(self, documents, meta):
+        """
+        Writes the term dictionary, the document columns and the segment meta.
+
+        Args:
+            documents (list): (stored fields, published, length, url key) per
+                document, in document order.
+            meta (dict): Segment statistics, completed with the document count.
+        """
+        # A final entry holds the end offsets of the last block.
+        self._skip_offsets.extend((self._postings_size, self._positions_size))
+        self._postings.close()
+        self._positions.close()
+        with open(os.path.join(self.path, "terms.bin"), "wb") as f:
+            f.write(self._terms)
+        with open(os.path.join(self.path, "terms.idx"), "wb") as f:
+            f.write(self._entries)
+        _write_array(os.path.join(self.path, "skip_docs.bin"), "I", self._skip_docs)
+        _write_array(os.path.join(self.path, "skip_offsets.bin"), "Q", self._skip_offsets)
+        _write_array(os.path.join(self.path, "skip_bounds.bin"), "I", self._skip_bounds)
+
+        offsets = array("Q", [0])
+        with open(os.path.join(self.path, "docs.jsonl"), "wb") as f:
+            for stored, _, _, _ in documents:
+                line = (json.dumps(stored, ensure_ascii=False) + "\n").encode("utf-8")
+                f.write(line)
+                offsets.append(offsets[-1] + len(line))
+        _write_array(os.path.join(self.path, "doc_offsets.bin"), "Q", offsets)
+        published = [doc[1] for doc in documents]
+        _write_array(os.path.join(self.path, "published.bin"), "q", published)
+        _write_array(os.path.join(self.path, "lengths.bin"), "I", self.lengths)
+        dated = sorted(
+            (timestamp, doc) for doc, timestamp in enumerate(published) if timestamp != NO_DATE
+        )
+        _write_array(os.path.join(self.path, "dates.bin"), "q", [t for t, _ in dated])
+        _write_array(os.path.join(self.path, "date_docs.bin"), "I", [d for _, d in dated])
+        _write_array(os.path.join(self.path, "urls.bin"), "Q", sorted(doc[3] for doc in documents))
+        meta = dict(
+            meta,
+            format=FORMAT,
+            byteorder=sys.byteorder,
+            documents=len(documents),
+            terms=self.term_count,
+        )
+        with open(os.path.join(self.path, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+
+
+class Segment:  # pylint: disable=too-many-instance-attributes
+    """
+    A memory-mapped segment.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        if self.meta["format"] != FORMAT or self.meta["byteorder"] != sys.byteorder:
+            raise ValueError(f"Unsupported index segment: {path}")
+        self.documents = self.meta["documents"]
+        self._maps = []
+        self._views = []
+        self.terms = self._map("terms.bin")
+        self.entries = self._map("terms.idx")
+        self.skip_docs = self._map("skip_docs.bin", "I")
+        self.skip_offsets = self._map("skip_offsets.bin", "Q")
+        self.skip_bounds = self._map("skip_bounds.bin", "I")
+        self.postings = self._map("postings.bin")
+        self.positions = self._map("positions.bin")
+        self.docs = self._map("docs.jsonl")
+        self.doc_offsets = self._map("doc_offsets.bin", "Q")
+        self.published = self._map("published.bin", "q")
+        self.lengths = self._map("lengths.bin", "I")
+        self.dates = self._map("dates.bin", "q")
+        self.date_docs = self._map("date_docs.bin", "I")
+        self.urls = self._map("urls.bin", "Q")
+        self.term_count = len(self.entries) // _TERM.size
+
+    def _map(self, name, typecode=None):
+        with open(os.path.join(self.path, name), "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                view = memoryview(b"")
+            else:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                self._maps.append(mapped)
+                view = memoryview(mapped)
+        self._views.append(view)
+        if typecode is not None:
+            view = view.cast(typecode)
+            self._views.append(view)
+        return view
+
+    def close(self):
+        """
+        Releases the mapped files.
+        """
+        for view in reversed(self._views):
+            view.release()
+        for mapped in self._maps:
+            mapped.close()
+        self._views, self._maps = [], []
+
+    def term(self, index):
+        """
+        Returns the term and its entry at a position of the term dictionary.
+        """
+        entry = _TERM.unpack_from(self.entries, index * _TERM.size)
+        return bytes(self.terms[entry[0] : entry[0] + entry[1]]), entry
+
+    def lookup(self, term):
+        """
+        Finds a term by binary search over the sorted dictionary.
+
+        Args:
+            term (bytes): The UTF-8 term.
+
+        Returns:
+            tuple: The term entry, or None if the segment lacks the term.
+        """
+        low, high = 0, self.term_count
+        while low < high:
+            middle = (low + high) // 2
+            found, entry = self.term(middle)
+            if found < term:
+                low = middle + 1
+            elif found > term:
+                high = middle
+            else:
+                return entry
+        return None
+
+    def block(self, index, first):
+        """
+        Decodes one postings block.
+
+        Args:
+            index (int): The global block number.
+            first (int): The first block of the term, whose first document is
+                not a gap from the block before.
+
+        Returns:
+            tuple: (docs, tfs, position offsets), where position offsets has one
+                more entry than docs and indexes positions.bin.
+        """
+        start, end = self.skip_offsets[2 * index], self.skip_offsets[2 * index + 2]
+        values = decode_varints(bytes(self.postings[start:end]))
+        previous = self.skip_docs[index - 1] if index > first else 0
+        docs, tfs = [], []
+        position = self.skip_offsets[2 * index + 1]
+        offsets = [position]
+        for i in range(0, len(values), 3):
+            previous += values[i]
+            docs.append(previous)
+            tfs.append(values[i + 1])
+            position += values[i + 2]
+            offsets.append(position)
+        return docs, tfs, offsets
+
+    def bound(self, index):
+        """
+        Returns the highest term frequency and the shortest document of a block.
+        """
+        return self.skip_bounds[2 * index], self.skip_bounds[2 * index + 1]
+
+    def has_url(self, key):
+        """
+        Returns whether an article with this URL key is in the segment.
+        """
+        position = bisect.bisect_left(self.urls, key)
+        return position < len(self.urls) and self.urls[position] == key
+
+    def document(self, doc):
+        """
+        Returns the stored fields of a document.
+        """
+        start, end = self.doc_offsets[doc], self.doc_offsets[doc + 1]
+        return json.loads(bytes(self.docs[start:end]))
+
+    def dated(self, start, end):
+        """
+        Returns the documents published in a range, in document order.
+        """
+        low = 0 if start is None else bisect.bisect_left(self.dates, start)
+        high = len(self.dates) if end is None else bisect.bisect_right(self.dates, end)
+        return sorted(self.date_docs[low:high])
+
+
+class Cursor:
+    """
+    Walks the postings of one term forward, decoding only the blocks it visits.
+    """
+
+    def __init__(self, segment, entry):
+        self.segment = segment
+        self.doc_freq = entry[2]
+        self.first = entry[3]
+        self.end = entry[3] + entry[4]
+        self._block = None
+        self._index = -1
+
+    def __iter__(self):
+        for index in range(self.first, self.end):
+            docs, tfs, offsets = self.segment.block(index, self.first)
+            for i, doc in enumerate(docs):
+                yield doc, tfs[i], (offsets[i], offsets[i + 1])
+
+    def seek(self, doc):
+        """
+        Finds a document at or after the current one.
+
+        Args:
+            doc (int): The document, not before any document sought earlier.
+
+        Returns:
+            tuple: (tf, position range) if the term occurs in the document,
+                otherwise None.
+        """
+        if self._block is None or doc > self._block[0][-1]:
+            start = max(self.first, self._index)
+            index = bisect.bisect_left(self.segment.skip_docs, doc, start, self.end)
+            if index == self.end:
+                return None
+            if index != self._index:
+                self._index = index
+                self._block = self.segment.block(index, self.first)
+        docs, tfs, offsets = self._block
+        i = bisect.bisect_left(docs, doc)
+        if i == len(docs) or docs[i] != doc:
+            return None
+        return tfs[i], (offsets[i], offsets[i + 1])
+
+
+def _positions(segment, span):
+    positions, position = [], 0
+    for gap in decode_varints(bytes(segment.positions[span[0] : span[1]])):
+        position += gap
+        positions.append(position)
+    return positions
+
+
+def has_phrase(segment, spans):
+    """
+    Checks whether terms occur at consecutive positions of a document.
+
+    Args:
+        segment (Segment): The segment of the document.
+        spans (list): The position range of each term of the phrase in the
+            document, in phrase order.
+
+    Returns:
+        bool: True if the phrase occurs.
+    """
+    starts = set(_positions(segment, spans[0]))
+    for offset, span in enumerate(spans[1:], 1):
+        starts &= {position - offset for position in _positions(segment, span)}
+        if not starts:
+            return False
+    return True
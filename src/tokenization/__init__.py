@@ -0,0 +1,3 @@
+"""
+Tokenization of crawled Bengali news articles.
+"""
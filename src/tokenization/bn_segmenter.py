@@ -0,0 +1,182 @@
+"""
+Regex-based sentence and word segmenter for Bengali text.
+
+A single precompiled pattern splits text into words, numbers, abbreviations and
+punctuation in one pass, and sentences are found by scanning those tokens for
+terminators. Results are (start, end) offsets into the input text, so callers
+slice only the spans they need.
+"""
+
+import re
+
+# Bengali letters, vowel signs and marks, excluding the digits ০-৯, plus the
+# zero-width (non-)joiners used inside conjuncts.
+_LETTER = r"\u0980-\u09E5\u09F0-\u09FF\u200C\u200D"
+_DIGIT = r"0-9\u09E6-\u09EF"
+
+LATIN_ABBREVIATIONS = ("Mr", "Mrs", "Ms", "Dr", "Prof", "St", "Jr", "Sr", "No", "vs", "etc")
+# Titles and common abbreviations written with a full stop, as in "ডা." or "মো.".
+BENGALI_ABBREVIATIONS = (
+    "ড", "ডা", "মো", "মোসা", "মোছা", "মু", "মি", "লে", "অব", "প্রফ", "খ্রি", "খ্রিস্টপূ",
+    "নং", "পৃ", "দ্র", "লি", "কো", "সং", "সা", "রা", "রহ", "আ",
+)
+# Names of the Latin letters, the initials of names and degrees such as "এম.এ.".
+# The ones that are also common words ("এ", "ও", "কে", "আর", "এস", "ই") are
+# only initials when another initial follows, as in "এ. কে. এম.".
+BENGALI_INITIALS = (
+    "বি", "সি", "ডি", "এফ", "জি", "এইচ", "আই", "জে", "এল", "এম", "এন", "পি", "কিউ",
+    "টি", "ইউ", "ভি", "ডব্লিউ", "এক্স", "ওয়াই", "জেড",
+)
+AMBIGUOUS_INITIALS = ("এ", "ও", "কে", "আর", "এস", "ই")
+
+
+def _alternatives(names):
+    # Longest first, so that "এইচ" is not cut short by "এ".
+    return "|".join(sorted(names, key=len, reverse=True))
+
+
+_INITIAL = _alternatives(BENGALI_INITIALS + AMBIGUOUS_INITIALS)
+
+TOKEN_PATTERN = re.compile(
+    # Each match consumes the whitespace before its token, so the engine does
+    # not retry every alternative at each space. The token itself is the named
+    # group that matched, i.e. match.span(match.lastindex).
+    r"\s*(?:"
+    # Most tokens are words that neither start with a digit nor end in a full
+    # stop; matching them first keeps the common case cheap. The lookahead
+    # rejects any shorter prefix of the word as well, so a word before a full
+    # stop is left whole to the alternatives below.
+    rf"(?P<word>(?![{_DIGIT}])[{_LETTER}\w]+(?![{_LETTER}\w.]))"
+    # Abbreviations: known titles, runs of initials such as "এম.এ." or
+    # "বি.এস.সি.", single initials, and common Latin abbreviations.
+    rf"|(?P<abbr>(?:(?:{_INITIAL})\.){{2,}}(?![{_LETTER}])"
+    rf"|(?:{_alternatives(BENGALI_ABBREVIATIONS + BENGALI_INITIALS)})\.(?!\.)"
+    rf"|(?:{_alternatives(AMBIGUOUS_INITIALS)})\.(?=\s*(?:{_INITIAL})\.)"
+    rf"|\b(?:{'|'.join(LATIN_ABBREVIATIONS)})\.)"
+    # Numbers in Bengali or ASCII digits, with inner separators and a suffix,
+    # as in "২০২৪", "৩.৫", "১২:৩০", "১২টি" or "30/03/2024".
+    rf"|(?P<number>[{_DIGIT}]+(?:[.,:/][{_DIGIT}]+)*[{_LETTER}\w]*)"
+    # Words before a full stop that ends the sentence.
+    rf"|(?P<last>[{_LETTER}\w]+)"
+    # Sentence terminators: danda, double danda, "?", "!" and a lone full stop.
+    r"|(?P<end>[।॥?!]+\.?|\.(?!\.))"
+    r"|(?P<close>[\"'’”)\]])"
+    r"|(?P<punct>\.{2,}|\S)"
+    r")"
+)
+
+_NON_SPACE = re.compile(r"\S")
+
+
+def iter_tokens(text):
+    """
+    Yields the tokens of a text with their kind.
+
+    Args:
+        text (str): The text to segment.
+
+    Yields:
+        tuple: (start, end, kind), where kind is "word", "last" for a word
+            before a full stop, "number", "abbr", "end" for sentence terminators,
+            "close" for closing quotes and brackets, or "punct".
+    """
+    for match in TOKEN_PATTERN.finditer(text):
+        start, end = match.span(match.lastindex)
+        yield start, end, match.lastgroup
+
+
+def word_spans(text):
+    """
+    Returns the offsets of the words, numbers and punctuation in a text.
+
+    Args:
+        text (str): The text to segment.
+
+    Returns:
+        list: (start, end) offsets of each token.
+    """
+    return [match.span(match.lastindex) for match in TOKEN_PATTERN.finditer(text)]
+
+
+def segment(text):
+    """
+    Splits a text into sentences and each sentence into tokens in one pass.
+
+    Args:
+        text (str): The text to segment.
+
+    Returns:
+        list: One list of (start, end) token offsets per sentence. Quotes and
+            brackets written directly after a terminator belong to the sentence
+            they close.
+    """
+    segments = []
+    current = []
+    ended = False
+    for match in TOKEN_PATTERN.finditer(text):
+        start, end = match.span(match.lastindex)
+        if ended and not (match.lastgroup == "close" and start == current[-1][1]):
+            segments.append(current)
+            current = []
+            ended = False
+        current.append((start, end))
+        if match.lastgroup == "end":
+            ended = True
+    if current:
+        segments.append(current)
+    return segments
+
+
+def sentence_spans(text):
+    """
+    Returns the offsets of the sentences in a text.
+
+    A sentence ends at "।", "॥", "?", "!" or a full stop that is not part of
+    an abbreviation or a number.
+
+    Args:
+        text (str): The text to segment.
+
+    Returns:
+        list: (start, end) offsets of each sentence, without surrounding spaces.
+    """
+    return [(tokens[0][0], tokens[-1][1]) for tokens in segment(text)]
+
+
+def words(text):
+    """
+    Returns the tokens of a text as strings.
+
+    Args:
+        text (str): The text to segment.
+
+    Returns:
+        list: The words, numbers and punctuation of the text.
+    """
+    return [match.group(match.lastindex) for match in TOKEN_PATTERN.finditer(text)]
+
+
+def sentences(text):
+    """
+    Returns the sentences of a text as strings.
+
+    Args:
+        text (str): The text to segment.
+
+    Returns:
+        list: The sentences of the text.
+    """
+    return [text[start:end] for start, end in sentence_spans(text)]
+
+
+def characters(text):
+    """
+    Returns the non-whitespace characters of a text.
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        list: Every character that is not whitespace.
+    """
+    return _NON_SPACE.findall(text)
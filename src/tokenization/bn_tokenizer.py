@@ -2,13 +2,12 @@
 Tokenization of Bengali news articles using NLTK and tokenizers library.
 """
 
-import json
-import nltk
-from nltk.tokenize import word_tokenize, sent_tokenize
-from tokenizers import Tokenizer, models, pre_tokenizers, decoders, trainers
+import os
+from src.crawlers.article_store import iter_articles
+from src.tokenization.resources import BPE_MODEL_FILE, nltk_sent_tokenize, nltk_word_tokenize
 
-# Download NLTK data
-nltk.download('punkt')
+# NLTK and tokenizers are imported on first use, and NLTK models are read from
+# the vendored nltk_data directory instead of being downloaded on import.
 
 def tokenize_with_nltk(text):
     """
@@ -20,47 +19,62 @@ def tokenize_with_nltk(text):
     Returns:
         list: List of sentences and words.
     """
-    sentences = sent_tokenize(text)
-    words = [word_tokenize(sentence) for sentence in sentences]
+    sentences = nltk_sent_tokenize(text)
+    words = [nltk_word_tokenize(sentence) for sentence in sentences]
     return sentences, words
 
-def tokenize_with_tokenizers(text):
+def tokenize_with_tokenizers(text, model_file=BPE_MODEL_FILE):
     """
-    Tokenizes the text using tokenizers library.
+    Tokenizes the text using the BPE model trained by bpe_tokenizer.train_bpe.
 
     Args:
         text (str): The text to tokenize.
+        model_file (str): The saved tokenizer, loaded once per process.
 
     Returns:
         list: List of tokens.
     """
-    tokenizer = Tokenizer(models.BPE())
-    tokenizer.pre_tokenizer = pre_tokenizers.ByteLevel()
-    tokenizer.decoder = decoders.ByteLevel()
-    tokenizer.trainer = trainers.BpeTrainer(
-        special_tokens=["[UNK]", "[CLS]", "[SEP]", "[PAD]", "[MASK]"]
-    )
-    tokenizer.train_from_iterator([text])
-    encoding = tokenizer.encode(text)
-    tokens = encoding.tokens
-    return tokens
-
-def main():
+    from src.tokenization.bpe_tokenizer import load_bpe  # pylint: disable=import-outside-toplevel
+
+    return load_bpe(model_file).encode(text).tokens
+
+def tokenize_batch_with_tokenizers(texts, model_file=BPE_MODEL_FILE):
+    """
+    Tokenizes many texts with one encode_batch call.
+
+    Args:
+        texts (list): The texts to tokenize.
+        model_file (str): The saved tokenizer, loaded once per process.
+
+    Returns:
+        list: One list of tokens per text.
+    """
+    from src.tokenization.bpe_tokenizer import encode_texts  # pylint: disable=import-outside-toplevel
+
+    return [encoding.tokens for encoding in encode_texts(texts, model_file)]
+
+def main(path='data/NewsArticle.json'):
     """
     Main function to tokenize Bengali news articles.
+
+    Args:
+        path (str): A JSON file or a directory of JSONL article shards.
     """
-    # Load data from JSON file
-    with open('data/NewsArticle.json', 'r', encoding='utf-8') as file:
-        data = json.load(file)
+    # Stream the first article instead of loading the whole corpus
+    article = next(iter_articles(path), None)
 
     # Ensure data is in the correct format
-    if isinstance(data, dict):
-        content = data["content"]
-    elif isinstance(data, list):
-        content = data[0]["content"]
-    else:
+    if not isinstance(article, dict):
         print("Invalid data format.")
         return
+    content = article["content"]
+
+    # Train the BPE model once over the whole corpus and reuse it afterwards
+    if not os.path.exists(BPE_MODEL_FILE):
+        # pylint: disable-next=import-outside-toplevel
+        from src.tokenization.bpe_tokenizer import article_texts, train_bpe
+
+        train_bpe(article_texts([path]), BPE_MODEL_FILE)
 
     # Tokenize the content
     bengali_sentences, bengali_words = tokenize_with_nltk(content)
@@ -2,24 +2,25 @@
 Tokenization of Bengali news articles using NLTK and tokenizers library.
 """
 
-import os
-import nltk
-from indicnlp.tokenize import indic_tokenize
+import re
+
+from src.tokenization.resources import configure_nltk_data, download_resources
+
+NON_SPACE = re.compile(r"\S")
 
 
 def download_nltk_resources():
     """
-    Download necessary NLTK resources.
+    Download necessary NLTK resources into the vendored nltk_data directory.
     """
-    nltk.download("punkt", download_dir="nltk_data")
+    download_resources()
 
 
 def set_nltk_data_path():
     """
-    Set NLTK data path to the appropriate directory.
+    Set NLTK data path to the vendored nltk_data directory.
     """
-    nltk_data_dir = os.path.join(os.path.dirname(__file__), 'nltk_data')
-    nltk.data.path.append(nltk_data_dir)
+    configure_nltk_data()
 
 
 def tokenize_characters(text):
@@ -32,7 +33,7 @@ def tokenize_characters(text):
     Returns:
         list: A list of characters tokenized from the input text.
     """
-    return [char for char in text if char.strip()]
+    return NON_SPACE.findall(text)
 
 
 def tokenize_words(text):
@@ -45,6 +46,9 @@ def tokenize_words(text):
     Returns:
         list: A list of words tokenized from the input text.
     """
+    # indicnlp is imported on first use; later calls find it in sys.modules.
+    from indicnlp.tokenize import indic_tokenize  # pylint: disable=import-outside-toplevel
+
     return indic_tokenize.trivial_tokenize(text)
 
 
@@ -65,12 +69,6 @@ def main():
     """
     Tokenize different sections of a Bengali news article and print the tokens.
     """
-    # Download NLTK resources if not already downloaded
-    download_nltk_resources()
-
-    # Set NLTK data path
-    set_nltk_data_path()
-
     # Sample Bengali news article
     data = {
         "title": "প্রথম সেশনে  এক উইকেটই নিতে পারলো বাংলাদেশ",
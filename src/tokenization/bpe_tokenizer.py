@@ -0,0 +1,189 @@
+"""
+Byte-level BPE tokenizer for Bengali news articles.
+
+The model is trained once over the streamed corpus and saved to disk. Encoding
+loads the saved model once per process and encodes articles in batches.
+
+Run from the repository root:
+    python -m src.tokenization.bpe_tokenizer train data/NewsArticle.json
+    python -m src.tokenization.bpe_tokenizer encode data/NewsArticle.json -o data/bpe_tokens.jsonl
+"""
+
+import argparse
+import json
+import os
+import time
+from functools import lru_cache
+from itertools import islice
+
+from tokenizers import Tokenizer, decoders, models, pre_tokenizers, trainers
+
+from src.crawlers.article_store import iter_articles
+from src.tokenization.resources import BPE_MODEL_FILE
+
+SPECIAL_TOKENS = ["[UNK]", "[CLS]", "[SEP]", "[PAD]", "[MASK]"]
+
+
+def build_bpe_tokenizer():
+    """
+    Creates an untrained byte-level BPE tokenizer.
+
+    Returns:
+        Tokenizer: The tokenizer.
+    """
+    tokenizer = Tokenizer(models.BPE(unk_token="[UNK]"))
+    tokenizer.pre_tokenizer = pre_tokenizers.ByteLevel(add_prefix_space=False)
+    tokenizer.decoder = decoders.ByteLevel()
+    return tokenizer
+
+
+def article_texts(paths, field="content"):
+    """
+    Streams one text field of every article in the crawler output.
+
+    Args:
+        paths (iterable): Crawler outputs: JSON files, JSONL shards or shard directories.
+        field (str): The article field.
+
+    Yields:
+        str: The non-empty field values.
+    """
+    for path in paths:
+        for article in iter_articles(path):
+            if article.get(field):
+                yield article[field]
+
+
+def batches(items, batch_size):
+    """
+    Groups an iterable into lists.
+
+    Args:
+        items (iterable): The items.
+        batch_size (int): Number of items per list.
+
+    Yields:
+        list: The next batch_size items, fewer for the last batch.
+    """
+    items = iter(items)
+    while batch := list(islice(items, batch_size)):
+        yield batch
+
+
+def train_bpe(texts, model_file=BPE_MODEL_FILE, *, vocab_size=32000, min_frequency=2,
+              batch_size=1000):
+    """
+    Trains a BPE model over a stream of texts and saves it.
+
+    Args:
+        texts (iterable): The training texts, e.g. from article_texts().
+        model_file (str): The JSON file the trained tokenizer is saved to.
+        vocab_size (int): The target vocabulary size.
+        min_frequency (int): Minimum pair frequency for a merge.
+        batch_size (int): Number of texts handed to the trainer at a time.
+
+    Returns:
+        Tokenizer: The trained tokenizer.
+    """
+    tokenizer = build_bpe_tokenizer()
+    trainer = trainers.BpeTrainer(
+        vocab_size=vocab_size,
+        min_frequency=min_frequency,
+        special_tokens=SPECIAL_TOKENS,
+        initial_alphabet=pre_tokenizers.ByteLevel.alphabet(),
+    )
+    tokenizer.train_from_iterator(batches(texts, batch_size), trainer=trainer)
+    os.makedirs(os.path.dirname(model_file) or ".", exist_ok=True)
+    tokenizer.save(model_file)
+    load_bpe.cache_clear()
+    return tokenizer
+
+
+@lru_cache(maxsize=None)
+def load_bpe(model_file=BPE_MODEL_FILE):
+    """
+    Loads a trained tokenizer, once per process and model file.
+
+    Args:
+        model_file (str): The JSON file written by train_bpe.
+
+    Returns:
+        Tokenizer: The trained tokenizer.
+    """
+    return Tokenizer.from_file(model_file)
+
+
+def encode_texts(texts, model_file=BPE_MODEL_FILE):
+    """
+    Encodes a batch of texts with the trained tokenizer.
+
+    Args:
+        texts (list): The texts.
+        model_file (str): The JSON file written by train_bpe.
+
+    Returns:
+        list: One tokenizers Encoding per text.
+    """
+    return load_bpe(model_file).encode_batch(texts)
+
+
+def encode_corpus(paths, output_file, model_file=BPE_MODEL_FILE, *, field="content",
+                  batch_size=256):
+    """
+    Encodes every article in the crawler output and writes the token IDs.
+
+    Args:
+        paths (iterable): Crawler outputs: JSON files, JSONL shards or shard directories.
+        output_file (str): The JSONL output file, one line with url and ids per article.
+        model_file (str): The JSON file written by train_bpe.
+        field (str): The article field to encode.
+        batch_size (int): Number of articles encoded by one encode_batch call.
+
+    Returns:
+        int: The number of articles encoded.
+    """
+    count = 0
+    articles = (article for path in paths for article in iter_articles(path))
+    with open(output_file, "w", encoding="utf-8") as out:
+        for batch in batches(articles, batch_size):
+            encodings = encode_texts([article.get(field) or "" for article in batch], model_file)
+            for article, encoding in zip(batch, encodings):
+                out.write(json.dumps({"url": article.get("url"), "ids": encoding.ids}) + "\n")
+            count += len(batch)
+    return count
+
+
+def main():
+    """
+    Trains the BPE model or encodes a corpus with it from the command line.
+    """
+    parser = argparse.ArgumentParser(description="Train or apply the BPE tokenizer.")
+    parser.add_argument("command", choices=("train", "encode"))
+    parser.add_argument("inputs", nargs="+", help="JSON files, JSONL shards or shard directories")
+    parser.add_argument("--model", default=BPE_MODEL_FILE, help="tokenizer JSON file")
+    parser.add_argument("-o", "--output", default="data/bpe_tokens.jsonl",
+                        help="encoded output file")
+    parser.add_argument("--field", default="content", help="article field")
+    parser.add_argument("--vocab-size", type=int, default=32000, help="BPE vocabulary size")
+    parser.add_argument("--batch-size", type=int, default=256, help="articles per batch")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    if args.command == "train":
+        tokenizer = train_bpe(
+            article_texts(args.inputs, args.field),
+            args.model,
+            vocab_size=args.vocab_size,
+            batch_size=args.batch_size,
+        )
+        print(f"Trained {tokenizer.get_vocab_size()} tokens in "
+              f"{time.perf_counter() - started:.2f}s, saved to {args.model}")
+    else:
+        count = encode_corpus(args.inputs, args.output, args.model, field=args.field,
+                              batch_size=args.batch_size)
+        elapsed = time.perf_counter() - started
+        print(f"Encoded {count} articles in {elapsed:.2f}s ({count / elapsed:.1f} articles/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,557 @@
+"""
+Corpus statistics of crawled Bengali news articles.
+
+Streams articles from crawler output, tokenizes them in chunks on a process pool
+and accumulates token and n-gram frequencies, the vocabulary, and the article
+and token volume per source, category and day, along with counts of missing
+fields and unparsed dates that reveal broken extraction. Each worker reduces its
+chunk to the distinct tokens and n-gram hashes with their counts, and the parent
+merges these partial results: tokens get integer IDs in a vocabulary whose
+counts are an array, and every token and n-gram is added to a count-min sketch
+of fixed size. When the vocabulary reaches its capacity the less frequent half
+is evicted and only the sketch counts those tokens, so memory is bounded by the
+capacity and the sketch size for any corpus.
+
+Run from the repository root:
+    python -m src.tokenization.corpus_stats data/NewsArticle.json -o data/corpus_stats
+"""
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import random
+import time
+import zlib
+from array import array
+from collections import Counter, deque
+from datetime import datetime
+from itertools import islice
+
+from src.crawlers.article_record import ArticleRecord
+from src.crawlers.article_store import iter_articles
+from src.crawlers.bn_dates import BANGLADESH_TZ
+from src.crawlers.parquet_export import UNKNOWN_PARTITION, source_of
+from src.tokenization.corpus_tokenizer import METHODS, TOKENIZERS
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# A prime just below 2**32: hash values and row coefficients stay below it, so
+# a * h + b fits in 64 bits and numpy can compute it without overflow.
+_PRIME = (1 << 32) - 5
+# Values the extraction leaves in a field it could not find.
+_MISSING = (None, "", "Unknown")
+_CHECKED_FIELDS = ("title", "date", "author", "content", "category")
+
+
+def token_hash(text):
+    """
+    Hashes a token or n-gram for the count-min sketch.
+
+    Args:
+        text (str): The token, or the words of an n-gram joined by spaces.
+
+    Returns:
+        int: The 32-bit CRC32 of its UTF-8 encoding.
+    """
+    return zlib.crc32(text.encode("utf-8"))
+
+
+class CountMinSketch:
+    """
+    Approximate counts of any number of distinct keys in fixed memory.
+
+    Each key is counted in one cell of every row; its estimate is the smallest
+    of those cells, which never undercounts and, with probability at least
+    1 - exp(-depth), overcounts by at most e / width of the total.
+    """
+
+    def __init__(self, width=1 << 20, depth=4, seed=1):
+        """
+        Initializes the CountMinSketch class.
+
+        Args:
+            width (int): Number of cells per row.
+            depth (int): Number of rows, each with its own hash function.
+            seed (int): Seed of the row hash coefficients.
+        """
+        self.width = width
+        self.depth = depth
+        self.total = 0
+        rng = random.Random(seed)
+        self._a = [rng.randrange(1, _PRIME) for _ in range(depth)]
+        self._b = [rng.randrange(0, _PRIME) for _ in range(depth)]
+        if numpy is not None:
+            self.table = numpy.zeros((depth, width), dtype=numpy.uint64)
+        else:
+            self.table = [array("Q", bytes(8 * width)) for _ in range(depth)]
+
+    def _columns(self, hashes):
+        if numpy is not None:
+            values = numpy.asarray(hashes, dtype=numpy.uint64)
+            a = numpy.array(self._a, dtype=numpy.uint64)[:, None]
+            b = numpy.array(self._b, dtype=numpy.uint64)[:, None]
+            return (a * values + b) % _PRIME % self.width
+        return [
+            [(a * h + b) % _PRIME % self.width for h in hashes]
+            for a, b in zip(self._a, self._b)
+        ]
+
+    def add(self, hashes, counts):
+        """
+        Adds counts to keys.
+
+        Args:
+            hashes (array): The 32-bit hashes of distinct keys.
+            counts (array): The count to add to each key.
+        """
+        if not len(hashes):  # pylint: disable=use-implicit-booleaness-not-len
+            return
+        columns = self._columns(hashes)
+        if numpy is not None:
+            counts = numpy.asarray(counts, dtype=numpy.uint64)
+            for row, index in zip(self.table, columns):
+                numpy.add.at(row, index, counts)
+            self.total += int(counts.sum())
+            return
+        for row, index in zip(self.table, columns):
+            for column, count in zip(index, counts):
+                row[column] += count
+        self.total += sum(counts)
+
+    def estimate(self, hashes):
+        """
+        Estimates the counts of keys.
+
+        Args:
+            hashes (array): The 32-bit hashes of the keys.
+
+        Returns:
+            list: The estimated count of each key.
+        """
+        if not len(hashes):  # pylint: disable=use-implicit-booleaness-not-len
+            return []
+        columns = self._columns(hashes)
+        if numpy is not None:
+            rows = numpy.arange(self.depth)[:, None]
+            return self.table[rows, columns].min(axis=0).tolist()
+        return [
+            min(row[column] for row, column in zip(self.table, cells))
+            for cells in zip(*columns)
+        ]
+
+    def distinct(self):
+        """
+        Estimates the number of distinct keys by linear counting on the first row.
+
+        Returns:
+            int: The estimate, or None once the row is full.
+        """
+        if numpy is not None:
+            empty = int((self.table[0] == 0).sum())
+        else:
+            empty = self.table[0].count(0)
+        if not empty:
+            return None
+        return round(-self.width * math.log(empty / self.width))
+
+    def error_bound(self):
+        """
+        Returns the overcount that estimates stay within with high probability.
+
+        Returns:
+            dict: The bound in counts and the probability it holds.
+        """
+        return {
+            "overcount": math.e / self.width * self.total,
+            "probability": 1 - math.exp(-self.depth),
+        }
+
+
+def _chunk_stats(chunk, method, ngram, top):
+    """
+    Counts the tokens and n-grams of a chunk of articles in a worker process.
+
+    Args:
+        chunk (list): The text of each article.
+        method (str): "native", "indic" or "nltk".
+        ngram (int): The longest n-gram counted, 1 for tokens only.
+        top (int): Number of the chunk's most frequent n-grams sent back as
+            text, so the parent can name the frequent ones.
+
+    Returns:
+        dict: The distinct tokens with their hashes and counts, the n-gram
+            hashes and counts, the text of the top n-grams by hash, and the
+            number of tokens in each article.
+    """
+    tokenize = TOKENIZERS[method]
+    tokens, grams = Counter(), Counter()
+    lengths = array("I")
+    for texts in chunk:
+        length = 0
+        for text in texts:
+            for sentence in tokenize(text or ""):
+                tokens.update(sentence)
+                length += len(sentence)
+                for n in range(2, ngram + 1):
+                    grams.update(" ".join(sentence[i:i + n]) for i in range(len(sentence) - n + 1))
+        lengths.append(length)
+    return {
+        "tokens": list(tokens),
+        "token_hashes": array("I", (token_hash(token) for token in tokens)),
+        "token_counts": array("Q", tokens.values()),
+        "ngram_hashes": array("I", (token_hash(gram) for gram in grams)),
+        "ngram_counts": array("Q", grams.values()),
+        "ngram_top": {token_hash(gram): gram for gram, _ in grams.most_common(top)},
+        "lengths": lengths,
+    }
+
+
+class CorpusStats:  # pylint: disable=too-many-instance-attributes
+    """
+    Merges the partial counts of article chunks into corpus statistics.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        *,
+        max_vocab=1_000_000,
+        sketch_width=1 << 20,
+        sketch_depth=4,
+        top=100,
+        seed=1,
+    ):
+        """
+        Initializes the CorpusStats class.
+
+        Args:
+            max_vocab (int): Number of distinct tokens counted exactly.
+            sketch_width (int): Cells per row of the token and n-gram sketches.
+            sketch_depth (int): Rows of the token and n-gram sketches.
+            top (int): Number of the most frequent tokens and n-grams reported.
+            seed (int): Seed of the sketch hash functions.
+        """
+        self.max_vocab = max_vocab
+        self.top = top
+        self.token_sketch = CountMinSketch(sketch_width, sketch_depth, seed)
+        self.ngram_sketch = CountMinSketch(sketch_width, sketch_depth, seed + 1)
+        self.ids = {}
+        self.tokens = []
+        if numpy is not None:
+            self.counts = numpy.zeros(max_vocab, dtype=numpy.int64)
+        else:
+            self.counts = array("q", bytes(8 * max_vocab))
+        self.pruned = 0
+        self.ngrams = {}
+        self.articles = 0
+        self.sources = {}
+        self.categories = {}
+        self.days = {}
+        self.lengths = [0] * 33
+
+    def add_chunk(self, partial, articles):
+        """
+        Merges the counts of a chunk.
+
+        Args:
+            partial (dict): The result of the chunk's worker.
+            articles (list): (source, category, day, missing fields) of each
+                article of the chunk, in order.
+        """
+        self._add_tokens(partial["tokens"], partial["token_counts"])
+        self.token_sketch.add(partial["token_hashes"], partial["token_counts"])
+        self.ngram_sketch.add(partial["ngram_hashes"], partial["ngram_counts"])
+        self.ngrams.update(partial["ngram_top"])
+        if len(self.ngrams) > 4 * self.top:
+            self.ngrams = dict(self._top_ngrams(2 * self.top))
+        for (source, category, day, missing), length in zip(articles, partial["lengths"]):
+            self.articles += 1
+            volume = self.sources.setdefault(
+                source,
+                {"articles": 0, "tokens": 0, "empty": 0, "unparsed_dates": 0,
+                 "missing": dict.fromkeys(_CHECKED_FIELDS, 0)},
+            )
+            _count(volume, length)
+            volume["empty"] += not length
+            volume["unparsed_dates"] += day == UNKNOWN_PARTITION
+            for field in missing:
+                volume["missing"][field] += 1
+            _count(self.categories.setdefault(source, {}).setdefault(category, {}), length)
+            _count(self.days.setdefault(day, {}), length)
+            self.lengths[min(length.bit_length(), len(self.lengths) - 1)] += 1
+
+    def _add_tokens(self, tokens, counts):
+        new = [token for token in tokens if token not in self.ids]
+        if len(self.tokens) + len(new) > self.max_vocab:
+            self._prune()
+        for token in new[: self.max_vocab - len(self.tokens)]:
+            self.ids[token] = len(self.tokens)
+            self.tokens.append(token)
+        admitted = [
+            (self.ids[token], count)
+            for token, count in zip(tokens, counts)
+            if token in self.ids
+        ]
+        if not admitted:
+            return
+        if numpy is not None:
+            ids, values = numpy.array(admitted, dtype=numpy.int64).T
+            # The tokens of a chunk are distinct, so no ID repeats.
+            self.counts[ids] += values
+        else:
+            for token_id, count in admitted:
+                self.counts[token_id] += count
+
+    def _prune(self):
+        """
+        Evicts the less frequent half of the vocabulary.
+
+        Evicted tokens are still counted by the sketch, and a token that comes
+        back is admitted again with a new ID.
+        """
+        size = len(self.tokens)
+        keep = self.max_vocab // 2
+        if numpy is not None:
+            kept = numpy.sort(numpy.argsort(-self.counts[:size], kind="stable")[:keep]).tolist()
+            counts = self.counts[kept].copy()
+            self.counts[:] = 0
+            self.counts[: len(kept)] = counts
+        else:
+            kept = sorted(sorted(range(size), key=self.counts.__getitem__, reverse=True)[:keep])
+            counts = [self.counts[i] for i in kept]
+            self.counts = array("q", bytes(8 * self.max_vocab))
+            self.counts[: len(kept)] = array("q", counts)
+        self.tokens = [self.tokens[i] for i in kept]
+        self.ids = {token: i for i, token in enumerate(self.tokens)}
+        self.pruned += size - len(kept)
+
+    def _top_ngrams(self, limit):
+        hashes = list(self.ngrams)
+        estimates = self.ngram_sketch.estimate(array("I", hashes))
+        ranked = sorted(zip(estimates, hashes), reverse=True)[:limit]
+        return [(h, self.ngrams[h]) for _, h in ranked]
+
+    def vocabulary(self, min_count=1):
+        """
+        Returns the vocabulary, most frequent first.
+
+        Counts are exact while no token was evicted, and sketch estimates after.
+
+        Args:
+            min_count (int): Leave out tokens counted fewer times.
+
+        Returns:
+            list: (token, count) pairs; a token's position is its ID.
+        """
+        if self.pruned:
+            counts = self.token_sketch.estimate(
+                array("I", (token_hash(token) for token in self.tokens))
+            )
+        else:
+            counts = self.counts[: len(self.tokens)]
+            counts = counts.tolist() if numpy is not None else list(counts)
+        ranked = sorted(zip(counts, self.tokens), key=lambda pair: (-pair[0], pair[1]))
+        return [(token, count) for count, token in ranked if count >= min_count]
+
+    def summary(self, vocabulary=None):
+        """
+        Returns the report of the corpus.
+
+        Args:
+            vocabulary (list): The result of vocabulary(), to avoid ranking twice.
+
+        Returns:
+            dict: Totals, distinct counts, the most frequent tokens and n-grams,
+                volumes per source, category and day, the article length
+                histogram, and the sketch error bounds.
+        """
+        if vocabulary is None:
+            vocabulary = self.vocabulary()
+        top_ngrams = self._top_ngrams(self.top)
+        ngram_counts = self.ngram_sketch.estimate(array("I", (h for h, _ in top_ngrams)))
+        return {
+            "articles": self.articles,
+            "tokens": self.token_sketch.total,
+            "ngrams": self.ngram_sketch.total,
+            "vocabulary": len(vocabulary),
+            "vocabulary_exact": not self.pruned,
+            "evicted_tokens": self.pruned,
+            "distinct_tokens_estimate": self.token_sketch.distinct(),
+            "distinct_ngrams_estimate": self.ngram_sketch.distinct(),
+            "top_tokens": vocabulary[: self.top],
+            "top_ngrams": [(gram, count) for (_, gram), count in zip(top_ngrams, ngram_counts)],
+            "sources": self.sources,
+            "categories": self.categories,
+            "days": dict(sorted(self.days.items())),
+            "article_tokens_histogram": {
+                f"<{1 << bucket}": count for bucket, count in enumerate(self.lengths) if count
+            },
+            "token_sketch_error": self.token_sketch.error_bound(),
+            "ngram_sketch_error": self.ngram_sketch.error_bound(),
+        }
+
+
+def _count(volume, length):
+    volume["articles"] = volume.get("articles", 0) + 1
+    volume["tokens"] = volume.get("tokens", 0) + length
+
+
+def article_facets(article):
+    """
+    Returns the fields an article's volume is counted under.
+
+    Args:
+        article (dict): The stored article.
+
+    Returns:
+        tuple: (source, category, day, missing fields), where day is the ISO
+            publication date in Bangladesh time or "unknown".
+    """
+    record = ArticleRecord.from_dict(article)
+    day = UNKNOWN_PARTITION
+    if record.published is not None:
+        day = datetime.fromtimestamp(record.published, BANGLADESH_TZ).date().isoformat()
+    missing = tuple(field for field in _CHECKED_FIELDS if article.get(field) in _MISSING)
+    return source_of(record.url), record.category or UNKNOWN_PARTITION, day, missing
+
+
+def _chunks(articles, fields, chunk_size):
+    articles = iter(articles)
+    while chunk := list(islice(articles, chunk_size)):
+        texts = [tuple(article.get(field) for field in fields) for article in chunk]
+        yield texts, [article_facets(article) for article in chunk]
+
+
+def corpus_stats(  # pylint: disable=too-many-arguments,too-many-locals
+    paths,
+    *,
+    fields=("title", "content"),
+    method="native",
+    ngram=2,
+    workers=None,
+    chunk_size=64,
+    **options,
+):
+    """
+    Computes the statistics of every article in the crawler output.
+
+    Chunks are tokenized and counted on a process pool with at most two chunks
+    per process in flight, and merged in input order.
+
+    Args:
+        paths (iterable): Crawler outputs: JSON files, JSONL shards or shard directories.
+        fields (tuple): The article fields to tokenize.
+        method (str): "native", "indic" or "nltk".
+        ngram (int): The longest n-gram counted, 1 for tokens only.
+        workers (int): Number of tokenizer processes, 0 counts in-process.
+            Defaults to the number of CPUs.
+        chunk_size (int): Number of articles sent to a process at a time.
+        **options: Keyword arguments of CorpusStats.
+
+    Returns:
+        CorpusStats: The merged statistics.
+
+    Raises:
+        ValueError: If the method is unknown.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown tokenization method: {method}")
+    if workers is None:
+        workers = os.cpu_count() or 1
+    stats = CorpusStats(**options)
+    articles = (article for path in paths for article in iter_articles(path))
+    chunks = _chunks(articles, fields, chunk_size)
+    if workers == 0:
+        for texts, facets in chunks:
+            stats.add_chunk(_chunk_stats(texts, method, ngram, stats.top), facets)
+        return stats
+    with multiprocessing.get_context("spawn").Pool(workers) as pool:
+        pending = deque()
+        for texts, facets in chunks:
+            task = pool.apply_async(_chunk_stats, (texts, method, ngram, stats.top))
+            pending.append((facets, task))
+            if len(pending) >= workers * 2:
+                facets, result = pending.popleft()
+                stats.add_chunk(result.get(), facets)
+        while pending:
+            facets, result = pending.popleft()
+            stats.add_chunk(result.get(), facets)
+    return stats
+
+
+def write_outputs(stats, directory, min_count=1):
+    """
+    Writes the vocabulary and the summary report.
+
+    Args:
+        stats (CorpusStats): The statistics.
+        directory (str): The output directory, created if missing. It receives
+            vocab.tsv, one "token<TAB>count" line per token with the line
+            number as its ID, and summary.json.
+        min_count (int): Leave out tokens counted fewer times.
+
+    Returns:
+        dict: The summary.
+    """
+    os.makedirs(directory, exist_ok=True)
+    vocabulary = stats.vocabulary(min_count)
+    with open(os.path.join(directory, "vocab.tsv"), "w", encoding="utf-8") as f:
+        for token, count in vocabulary:
+            f.write(f"{token}\t{count}\n")
+    summary = stats.summary(vocabulary)
+    with open(os.path.join(directory, "summary.json"), "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    return summary
+
+
+def main():
+    """
+    Computes corpus statistics from the command line.
+    """
+    parser = argparse.ArgumentParser(description="Count the tokens of a crawled article corpus.")
+    parser.add_argument("inputs", nargs="+", help="JSON files, JSONL shards or shard directories")
+    parser.add_argument("-o", "--output", default="./data/corpus_stats", help="output directory")
+    parser.add_argument("--method", choices=METHODS, default="native", help="tokenizer")
+    parser.add_argument("--fields", nargs="+", default=["title", "content"],
+                        help="article fields to tokenize")
+    parser.add_argument("--ngram", type=int, default=2, help="longest n-gram counted")
+    parser.add_argument("--max-vocab", type=int, default=1_000_000,
+                        help="distinct tokens counted exactly")
+    parser.add_argument("--sketch-width", type=int, default=1 << 20, help="cells per sketch row")
+    parser.add_argument("--sketch-depth", type=int, default=4, help="sketch rows")
+    parser.add_argument("--top", type=int, default=100, help="frequent tokens and n-grams reported")
+    parser.add_argument("--min-count", type=int, default=1, help="smallest count in the vocabulary")
+    parser.add_argument("--workers", type=int, default=None, help="tokenizer processes")
+    parser.add_argument("--chunk-size", type=int, default=64, help="articles per task")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    stats = corpus_stats(
+        args.inputs,
+        fields=tuple(args.fields),
+        method=args.method,
+        ngram=args.ngram,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        max_vocab=args.max_vocab,
+        sketch_width=args.sketch_width,
+        sketch_depth=args.sketch_depth,
+        top=args.top,
+    )
+    summary = write_outputs(stats, args.output, args.min_count)
+    elapsed = time.perf_counter() - started
+    print(f"{summary['articles']} articles, {summary['tokens']} tokens, "
+          f"{summary['vocabulary']} vocabulary entries in {elapsed:.2f}s")
+    for source, volume in summary["sources"].items():
+        missing = {field: n for field, n in volume["missing"].items() if n}
+        print(f"  {source}: {volume['articles']} articles, {volume['tokens']} tokens, "
+              f"missing {missing or 'nothing'}, {volume['unparsed_dates']} unparsed dates")
+    print("Written to", args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""
+Corpus tokenization of Bengali news articles.
+
+Streams articles from crawler output, tokenizes them in chunks on a process pool
+and writes one JSON line of token streams per article, in input order.
+
+Run from the repository root:
+    python -m src.tokenization.corpus_tokenizer data/NewsArticle.json -o data/tokens.jsonl
+"""
+
+import argparse
+import gzip
+import json
+import multiprocessing
+import os
+import time
+from collections import deque
+from itertools import islice
+
+from src.crawlers.article_store import iter_articles
+from src.tokenization.bn_segmenter import segment
+from src.tokenization.bn_tokenizer_v2 import tokenize_sentences, tokenize_words
+
+METHODS = ("native", "indic", "nltk")
+
+
+def native_tokenize_text(text):
+    """
+    Splits text into sentences and words with the regex segmenter.
+
+    Args:
+        text (str): The text to tokenize.
+
+    Returns:
+        list: One list of words per sentence.
+    """
+    return [[text[start:end] for start, end in sentence] for sentence in segment(text)]
+
+
+def indic_tokenize_text(text):
+    """
+    Splits text into sentences on the danda and each sentence into words.
+
+    Args:
+        text (str): The text to tokenize.
+
+    Returns:
+        list: One list of words per non-empty sentence.
+    """
+    sentences = (sentence.strip() for sentence in tokenize_sentences(text))
+    return [tokenize_words(sentence) for sentence in sentences if sentence]
+
+
+def nltk_tokenize_text(text):
+    """
+    Splits text into sentences and words with NLTK.
+
+    Args:
+        text (str): The text to tokenize.
+
+    Returns:
+        list: One list of words per sentence.
+    """
+    # Imported on first use so that the other methods work without NLTK data.
+    from src.tokenization.bn_tokenizer import tokenize_with_nltk  # pylint: disable=import-outside-toplevel
+
+    return tokenize_with_nltk(text)[1]
+
+
+def tokenize_article(article, fields=("title", "content"), method="native"):
+    """
+    Tokenizes the text fields of an article.
+
+    Args:
+        article (dict): The article.
+        fields (tuple): The fields to tokenize.
+        method (str): "native", "indic" or "nltk".
+
+    Returns:
+        dict: The article URL and, per field, one list of words per sentence.
+    """
+    tokenize = TOKENIZERS[method]
+    record = {"url": article.get("url")}
+    for field in fields:
+        record[field] = tokenize(article.get(field) or "")
+    return record
+
+
+TOKENIZERS = {
+    "native": native_tokenize_text,
+    "indic": indic_tokenize_text,
+    "nltk": nltk_tokenize_text,
+}
+
+
+def _tokenize_chunk(chunk, fields, method):
+    """
+    Tokenizes a chunk of articles in a worker process.
+
+    Args:
+        chunk (list): The articles, reduced to the URL and the tokenized fields.
+        fields (tuple): The fields to tokenize.
+        method (str): "native", "indic" or "nltk".
+
+    Returns:
+        str: The JSON lines of the chunk, serialized in the worker.
+    """
+    return "".join(
+        json.dumps(tokenize_article(article, fields, method), ensure_ascii=False) + "\n"
+        for article in chunk
+    )
+
+
+def _chunks(articles, fields, chunk_size):
+    keys = ("url",) + tuple(fields)
+    articles = iter(articles)
+    while chunk := [
+        {key: article.get(key) for key in keys} for article in islice(articles, chunk_size)
+    ]:
+        yield chunk
+
+
+def tokenize_corpus(  # pylint: disable=too-many-arguments,too-many-locals
+    paths,
+    output_file,
+    *,
+    fields=("title", "content"),
+    method="native",
+    workers=None,
+    chunk_size=64,
+):
+    """
+    Tokenizes every article in the crawler output and writes the token streams.
+
+    Chunks are tokenized on a process pool. At most two chunks per process are
+    in flight, so memory stays bounded for any corpus size, and results are
+    written in input order.
+
+    Args:
+        paths (iterable): Crawler outputs: JSON files, JSONL shards or shard directories.
+        output_file (str): The JSONL output file, gzip compressed if it ends in .gz.
+        fields (tuple): The article fields to tokenize.
+        method (str): "native", "indic" or "nltk".
+        workers (int): Number of tokenizer processes, 0 tokenizes in-process.
+            Defaults to the number of CPUs.
+        chunk_size (int): Number of articles sent to a process at a time.
+
+    Returns:
+        int: The number of articles tokenized.
+
+    Raises:
+        ValueError: If the method is unknown.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown tokenization method: {method}")
+    if workers is None:
+        workers = os.cpu_count() or 1
+    articles = (article for path in paths for article in iter_articles(path))
+    chunks = _chunks(articles, fields, chunk_size)
+    count = 0
+    with _open_output(output_file) as out:
+        if workers == 0:
+            for chunk in chunks:
+                out.write(_tokenize_chunk(chunk, fields, method))
+                count += len(chunk)
+            return count
+        with multiprocessing.get_context("spawn").Pool(workers) as pool:
+            pending = deque()
+            for chunk in chunks:
+                task = pool.apply_async(_tokenize_chunk, (chunk, fields, method))
+                pending.append((len(chunk), task))
+                if len(pending) >= workers * 2:
+                    size, result = pending.popleft()
+                    out.write(result.get())
+                    count += size
+            while pending:
+                size, result = pending.popleft()
+                out.write(result.get())
+                count += size
+    return count
+
+
+def _open_output(path):
+    if path.endswith(".gz"):
+        return gzip.open(path, "wt", encoding="utf-8")
+    return open(path, "w", encoding="utf-8")  # pylint: disable=consider-using-with
+
+
+def main():
+    """
+    Tokenizes a crawled corpus from the command line.
+    """
+    parser = argparse.ArgumentParser(description="Tokenize a crawled article corpus.")
+    parser.add_argument("inputs", nargs="+", help="JSON files, JSONL shards or shard directories")
+    parser.add_argument("-o", "--output", default="./data/tokens.jsonl", help="output JSONL file")
+    parser.add_argument("--method", choices=METHODS, default="native", help="tokenizer")
+    parser.add_argument("--fields", nargs="+", default=["title", "content"],
+                        help="article fields to tokenize")
+    parser.add_argument("--workers", type=int, default=None, help="tokenizer processes")
+    parser.add_argument("--chunk-size", type=int, default=64, help="articles per task")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    count = tokenize_corpus(
+        args.inputs,
+        args.output,
+        fields=tuple(args.fields),
+        method=args.method,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+    )
+    elapsed = time.perf_counter() - started
+    print(f"Tokenized {count} articles in {elapsed:.2f}s ({count / elapsed:.1f} articles/s)")
+
+
+if __name__ == "__main__":
+    main()
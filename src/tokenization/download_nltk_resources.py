@@ -1,2 +1,16 @@
-import nltk
-nltk.download('punkt')
+"""
+Downloads the NLTK models used by the tokenizers into the vendored nltk_data
+directory. The tokenizers never download anything themselves.
+
+Run from the repository root:
+    python -m src.tokenization.download_nltk_resources punkt punkt_tab
+"""
+
+import sys
+
+from src.tokenization.resources import NLTK_DATA_DIR, download_resources
+
+if __name__ == "__main__":
+    PACKAGES = tuple(sys.argv[1:]) or ("punkt",)
+    if not download_resources(PACKAGES):
+        sys.exit(f"Failed to download {', '.join(PACKAGES)} to {NLTK_DATA_DIR}")
@@ -0,0 +1,115 @@
+"""
+Offline-first resource loading for the tokenizers.
+
+NLTK models are read from the nltk_data directory vendored at the repository
+root and are never downloaded implicitly; download_resources() is the only
+function that touches the network. NLTK is imported on first use, so modules
+that only use the regex segmenter or indicnlp do not pay for it.
+"""
+
+import os
+import pickle
+from functools import lru_cache
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+NLTK_DATA_DIR = os.path.join(REPO_ROOT, "nltk_data")
+BPE_MODEL_FILE = os.path.join(REPO_ROOT, "data", "bpe_tokenizer.json")
+
+
+def configure_nltk_data():
+    """
+    Puts the vendored nltk_data directory first on NLTK's search path.
+
+    Returns:
+        module: The nltk module.
+    """
+    import nltk  # pylint: disable=import-outside-toplevel
+
+    if NLTK_DATA_DIR not in nltk.data.path:
+        nltk.data.path.insert(0, NLTK_DATA_DIR)
+    return nltk
+
+
+@lru_cache(maxsize=None)
+def load_punkt(language="english"):
+    """
+    Loads a punkt sentence tokenizer once per process, without downloading.
+
+    The punkt_tab format of NLTK 3.9 is used when it is vendored; otherwise the
+    vendored punkt pickle is loaded directly. Only files under NLTK_DATA_DIR are
+    read, never a model found elsewhere on NLTK's search path.
+
+    Args:
+        language (str): The punkt model language.
+
+    Returns:
+        PunktSentenceTokenizer: The sentence tokenizer.
+
+    Raises:
+        LookupError: If neither model is vendored for the language.
+    """
+    configure_nltk_data()
+    if os.path.basename(language) != language or language in ("", os.curdir, os.pardir):
+        raise LookupError(f"Invalid punkt language: {language!r}")
+    if os.path.isdir(os.path.join(NLTK_DATA_DIR, "tokenizers", "punkt_tab", language)):
+        from nltk.tokenize import PunktTokenizer  # pylint: disable=import-outside-toplevel
+
+        return PunktTokenizer(language)
+    path = os.path.join(NLTK_DATA_DIR, "tokenizers", "punkt", "PY3", f"{language}.pickle")
+    if not os.path.isfile(path):
+        raise LookupError(
+            f"No punkt model for {language} in {NLTK_DATA_DIR}; "
+            "run python -m src.tokenization.download_nltk_resources"
+        )
+    # The pickle is the vendored file from this repository, not user input.
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def nltk_sent_tokenize(text, language="english"):
+    """
+    Splits text into sentences with the locally available punkt model.
+
+    Args:
+        text (str): The text to split.
+        language (str): The punkt model language.
+
+    Returns:
+        list: The sentences.
+    """
+    return load_punkt(language).tokenize(text)
+
+
+def nltk_word_tokenize(sentence):
+    """
+    Splits one sentence into words with NLTK's Treebank word tokenizer.
+
+    Args:
+        sentence (str): The sentence.
+
+    Returns:
+        list: The words.
+    """
+    from nltk.tokenize import word_tokenize  # pylint: disable=import-outside-toplevel
+
+    # preserve_line skips word_tokenize's own sentence split, which would load
+    # punkt again and require the punkt_tab download.
+    return word_tokenize(sentence, preserve_line=True)
+
+
+def download_resources(packages=("punkt",), download_dir=NLTK_DATA_DIR):
+    """
+    Downloads NLTK packages into the vendored nltk_data directory.
+
+    This is the only function that accesses the network; call it explicitly
+    when setting up a new checkout that lacks a model.
+
+    Args:
+        packages (tuple): The NLTK package names, e.g. ("punkt", "punkt_tab").
+        download_dir (str): The target directory.
+
+    Returns:
+        bool: True if every package was downloaded.
+    """
+    nltk = configure_nltk_data()
+    return all(nltk.download(package, download_dir=download_dir) for package in packages)
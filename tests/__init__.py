@@ -0,0 +1,3 @@
+"""
+Tests of the crawlers, tokenizers and search index.
+"""
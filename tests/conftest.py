@@ -0,0 +1,25 @@
+"""
+Shared fixtures: the articles of data/NewsArticle.json and the local mock news
+server that serves them.
+"""
+
+import pytest
+
+from benchmarks.mock_server import MockNewsServer, load_articles
+
+
+@pytest.fixture(scope="session")
+def articles():
+    """
+    Returns the crawled articles shipped with the repository.
+    """
+    return load_articles()
+
+
+@pytest.fixture
+def mock_server(articles):  # pylint: disable=redefined-outer-name
+    """
+    Runs the mock news server for one test.
+    """
+    with MockNewsServer(articles, articles_per_archive=10) as server:
+        yield server
@@ -0,0 +1,49 @@
+"""
+Tests of the slotted article record and its stored form.
+"""
+
+import pickle
+
+from src.crawlers.article_record import FIELDS, ArticleRecord
+
+STORED = {
+    "title": "শিরোনাম",
+    "date": "১৪৫৯ ঘণ্টা, মার্চ ৩১, ২০২৪",
+    "author": "স্টাফ করেসপন্ডেন্ট",
+    "content": "খবরের লেখা",
+    "category": "খেলা",
+    "url": "https://www.banglanews24.com/sports/news/bd/1306708.details",
+    "published": 1711875540,
+}
+
+
+def test_stored_article_round_trips():
+    """
+    A stored article comes back as the same JSON object, in the same order.
+    """
+    record = ArticleRecord.from_dict(STORED)
+    assert record.to_dict() == STORED
+    assert list(record.to_dict()) == list(FIELDS) + ["url", "published"]
+    duplicate = dict(STORED, duplicate_of="https://www.bd-pratidin.com/sports/2024/03/31/1")
+    assert ArticleRecord.from_dict(duplicate).to_dict() == duplicate
+
+
+def test_article_stored_without_timestamp_gets_one():
+    """
+    Articles stored before the timestamp existed get it from their date.
+    """
+    legacy = {key: value for key, value in STORED.items() if key != "published"}
+    assert ArticleRecord.from_dict(legacy).published == STORED["published"]
+    assert ArticleRecord.from_dict(dict(legacy, date="unknown")).published is None
+
+
+def test_pickled_record_keeps_its_slots():
+    """
+    A record sent to or from a parser process is equal and shares interned fields.
+    """
+    record = ArticleRecord.from_dict(STORED)
+    copy = pickle.loads(pickle.dumps(record))
+    assert copy == record
+    assert not hasattr(copy, "__dict__")
+    assert copy.category is record.category
+    assert copy.author is record.author
@@ -0,0 +1,61 @@
+"""
+Tests of the Bengali publication date parser.
+"""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from src.crawlers.bn_dates import BANGLADESH_TZ, bengali_timestamp, parse_bengali_date
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("২৭ এপ্রিল, ২০২৪ ২২:৫৬", datetime(2024, 4, 27, 22, 56)),
+        ("প্রকাশ: ০৫ জানুয়ারি ২০২৪", datetime(2024, 1, 5)),
+        ("১ ফেব্রুয়ারী, ২০২৩ ০৭:০৫", datetime(2023, 2, 1, 7, 5)),
+        ("১৪৫৯ ঘণ্টা, মার্চ ৩১, ২০২৪", datetime(2024, 3, 31, 14, 59)),
+        ("০৯০৫ ঘণ্টা, ডিসেম্বর ১, ২০২২", datetime(2022, 12, 1, 9, 5)),
+    ],
+)
+def test_bengali_months_and_digits(text, expected):
+    """
+    Both websites' formats parse into Bangladesh time, whatever the month spelling.
+    """
+    assert parse_bengali_date(text) == expected.replace(tzinfo=BANGLADESH_TZ)
+
+
+def test_decomposed_month_spelling():
+    """
+    A month name written with a nukta matches its precomposed spelling.
+    """
+    for ya in ("\u09df", "\u09af\u09bc"):
+        assert parse_bengali_date(f"৩ জানু{ya}ারি, ২০২৪").month == 1
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        None,
+        "",
+        "আজকের খবর",
+        "২৭ Sunday, ২০২৪",
+        "৩১ ফেব্রুয়ারি, ২০২৪",
+        "২৫৯৯ ঘণ্টা, মার্চ ৩১, ২০২৪",
+    ],
+)
+def test_unparseable_dates(text):
+    """
+    Text that is not a valid date gives None instead of raising.
+    """
+    assert parse_bengali_date(text) is None
+    assert bengali_timestamp(text) is None
+
+
+def test_timestamp_is_in_bangladesh_time():
+    """
+    The timestamp of a date shown on a page is six hours ahead of UTC.
+    """
+    midnight_utc = datetime(2024, 4, 27, tzinfo=timezone.utc).timestamp()
+    assert bengali_timestamp("২৭ এপ্রিল, ২০২৪ ০৬:০০") == midnight_utc
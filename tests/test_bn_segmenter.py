@@ -0,0 +1,93 @@
+"""
+Tests of the regex Bengali segmenter.
+"""
+
+from src.tokenization.bn_segmenter import iter_tokens, segment, sentences, words
+
+
+def test_sentences_split_at_terminators():
+    """
+    Danda, double danda, question and exclamation marks end sentences.
+    """
+    text = "আমি ভাত খাই। তুমি কী খাও? দারুণ! শেষ॥"
+    assert sentences(text) == ["আমি ভাত খাই।", "তুমি কী খাও?", "দারুণ!", "শেষ॥"]
+
+
+def test_words_and_punctuation():
+    """
+    Punctuation is split from the words it follows.
+    """
+    assert words("ঢাকা, বাংলাদেশ।") == ["ঢাকা", ",", "বাংলাদেশ", "।"]
+
+
+def test_numbers_keep_separators_and_suffix():
+    """
+    Decimal points, times, dates and suffixes stay in one number.
+    """
+    text = "তাপমাত্রা ৩.৫ ডিগ্রি, সময় ১২:৩০, ১২টি গাড়ি, 30/03/2024।"
+    tokens = [text[start:end] for start, end, kind in iter_tokens(text) if kind == "number"]
+    assert tokens == ["৩.৫", "১২:৩০", "১২টি", "30/03/2024"]
+
+
+def test_abbreviations_do_not_end_sentences():
+    """
+    Bengali and Latin abbreviations do not end sentences.
+    """
+    text = "ডা. মো. রহিম এসেছেন। Dr. Smith যাবেন।"
+    assert sentences(text) == ["ডা. মো. রহিম এসেছেন।", "Dr. Smith যাবেন।"]
+
+
+def test_closing_quote_stays_with_its_sentence():
+    """
+    A quote after a terminator closes the sentence it follows.
+    """
+    text = "তিনি বলেন, \"আমি যাব।\" পরে ফিরলেন।"
+    assert sentences(text) == ["তিনি বলেন, \"আমি যাব।\"", "পরে ফিরলেন।"]
+
+
+def test_offsets_slice_the_input():
+    """
+    Offsets slice tokens out of the input without spaces.
+    """
+    text = "  প্রথম বাক্য।   দ্বিতীয় বাক্য। "
+    for tokens in segment(text):
+        for start, end in tokens:
+            assert text[start:end] == text[start:end].strip()
+    assert [text[s:e] for s, e in segment(text)[1]] == ["দ্বিতীয়", "বাক্য", "।"]
+
+
+def test_articles_round_trip(articles):
+    """
+    The tokens of real articles cover every non-space character.
+    """
+    for article in articles[:20]:
+        content = article["content"]
+        assert "".join(words(content)) == "".join(content.split())
+
+
+def test_short_words_before_a_full_stop_end_sentences():
+    """
+    A short word before a full stop is not taken for an abbreviation.
+    """
+    assert sentences("সে বাড়ি গেল. তারপর ঘুমাল.") == ["সে বাড়ি গেল.", "তারপর ঘুমাল."]
+    assert words("ভালো...") == ["ভালো", "..."]
+
+
+def test_initials_are_abbreviations():
+    """
+    Runs of initials and initials followed by another one are abbreviations.
+    """
+    text = "তিনি এম.এ. পাস করেন। এ. কে. এম. ফজলুল হক এলেন। এখানে এস. তারপর যাও."
+    assert sentences(text) == [
+        "তিনি এম.এ. পাস করেন।",
+        "এ. কে. এম. ফজলুল হক এলেন।",
+        "এখানে এস.",
+        "তারপর যাও.",
+    ]
+
+
+def test_words_before_a_full_stop_stay_whole():
+    """
+    A word before a full stop is one token, not a prefix and a remainder.
+    """
+    assert words("মোবাইল. মো.") == ["মোবাইল", ".", "মো."]
@@ -0,0 +1,97 @@
+"""
+Tests of the corpus statistics' vocabulary, exact and after eviction.
+"""
+
+import json
+import random
+from collections import Counter
+
+import pytest
+
+from src.tokenization import corpus_stats
+from src.tokenization.corpus_tokenizer import TOKENIZERS
+
+
+def write_corpus(path, articles):
+    """
+    Writes articles as a JSON list and returns the path.
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(articles, f, ensure_ascii=False)
+    return str(path)
+
+
+def exact_counts(articles):
+    """
+    Counts the tokens of the title and content of every article.
+    """
+    counts = Counter()
+    for article in articles:
+        for field in ("title", "content"):
+            for sentence in TOKENIZERS["native"](article[field] or ""):
+                counts.update(sentence)
+    return counts
+
+
+def zipf_articles(count, distinct, seed=3):
+    """
+    Returns articles drawing tokens from a vocabulary with a long tail.
+    """
+    rng = random.Random(seed)
+    words = [f"tok{i}" for i in range(distinct)]
+    weights = [1 / (rank + 1) for rank in range(distinct)]
+    return [
+        {
+            "title": " ".join(rng.choices(words, weights, k=4)),
+            "content": " ".join(rng.choices(words, weights, k=80)) + "। শেষ",
+            "category": "খেলা",
+            "url": f"https://www.banglanews24.com/sports/news/bd/{i}.details",
+        }
+        for i in range(count)
+    ]
+
+
+@pytest.fixture(name="backend", params=["numpy", "array"])
+def fixture_backend(request, monkeypatch):
+    """
+    Runs a test with numpy and with its pure Python fallback.
+    """
+    if request.param == "array":
+        monkeypatch.setattr(corpus_stats, "numpy", None)
+
+
+@pytest.mark.usefixtures("backend")
+def test_vocabulary_is_exact_without_eviction(tmp_path, articles):
+    """
+    Without evictions the vocabulary holds the exact count of every token.
+    """
+    path = write_corpus(tmp_path / "articles.json", articles)
+    stats = corpus_stats.corpus_stats([path], workers=0, chunk_size=7)
+    expected = exact_counts(articles)
+    vocabulary = stats.vocabulary()
+    assert not stats.pruned
+    assert dict(vocabulary) == expected
+    assert [count for _, count in vocabulary] == sorted(expected.values(), reverse=True)
+    summary = stats.summary(vocabulary)
+    assert summary["vocabulary_exact"]
+    assert summary["tokens"] == sum(expected.values())
+
+
+@pytest.mark.usefixtures("backend")
+def test_estimates_never_undercount_after_eviction(tmp_path):
+    """
+    Once the vocabulary was pruned, every reported count is at least the true one.
+    """
+    articles = zipf_articles(300, 5000)
+    path = write_corpus(tmp_path / "articles.json", articles)
+    stats = corpus_stats.corpus_stats(
+        [path], workers=0, chunk_size=16, max_vocab=1000, sketch_width=1 << 10, sketch_depth=3
+    )
+    expected = exact_counts(articles)
+    vocabulary = stats.vocabulary()
+    assert stats.pruned
+    assert len(vocabulary) <= 1000
+    assert all(count >= expected[token] for token, count in vocabulary)
+    assert stats.token_sketch.total == sum(expected.values())
+    # The most frequent tokens survive every eviction.
+    assert vocabulary[0][0] in {token for token, _ in expected.most_common(3)}
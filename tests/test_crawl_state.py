@@ -0,0 +1,107 @@
+"""
+Tests of the incremental crawl state.
+"""
+
+from datetime import date
+
+from src.crawlers.bn24_crawler_v2 import BanglaNews24Crawler
+from src.crawlers.crawl_state import IncrementalState, article_id
+from src.crawlers.site_crawler import default_crawler
+
+DAY = date(2024, 3, 31)
+TODAY = date(2024, 4, 10)
+
+
+def urls(ids):
+    """
+    Returns BanglaNews24 article URLs for article IDs.
+    """
+    return [f"https://www.banglanews24.com/sports/news/bd/{i}.details" for i in ids]
+
+
+def test_article_id():
+    """
+    The numeric ID is taken from the URLs of both websites.
+    """
+    assert article_id(urls([1306708])[0]) == "1306708"
+    assert article_id("https://www.bd-pratidin.com/country/2024/03/31/982512") == "982512"
+    assert article_id("https://example.com/about") == "https://example.com/about"
+
+
+def test_stored_links_are_skipped_after_restart(tmp_path):
+    """
+    Stored articles are not selected again by a later run.
+    """
+    path = str(tmp_path / "state.sqlite3")
+    with IncrementalState(path, stop_after=0) as state:
+        assert state.new_links("banglanews24", "sports", DAY, urls([3, 2, 1])) == urls([3, 2, 1])
+        state.mark_stored(urls([3, 2, 1]))
+    with IncrementalState(path, stop_after=0) as state:
+        assert state.new_links("banglanews24", "sports", DAY, urls([4, 3, 2, 1])) == urls([4])
+        assert state.counts()["articles"] == 3
+
+
+def test_reading_stops_after_a_run_of_known_links(tmp_path):
+    """
+    A page is read up to stop_after consecutive known links.
+    """
+    with IncrementalState(str(tmp_path / "state.sqlite3"), stop_after=2) as state:
+        state.new_links("banglanews24", "sports", DAY, urls([3, 2, 1]))
+        state.mark_stored(urls([3, 2, 1]))
+        assert state.new_links("banglanews24", "sports", DAY, urls([5, 3, 2, 4])) == urls([5])
+
+
+def test_archive_closes_once_its_links_are_stored(tmp_path):
+    """
+    An archive closes only once every new link was stored.
+    """
+    archive = ("banglanews24", "sports", DAY)
+    with IncrementalState(str(tmp_path / "state.sqlite3")) as state:
+        state.new_links(*archive, urls([2, 1]))
+        state.mark_stored(urls([2]))
+        state.mark_crawled([archive], today=TODAY)
+        assert not state.is_closed(*archive)
+        state.mark_stored(urls([1]))
+        state.mark_crawled([archive], today=TODAY)
+        assert state.is_closed(*archive)
+
+
+def test_recent_archive_stays_open(tmp_path):
+    """
+    An archive within the grace period stays open.
+    """
+    archive = ("banglanews24", "sports", DAY)
+    with IncrementalState(str(tmp_path / "state.sqlite3"), grace_days=1) as state:
+        state.mark_crawled([archive], today=date(2024, 4, 1))
+        assert not state.is_closed(*archive)
+
+
+def test_article_in_several_categories_closes_each(tmp_path):
+    """
+    An article listed under two categories is recorded under both once stored.
+    """
+    sports = ("banglanews24", "sports", DAY)
+    national = ("banglanews24", "national", DAY)
+    with IncrementalState(str(tmp_path / "state.sqlite3")) as state:
+        assert state.new_links(*sports, urls([2, 1])) == urls([2, 1])
+        assert state.new_links(*national, urls([2])) == urls([2])
+        state.mark_stored(urls([2, 1]))
+        state.mark_crawled([sports, national], today=TODAY)
+        assert state.is_closed(*sports)
+        assert state.is_closed(*national)
+        assert not state.new_links(*national, urls([2]), stop_after=0)
+        assert not state.new_links(*sports, urls([2]), stop_after=0)
+
+
+def test_command_line_crawl_keeps_its_state(tmp_path, monkeypatch):
+    """
+    A crawler built with a state file skips the articles stored by earlier runs.
+    """
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data").mkdir()
+    with IncrementalState("state.sqlite3", stop_after=0) as state:
+        state.new_links("banglanews24", "sports", DAY, urls([1]))
+        state.mark_stored(urls([1]))
+    crawler = default_crawler(BanglaNews24Crawler, None, state_file="state.sqlite3")
+    assert crawler.state.new_links("banglanews24", "sports", DAY, urls([2, 1])) == urls([2])
+    assert default_crawler(BanglaNews24Crawler, None).state is None
@@ -0,0 +1,71 @@
+"""
+Tests of the near-duplicate index on the pages of the mock server.
+"""
+
+from src.crawlers.dedup import NearDuplicateIndex, shingles
+
+
+def unique(articles):
+    """
+    Returns the articles with distinct URLs and content.
+    """
+    seen = set()
+    result = []
+    for article in articles:
+        if article["url"] not in seen and article["content"] not in seen:
+            seen.update((article["url"], article["content"]))
+            result.append(article)
+    return result
+
+
+def test_shingles_need_enough_words():
+    """
+    Texts shorter than one shingle have none.
+    """
+    assert not shingles("Unknown")
+    assert len(shingles("এক দুই তিন চার")) == 2
+
+
+def test_near_duplicate_is_found(tmp_path, articles):
+    """
+    A lightly edited copy is recorded as a duplicate of its original.
+    """
+    original = unique(articles)[0]
+    words = original["content"].split()
+    edited = " ".join(words[:-2])
+    with NearDuplicateIndex(str(tmp_path / "dedup.sqlite3"), threshold=0.8) as index:
+        assert index.add(original["url"], original["content"]) is None
+        assert index.add("http://example.com/copy", edited) == original["url"]
+        assert index.duplicates() == {original["url"]: ["http://example.com/copy"]}
+
+
+def test_distinct_articles_are_kept(tmp_path, articles):
+    """
+    Different articles are originals.
+    """
+    sample = unique(articles)[:30]
+    with NearDuplicateIndex(str(tmp_path / "dedup.sqlite3")) as index:
+        originals = [index.add(a["url"], a["content"]) for a in sample]
+    assert originals.count(None) >= len(sample) - 2
+
+
+def test_placeholder_content_is_never_a_duplicate(tmp_path):
+    """
+    The "Unknown" placeholder never matches.
+    """
+    with NearDuplicateIndex(str(tmp_path / "dedup.sqlite3")) as index:
+        assert index.add("http://example.com/a", "Unknown") is None
+        assert index.add("http://example.com/b", "Unknown") is None
+
+
+def test_index_persists(tmp_path, articles):
+    """
+    Signatures survive reopening the database.
+    """
+    path = str(tmp_path / "dedup.sqlite3")
+    original = unique(articles)[0]
+    with NearDuplicateIndex(path) as index:
+        index.add(original["url"], original["content"])
+    with NearDuplicateIndex(path) as index:
+        assert original["url"] in index
+        assert index.query(original["content"])[0] == (original["url"], 1.0)
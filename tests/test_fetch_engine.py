@@ -0,0 +1,135 @@
+"""
+Tests of the asyncio fetch engine against the local mock server.
+"""
+
+import asyncio
+import threading
+import time
+import urllib.request
+
+import pytest
+
+pytest.importorskip("requests")
+
+# pylint: disable=wrong-import-position
+from src.crawlers.fetch_engine import AsyncFetchEngine
+from src.crawlers.http_fetcher import HttpFetcher
+from src.crawlers.metrics import CrawlMetrics
+
+
+class UrllibFetcher:  # pylint: disable=too-few-public-methods
+    """
+    A blocking fetcher that counts the requests it has in flight.
+    """
+
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.in_flight = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def fetch(self, url):
+        """
+        Fetches a URL, raising OSError for the URLs in fail.
+        """
+        with self._lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        try:
+            if url in self.fail:
+                raise OSError(f"cache unavailable for {url}")
+            with urllib.request.urlopen(url, timeout=10) as response:
+                return response.read()
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+def article_urls(server, count):
+    """
+    Returns BanglaNews24 article URLs of the mock server.
+    """
+    return [f"{server.base_url}/category-0/news/bd/{i}.details" for i in range(count)]
+
+
+def test_fetch_all_keeps_input_order(mock_server):
+    """
+    Results come back in input order with every page fetched.
+    """
+    urls = article_urls(mock_server, 20)
+    fetcher = HttpFetcher(pool_size=4, metrics=CrawlMetrics())
+    with AsyncFetchEngine(max_concurrency=8, per_host_limit=4, fetcher=fetcher,
+                          metrics=CrawlMetrics()) as engine:
+        results = engine.fetch_all(urls)
+    fetcher.close()
+    assert [result.url for result in results] == urls
+    assert all(result.error is None for result in results)
+    assert all(b"<article>" in result.content for result in results)
+
+
+def test_per_host_limit_is_honoured(mock_server):
+    """
+    No more than per_host_limit requests reach one host at once.
+    """
+    mock_server.latency = 0.02
+    fetcher = UrllibFetcher()
+    with AsyncFetchEngine(max_concurrency=16, per_host_limit=3, fetcher=fetcher,
+                          metrics=CrawlMetrics()) as engine:
+        engine.fetch_all(article_urls(mock_server, 30))
+    assert fetcher.peak == 3
+
+
+def test_politeness_delay_spaces_requests(mock_server):
+    """
+    Request starts on one host are politeness_delay apart.
+    """
+    fetcher = UrllibFetcher()
+    with AsyncFetchEngine(per_host_limit=4, politeness_delay=0.05, fetcher=fetcher,
+                          metrics=CrawlMetrics()) as engine:
+        started = time.perf_counter()
+        engine.fetch_all(article_urls(mock_server, 5))
+    assert time.perf_counter() - started >= 0.2
+
+
+def test_failed_url_does_not_abort_batch(mock_server):
+    """
+    An error other than a RequestException fails only its URL.
+    """
+    urls = article_urls(mock_server, 6)
+    metrics = CrawlMetrics()
+    fetcher = UrllibFetcher(fail=[urls[2]])
+    with AsyncFetchEngine(fetcher=fetcher, metrics=metrics) as engine:
+        results = engine.fetch_all(urls)
+    assert isinstance(results[2].error, OSError)
+    assert all(r.error is None for i, r in enumerate(results) if i != 2)
+    errors = [c for c in metrics.snapshot()["counters"] if c["name"] == "errors"]
+    assert errors == [{"name": "errors", "labels": {"stage": "fetch", "type": "OSError"},
+                       "value": 1}]
+
+
+def test_get_raises_the_fetch_error(mock_server):
+    """
+    get() raises the error of its URL.
+    """
+    url = article_urls(mock_server, 1)[0]
+    with AsyncFetchEngine(fetcher=UrllibFetcher(fail=[url]), metrics=CrawlMetrics()) as engine:
+        with pytest.raises(OSError):
+            engine.get(url)
+
+
+def test_concurrent_fetches_share_limits(mock_server):
+    """
+    URLs submitted one at a time share the global limit.
+    """
+    mock_server.latency = 0.02
+    fetcher = UrllibFetcher()
+    urls = article_urls(mock_server, 12)
+
+    async def submit_one_at_a_time(engine):
+        return await asyncio.gather(*(engine.fetch(url) for url in urls))
+
+    with AsyncFetchEngine(max_concurrency=2, per_host_limit=8, fetcher=fetcher,
+                          metrics=CrawlMetrics()) as engine:
+        results = asyncio.run(submit_one_at_a_time(engine))
+    assert fetcher.peak == 2
+    assert all(result.error is None for result in results)
@@ -0,0 +1,64 @@
+"""
+Tests of the URL frontier's resume and retry bookkeeping.
+"""
+
+from src.crawlers.frontier import DONE, FAILED, UrlFrontier
+from src.crawlers.metrics import CrawlMetrics
+from src.crawlers.pipeline import CrawlPipeline
+from tests.test_pipeline import ARCHIVE_URL, crawler_for, pipeline_pages
+
+URLS = [f"https://www.banglanews24.com/sports/news/bd/{i}.details" for i in range(4)]
+
+
+def test_reopened_frontier_resumes_unfinished_urls(tmp_path):
+    """
+    Seen, pending and failed URLs survive a restart, and done ones are skipped.
+    """
+    path = str(tmp_path / "frontier.sqlite3")
+    with UrlFrontier(path) as frontier:
+        frontier.add(URLS)
+        assert frontier.claim(URLS[1:]) == URLS[1:]
+        frontier.mark_done([URLS[2]])
+        frontier.mark_failed(URLS[3], ValueError("broken page"))
+    with UrlFrontier(path) as frontier:
+        assert sorted(frontier.unfinished()) == [URLS[0], URLS[1], URLS[3]]
+        assert frontier.status(URLS[2]) == DONE
+        assert frontier.claim(URLS) == [URLS[0], URLS[1], URLS[3]]
+        assert not frontier.unfinished("archive")
+
+
+def test_failed_url_is_retried_until_max_attempts(tmp_path):
+    """
+    A failing URL is handed back on resume until it has failed max_attempts times.
+    """
+    path = str(tmp_path / "frontier.sqlite3")
+    for attempt in range(3):
+        with UrlFrontier(path, max_attempts=3) as frontier:
+            if attempt:
+                assert frontier.unfinished() == [URLS[0]]
+            assert frontier.claim([URLS[0]]) == [URLS[0]]
+            frontier.mark_failed(URLS[0], ValueError("broken page"))
+    with UrlFrontier(path, max_attempts=3) as frontier:
+        assert frontier.status(URLS[0]) == FAILED
+        assert not frontier.unfinished()
+        assert not frontier.claim([URLS[0]])
+
+
+def test_failed_article_of_a_crawled_archive_is_refetched(tmp_path, articles):
+    """
+    The next run fetches an article that failed, although its archive is done.
+    """
+    path = str(tmp_path / "frontier.sqlite3")
+    with UrlFrontier(path) as frontier:
+        crawler = crawler_for(pipeline_pages(articles, empty={2}))
+        crawler.frontier = frontier
+        stats = CrawlPipeline(crawler, parse_workers=0, metrics=CrawlMetrics()).run([ARCHIVE_URL])
+        assert stats["failed"] == 1
+        crawler.mark_stored([article.url for article in crawler.articles])
+        frontier.mark_done([ARCHIVE_URL], kind="archive")
+    with UrlFrontier(path) as frontier:
+        crawler = crawler_for(pipeline_pages(articles))
+        crawler.frontier = frontier
+        stats = CrawlPipeline(crawler, parse_workers=0, metrics=CrawlMetrics()).run([ARCHIVE_URL])
+        assert stats["archives"] == 0
+        assert [article.url for article in crawler.articles] == [URLS[2]]
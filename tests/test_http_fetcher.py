@@ -0,0 +1,81 @@
+"""
+Tests of the pooled HTTP fetcher's bookkeeping and of the command-line cache options.
+"""
+
+import pytest
+import requests
+
+from src.crawlers import site_crawler
+from src.crawlers.http_fetcher import CacheMiss, HttpFetcher
+from src.crawlers.metrics import CrawlMetrics
+
+
+class CountingController:
+    """
+    A rate controller that counts the attempts in flight per host.
+    """
+
+    def __init__(self):
+        self.in_flight = {}
+        self.outcomes = []
+
+    def begin(self, host):
+        """
+        Counts an attempt as started.
+        """
+        self.in_flight[host] = self.in_flight.get(host, 0) + 1
+
+    def record(self, host, seconds, *, status=None, timed_out=False):
+        """
+        Counts an attempt as finished.
+        """
+        assert seconds >= 0
+        self.in_flight[host] -= 1
+        self.outcomes.append((status, timed_out))
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        requests.exceptions.TooManyRedirects,
+        requests.exceptions.ChunkedEncodingError,
+        requests.exceptions.ContentDecodingError,
+        requests.exceptions.InvalidURL,
+        requests.Timeout,
+    ],
+)
+def test_every_attempt_is_recorded(monkeypatch, error):
+    """
+    An attempt that raises leaves no request in flight at the controller.
+    """
+    controller = CountingController()
+    fetcher = HttpFetcher(max_retries=1, backoff_factor=0, rate_controller=controller,
+                          metrics=CrawlMetrics())
+
+    def fail(url, **kwargs):
+        raise error(url)
+
+    monkeypatch.setattr(fetcher.session, "get", fail)
+    with pytest.raises(error):
+        fetcher.get("http://example.com/page")
+    assert controller.in_flight == {"example.com": 0}
+    assert controller.outcomes[-1] == (None, error is requests.Timeout)
+
+
+def test_command_line_replay_reads_the_cache_only(monkeypatch, tmp_path):
+    """
+    The engine built from --cache-dir and --replay never touches the network.
+    """
+    monkeypatch.setattr(site_crawler, "HOST_LIMITS_FILE", str(tmp_path / "limits.sqlite3"))
+    monkeypatch.setattr("sys.argv", ["crawl", "--cache-dir", str(tmp_path / "cache"), "--replay"])
+    args = site_crawler.parse_crawl_arguments("Crawl.")
+    engine = site_crawler.default_engine(args.cache_dir, args.replay)
+    assert engine.fetcher.replay
+    assert engine.fetcher.cache.directory == str(tmp_path / "cache")
+
+    def fail(url, **kwargs):
+        raise AssertionError(f"network access for {url}")
+
+    monkeypatch.setattr(engine.fetcher.session, "get", fail)
+    with pytest.raises(CacheMiss):
+        engine.get("http://example.com/page")
@@ -0,0 +1,211 @@
+"""
+Tests of the inverted index against a brute-force scan of the same articles.
+"""
+
+import math
+import os
+import random
+
+import pytest
+
+from src.crawlers.parquet_export import source_of
+from src.search.inverted_index import InvertedIndex, IndexWriter, index_terms, parse_query
+from src.search.segments import BLOCK_SIZE
+
+WORDS = ["alpha"] * 6 + ["beta"] * 3 + ["gamma", "delta", "খেলা", "সাকিব", "টেস্ট", "২০২৪"]
+CATEGORIES = ["ক্রিকেট", "রাজনীতি", "অর্থনীতি"]
+START = 1_700_000_000
+QUERIES = [
+    ("alpha", {}),
+    ("alpha gamma", {}),
+    ('"alpha beta"', {}),
+    ('"সাকিব টেস্ট" alpha', {}),
+    ("2024", {"category": "ক্রিকেট"}),
+    ("beta", {"source": "bdpratidin", "start": START + 100 * 3600, "end": START + 300 * 3600}),
+    ("", {"category": "রাজনীতি", "source": "banglanews24"}),
+    ("", {"start": START, "end": START + 50 * 3600}),
+    ("nothing", {}),
+]
+
+
+def corpus(count=400, seed=7):
+    """
+    Returns articles of both sources, most of them containing "alpha".
+    """
+    rng = random.Random(seed)
+    articles = []
+    for i in range(count):
+        if i % 2:
+            url = f"https://www.banglanews24.com/sports/news/bd/{i}.details"
+        else:
+            url = f"https://www.bd-pratidin.com/country/2024/03/31/{i}"
+        articles.append({
+            "title": " ".join(rng.choices(WORDS, k=3)),
+            "date": None,
+            "author": None,
+            "content": " ".join(rng.choices(WORDS, k=rng.randint(5, 60))),
+            "category": rng.choice(CATEGORIES),
+            "url": url,
+            "published": None if i % 17 == 0 else START + i * 3600,
+        })
+    return articles
+
+
+def scan(articles):
+    """
+    Returns each article with the positions of its terms and its length.
+    """
+    documents = []
+    for article in articles:
+        title = index_terms(article["title"])
+        content = index_terms(article["content"])
+        positions = {}
+        for position, term in enumerate(title + [None] + content):
+            positions.setdefault(term, set()).add(position)
+        documents.append((article, positions, len(title) + len(content)))
+    return documents
+
+
+def selected(article, category=None, source=None, start=None, end=None):
+    """
+    Checks an article against the filters of a search.
+    """
+    if category and article["category"] != category:
+        return False
+    if source and source_of(article["url"]) != source:
+        return False
+    if start is None and end is None:
+        return True
+    return article["published"] is not None and start <= article["published"] <= end
+
+
+def contains(positions, phrase):
+    """
+    Checks whether the terms of a phrase occur at consecutive positions.
+    """
+    return any(
+        all(first + i in positions.get(term, ()) for i, term in enumerate(phrase))
+        for first in positions.get(phrase[0], ())
+    )
+
+
+def brute_force(documents, query, **filters):
+    """
+    Scores every matching document of scan() with BM25.
+    """
+    average = sum(length for _, _, length in documents) / len(documents)
+    phrases = parse_query(query)
+    weights = {}
+    for term in dict.fromkeys(term for phrase in phrases for term in phrase):
+        df = sum(term in positions for _, positions, _ in documents)
+        weights[term] = math.log(1 + (len(documents) - df + 0.5) / (df + 0.5))
+    scores = {}
+    for article, positions, length in documents:
+        if selected(article, **filters) and all(contains(positions, p) for p in phrases):
+            norm = 1.2 * (1 - 0.75 + 0.75 * length / average)
+            scores[article["url"]] = sum(
+                weight * len(positions[term]) * 2.2 / (len(positions[term]) + norm)
+                for term, weight in weights.items()
+            )
+    return scores
+
+
+def assert_matches_brute_force(index, documents):
+    """
+    Checks every query for its matching set and its best scores.
+    """
+    for query, filters in QUERIES:
+        expected = brute_force(documents, query, **filters)
+        assert expected or query == "nothing"
+        hits = index.search(query, limit=len(documents), **filters)
+        assert {hit.url: hit.score for hit in hits} == pytest.approx(expected)
+        top = index.search(query, limit=5, **filters)
+        assert [hit.score for hit in top] == pytest.approx(sorted(expected.values())[::-1][:5])
+
+
+@pytest.fixture(name="articles", scope="module")
+def fixture_articles():
+    """
+    The synthetic corpus.
+    """
+    return corpus()
+
+
+@pytest.fixture(name="documents", scope="module")
+def fixture_documents(articles):
+    """
+    The synthetic corpus, scanned once.
+    """
+    return scan(articles)
+
+
+def test_search_matches_a_brute_force_scan(tmp_path, articles, documents):
+    """
+    Terms spanning several blocks, phrases and filters give the scanned results.
+    """
+    with IndexWriter(str(tmp_path), segment_size=150) as writer:
+        assert writer.add_all(articles) == len(articles)
+        assert len(writer.manifest["segments"]) == 3
+    assert sum("alpha" in positions for _, positions, _ in documents) > 2 * BLOCK_SIZE
+    with InvertedIndex(str(tmp_path)) as index:
+        assert index.documents == len(articles)
+        assert_matches_brute_force(index, documents)
+
+
+def test_newest_order_and_date_bounds(tmp_path, articles, documents):
+    """
+    Hits ordered by time are the newest matching articles, within the bounds.
+    """
+    with IndexWriter(str(tmp_path), segment_size=150) as writer:
+        writer.add_all(articles)
+    with InvertedIndex(str(tmp_path)) as index:
+        hits = index.search("alpha", end=START + 200 * 3600, limit=10, order="newest")
+        matching = brute_force(documents, "alpha", start=START, end=START + 200 * 3600)
+        expected = sorted(
+            (article["published"] for article in articles if article["url"] in matching),
+            reverse=True,
+        )[:10]
+        assert [hit.published for hit in hits] == expected
+        with pytest.raises(ValueError):
+            index.search("")
+
+
+def test_incremental_build_skips_indexed_urls(tmp_path, articles, documents):
+    """
+    Articles already indexed, in this run or an earlier one, are not added again.
+    """
+    with IndexWriter(str(tmp_path), segment_size=1000) as writer:
+        writer.add_all(articles[:250])
+    with IndexWriter(str(tmp_path), segment_size=1000) as writer:
+        assert writer.add_all(articles[200:] + articles[300:310]) == 150
+        assert writer.stats == {"added": 150, "duplicates": 60}
+    with InvertedIndex(str(tmp_path)) as index:
+        assert index.documents == len(articles)
+        assert_matches_brute_force(index, documents)
+
+
+def test_merge_keeps_the_results(tmp_path, articles, documents):
+    """
+    Merged segments answer every query as the separate ones did.
+    """
+    with IndexWriter(str(tmp_path), segment_size=100) as writer:
+        writer.add_all(articles)
+        writer.merge()
+        assert writer.manifest["segments"] == ["segment-000004"]
+    assert sorted(os.listdir(tmp_path)) == ["manifest.json", "segment-000004"]
+    with InvertedIndex(str(tmp_path)) as index:
+        assert len(index.segments) == 1
+        assert_matches_brute_force(index, documents)
+
+
+def test_segment_left_by_a_crashed_writer_is_removed(tmp_path, articles, documents):
+    """
+    An unlisted segment directory does not stop the next writer.
+    """
+    with IndexWriter(str(tmp_path)) as writer:
+        writer.add_all(articles[:100])
+    os.makedirs(tmp_path / "segment-000001")
+    with IndexWriter(str(tmp_path)) as writer:
+        assert writer.add_all(articles[100:]) == 300
+    with InvertedIndex(str(tmp_path)) as index:
+        assert_matches_brute_force(index, documents)
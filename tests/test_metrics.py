@@ -0,0 +1,64 @@
+"""
+Tests of the crawl metrics registry and of metrics recorded in parser processes.
+"""
+
+import pickle
+import time
+
+from src.crawlers.metrics import CrawlMetrics
+from src.crawlers.pipeline import CrawlPipeline
+from tests.test_pipeline import ARCHIVE_URL, crawler_for, pipeline_pages
+
+
+def busy(seconds):
+    """
+    Spins for a duration, so the profiler sees the calling stage.
+    """
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def test_nested_stages_are_profiled_separately():
+    """
+    A stage nested in another one gets its own profile.
+    """
+    metrics = CrawlMetrics(profile=True)
+    with metrics.timer("outer"):
+        busy(0.01)
+        with metrics.timer("inner"):
+            busy(0.01)
+    assert set(metrics.drain()["profiles"]) == {"outer", "inner"}
+
+
+def test_drained_metrics_merge_into_another_registry(tmp_path):
+    """
+    Drained histograms, counters and profiles survive pickling and add up.
+    """
+    child = CrawlMetrics(profile=True)
+    with child.timer("html_parse"):
+        busy(0.001)
+    child.count("bytes_downloaded", 100)
+    parent = CrawlMetrics()
+    parent.count("bytes_downloaded", 50)
+    parent.merge(pickle.loads(pickle.dumps(child.drain())))
+    snapshot = parent.snapshot()
+    assert snapshot["stages"]["html_parse"]["count"] == 1
+    assert snapshot["counters"][0]["value"] == 150
+    assert not child.snapshot()["stages"]
+    assert parent.dump_profiles(str(tmp_path)) == ["html_parse"]
+
+
+def test_parser_processes_report_their_stages(articles, tmp_path):
+    """
+    Stages timed in the parser processes appear in the pipeline's metrics.
+    """
+    metrics = CrawlMetrics(profile=True)
+    crawler = crawler_for(pipeline_pages(articles, empty={2}))
+    stats = CrawlPipeline(crawler, parse_workers=1, metrics=metrics).run([ARCHIVE_URL])
+    assert stats["articles"] == 4
+    assert stats["failed"] == 1
+    stages = metrics.snapshot()["stages"]
+    assert stages["extract_article"]["count"] == 5
+    assert stages["html_parse"]["count"] == 6
+    assert "extract_article" in metrics.dump_profiles(str(tmp_path))
@@ -0,0 +1,48 @@
+"""
+Tests of the partitioned Parquet export.
+"""
+
+import json
+
+import pytest
+
+pytest.importorskip("pyarrow")
+
+# pylint: disable=wrong-import-position
+from src.crawlers.parquet_export import SOURCES, export_articles, read_articles, source_of
+from src.crawlers.sites import SITES
+
+
+def write_json(path, articles):
+    """
+    Writes articles as a crawler JSON file.
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(articles, f, ensure_ascii=False)
+    return str(path)
+
+
+def test_sources_follow_the_site_specs():
+    """
+    Every site spec's host maps to its source name.
+    """
+    assert SOURCES == {spec.host: name for name, spec in SITES.items()}
+    assert source_of("https://www.bd-pratidin.com/country/2024/03/31/1") == "bdpratidin"
+    assert source_of("https://www.example.com/a") == "example.com"
+
+
+def test_incremental_export_keeps_existing_rows(tmp_path, articles):
+    """
+    Exporting new articles into the same partitions adds to them, and
+    exporting them again adds nothing.
+    """
+    unique = list({article["url"]: article for article in articles}.values())
+    first = write_json(tmp_path / "first.json", unique[: len(unique) // 2])
+    second = write_json(tmp_path / "second.json", unique[len(unique) // 2:])
+    dataset = str(tmp_path / "dataset")
+    written = export_articles([first], dataset)
+    written += export_articles([second], dataset)
+    assert written == len(unique)
+    assert export_articles([first, second], dataset) == 0
+    urls = read_articles(dataset, columns=["url"]).column("url").to_pylist()
+    assert sorted(urls) == sorted(article["url"] for article in unique)
@@ -0,0 +1,144 @@
+"""
+Tests of the staged crawl pipeline on pages of the mock server.
+"""
+
+import asyncio
+from datetime import date
+
+import pytest
+
+from benchmarks import mock_server
+from src.crawlers.crawl_state import IncrementalState
+from src.crawlers.extraction import LxmlBackend, SoupBackend, etree
+from src.crawlers.fetch_engine import FetchResult
+from src.crawlers.frontier import UrlFrontier
+from src.crawlers.metrics import CrawlMetrics
+from src.crawlers.pipeline import CrawlPipeline
+from src.crawlers.site_crawler import SiteCrawler
+from src.crawlers.sites import SITES
+
+ARCHIVE_URL = "https://www.banglanews24.com/sports"
+
+
+class PageEngine:  # pylint: disable=too-few-public-methods
+    """
+    A fetch engine that answers from a dictionary of pages.
+    """
+
+    def __init__(self, pages):
+        self.pages = pages
+
+    async def fetch(self, url):
+        """
+        Returns the page of a URL.
+        """
+        await asyncio.sleep(0)
+        return FetchResult(url, self.pages[url], None)
+
+
+def crawler_for(pages, backend="bs4"):
+    """
+    Returns a BanglaNews24 crawler that fetches the given pages.
+    """
+    return SiteCrawler(
+        PageEngine(pages), backend=backend, spec=SITES["banglanews24"], metrics=CrawlMetrics()
+    )
+
+
+def pipeline_pages(articles, empty=()):
+    """
+    Returns an archive page and its article pages, with empty bodies for the
+    article indexes in empty.
+    """
+    urls = [f"https://www.banglanews24.com/sports/news/bd/{i}.details" for i in range(5)]
+    pages = {ARCHIVE_URL: mock_server.render_bn24_archive(urls).encode()}
+    for i, url in enumerate(urls):
+        pages[url] = b"" if i in empty else mock_server.render_bn24_article(articles[i]).encode()
+    return pages
+
+
+@pytest.mark.parametrize("backend", ["bs4", "lxml"])
+def test_empty_page_parses_to_empty_document(backend):
+    """
+    Empty and whitespace-only bodies parse instead of raising.
+    """
+    if backend == "lxml" and etree is None:
+        pytest.skip("lxml is not installed")
+    parser = LxmlBackend() if backend == "lxml" else SoupBackend()
+    for body in (b"", b"  \n"):
+        document = parser.parse(body)
+        assert parser.find(document, "article") is None
+        assert not parser.links(document)
+
+
+@pytest.mark.parametrize("backend", ["bs4", "lxml"])
+def test_empty_article_fails_alone(articles, backend):
+    """
+    An empty article page fails that article, and the others are stored.
+    """
+    if backend == "lxml" and etree is None:
+        pytest.skip("lxml is not installed")
+    crawler = crawler_for(pipeline_pages(articles, empty={1, 3}), backend)
+    stats = CrawlPipeline(crawler, parse_workers=0, metrics=CrawlMetrics()).run([ARCHIVE_URL])
+    assert stats["articles"] == 3
+    assert stats["failed"] == 2
+    assert len(crawler.articles) == 3
+
+
+def test_empty_archive_is_skipped(articles):
+    """
+    An empty archive page yields no links and does not stop the crawl.
+    """
+    pages = pipeline_pages(articles)
+    pages["https://www.banglanews24.com/empty"] = b""
+    crawler = crawler_for(pages)
+    stats = CrawlPipeline(crawler, parse_workers=0, metrics=CrawlMetrics()).run(
+        ["https://www.banglanews24.com/empty", ARCHIVE_URL]
+    )
+    assert stats["archives"] == 2
+    assert stats["articles"] == 5
+
+
+def test_unexpected_errors_fail_one_page(articles, monkeypatch):
+    """
+    Errors other than a missing element fail only their page.
+    """
+    crawler = crawler_for(pipeline_pages(articles))
+    extract = crawler.extract_article
+
+    def flaky(url, html):
+        if url.endswith("/2.details"):
+            raise ValueError("broken page")
+        return extract(url, html)
+
+    monkeypatch.setattr(crawler, "extract_article", flaky)
+    stats = CrawlPipeline(crawler, parse_workers=0, metrics=CrawlMetrics()).run([ARCHIVE_URL])
+    assert stats["articles"] == 4
+    assert stats["failed"] == 1
+
+
+def test_article_stored_by_an_earlier_run_closes_its_archive(tmp_path, articles):
+    """
+    A link the frontier has as done is recorded under the archive listing it.
+    """
+    pages = pipeline_pages(articles)
+    national = "https://www.banglanews24.com/national?date=2024/03/31"
+    sports = "https://www.banglanews24.com/sports?date=2024/03/31"
+    cross_listed = "https://www.banglanews24.com/sports/news/bd/0.details"
+    pages[sports] = pages.pop(ARCHIVE_URL)
+    pages[national] = mock_server.render_bn24_archive([cross_listed]).encode()
+    with UrlFrontier(str(tmp_path / "frontier.sqlite3")) as frontier, \
+            IncrementalState(str(tmp_path / "state.sqlite3")) as state:
+        frontier.add([cross_listed])
+        frontier.mark_done([cross_listed])
+        crawler = crawler_for(pages)
+        crawler.frontier = frontier
+        crawler.state = state
+        stats = CrawlPipeline(crawler, parse_workers=0, metrics=CrawlMetrics()).run(
+            [sports, national]
+        )
+        crawler.mark_stored([article.url for article in crawler.articles])
+        crawler.mark_archives_crawled()
+        assert stats["articles"] == 4
+        assert state.is_closed("banglanews24", "sports", date(2024, 3, 31))
+        assert state.is_closed("banglanews24", "national", date(2024, 3, 31))
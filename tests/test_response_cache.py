@@ -0,0 +1,83 @@
+"""
+Tests of the content-addressed response cache.
+"""
+
+import os
+import threading
+import time
+
+from src.crawlers.response_cache import ResponseCache
+
+
+def objects(cache):
+    """
+    Returns the number of body files in a cache directory.
+    """
+    return sum(len(names) for _, _, names in os.walk(os.path.join(cache.directory, "objects")))
+
+
+def test_shared_bodies_are_counted_once(tmp_path):
+    """
+    Identical bodies of several URLs are stored and counted once.
+    """
+    with ResponseCache(str(tmp_path)) as cache:
+        cache.store("http://a/1", b"x" * 100)
+        cache.store("http://a/2", b"x" * 100)
+        cache.store("http://a/3", b"y" * 50)
+        assert cache.total_bytes() == 150
+        assert objects(cache) == 2
+        cache.store("http://a/1", b"z" * 10)
+        assert cache.total_bytes() == 160
+        cache.store("http://a/2", b"z" * 10)
+        assert cache.total_bytes() == 60
+        assert objects(cache) == 2
+    with ResponseCache(str(tmp_path)) as cache:
+        assert cache.total_bytes() == 60
+
+
+def test_least_recently_used_bodies_are_evicted(tmp_path):
+    """
+    Storing beyond max_bytes evicts the least recently used entries.
+    """
+    with ResponseCache(str(tmp_path), max_bytes=250) as cache:
+        for i in range(3):
+            cache.store(f"http://a/{i}", bytes([i]) * 100)
+            time.sleep(0.01)
+        assert cache.lookup("http://a/0") is None
+        assert cache.lookup("http://a/2") is not None
+        assert cache.total_bytes() == 200
+
+
+def test_entries_expire_while_running(tmp_path):
+    """
+    Entries older than max_age are misses, and later stores remove them.
+    """
+    with ResponseCache(str(tmp_path), max_age=0.2) as cache:
+        entry = cache.store("http://a/old", b"old body")
+        assert cache.lookup("http://a/old") == entry
+        time.sleep(0.25)
+        assert cache.lookup("http://a/old") is None
+        cache.store("http://a/new", b"new body")
+        assert cache.total_bytes() == len(b"new body")
+        assert objects(cache) == 1
+
+
+def test_concurrent_stores_keep_shared_bodies(tmp_path):
+    """
+    A body stays on disk while URLs storing and replacing it race.
+    """
+    with ResponseCache(str(tmp_path)) as cache:
+
+        def churn(url):
+            for i in range(200):
+                cache.store(url, b"shared" if i % 2 else url.encode())
+
+        threads = [threading.Thread(target=churn, args=(f"http://a/{i}",)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for i in range(4):
+            entry = cache.lookup(f"http://a/{i}")
+            assert cache.read(entry) == b"shared"
+        assert cache.total_bytes() == len(b"shared")
@@ -0,0 +1,166 @@
+"""
+Tests of sitemap discovery and of the incremental state keys it records.
+"""
+
+import copy
+from datetime import date, datetime
+
+from src.crawlers.article_record import ArticleRecord
+from src.crawlers.crawl_state import IncrementalState
+from src.crawlers.fetch_engine import FetchResult
+from src.crawlers.metrics import CrawlMetrics
+from src.crawlers.site_crawler import SiteCrawler
+from src.crawlers.sitemaps import SitemapDiscovery
+from src.crawlers.sites import BDPRATIDIN
+
+SITEMAP_URL = "https://www.bd-pratidin.com/sitemap.xml"
+MARCH_31 = datetime(2024, 3, 31)
+
+
+class DocumentEngine:  # pylint: disable=too-few-public-methods
+    """
+    A fetch engine that answers from a dictionary of documents.
+    """
+
+    def __init__(self, documents):
+        self.documents = documents
+
+    def fetch_all(self, urls):
+        """
+        Returns the document of each URL.
+        """
+        return [FetchResult(url, self.documents[url], None) for url in urls]
+
+
+class ListSink:  # pylint: disable=too-few-public-methods
+    """
+    An article sink that keeps the written articles in a list.
+    """
+
+    def __init__(self):
+        self.articles = []
+
+    def write(self, article):
+        """
+        Keeps an article.
+        """
+        self.articles.append(article)
+
+
+def urlset(*entries):
+    """
+    Renders a news sitemap of (url, publication date, lastmod) entries.
+    """
+    body = []
+    for url, published, lastmod in entries:
+        body.append(f"<url><loc>{url}</loc>")
+        if published:
+            body.append(f"<news:news><news:publication_date>{published}"
+                        "</news:publication_date></news:news>")
+        if lastmod:
+            body.append(f"<lastmod>{lastmod}</lastmod>")
+        body.append("</url>")
+    return (
+        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9" '
+        'xmlns:news="http://www.google.com/schemas/sitemap-news/0.9">'
+        + "".join(body) + "</urlset>"
+    ).encode()
+
+
+def article_url(number, category="country"):
+    """
+    Returns the URL of a BD Pratidin article published on March 31.
+    """
+    return f"https://www.bd-pratidin.com/{category}/2024/03/31/{number}"
+
+
+def crawler_for(documents, state):
+    """
+    Returns a BD Pratidin crawler that reads the given sitemap documents.
+    """
+    spec = copy.copy(BDPRATIDIN)
+    spec.sitemaps = (SITEMAP_URL,)
+    return SiteCrawler(DocumentEngine(documents), spec=spec, state=state, metrics=CrawlMetrics())
+
+
+def test_modification_time_only_bounds_the_publication_date():
+    """
+    Entries are filtered on publication dates, and on lastmod only from below.
+    """
+    sitemap = urlset(
+        (article_url(1), "2024-03-31T10:00:00+06:00", "2024-04-05"),
+        (article_url(2), None, "2024-04-05"),
+        (article_url(3), None, "2024-03-20"),
+        (article_url(4), "2024-04-02T10:00:00+06:00", "2024-03-31"),
+    )
+    discovery = SitemapDiscovery(DocumentEngine({SITEMAP_URL: sitemap}))
+    entries = discovery.discover([SITEMAP_URL], MARCH_31, MARCH_31)
+    assert [entry.url for entry in entries] == [article_url(1), article_url(2)]
+    assert entries[1].published is None
+    assert discovery.stats["unconfirmed"] == 1
+
+
+def test_too_many_documents_fall_back_to_archives():
+    """
+    Discovery gives up instead of returning the entries of some documents only.
+    """
+    children = [f"https://www.bd-pratidin.com/sitemap-{i}.xml" for i in range(3)]
+    index = (
+        '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+        + "".join(f"<sitemap><loc>{url}</loc><lastmod>2024-03-31</lastmod></sitemap>"
+                  for url in children)
+        + "</sitemapindex>"
+    ).encode()
+    documents = {SITEMAP_URL: index}
+    documents.update(
+        {url: urlset((article_url(i), "2024-03-31", None)) for i, url in enumerate(children)}
+    )
+    discovery = SitemapDiscovery(DocumentEngine(documents), max_documents=3)
+    assert discovery.discover([SITEMAP_URL], MARCH_31, MARCH_31) is None
+    discovery = SitemapDiscovery(DocumentEngine(documents), max_documents=4)
+    assert len(discovery.discover([SITEMAP_URL], MARCH_31, MARCH_31)) == 3
+
+
+def test_sitemap_articles_are_recorded_under_their_archive(tmp_path):
+    """
+    Articles found in sitemaps are known to the archive that lists them.
+    """
+    sitemap = urlset(
+        (article_url(1), "2024-03-31T10:00:00+06:00", None),
+        (article_url(2, "sports"), None, "2024-04-02"),
+        (article_url(3), "2024-03-20T10:00:00+06:00", None),
+    )
+    archive_url = next(BDPRATIDIN.archive_urls(BDPRATIDIN.base_url, MARCH_31, MARCH_31))
+    category, day = BDPRATIDIN.archive_key(archive_url)
+    assert (category, day) == ("first-page", date(2024, 3, 31))
+    with IncrementalState(str(tmp_path / "state.sqlite3")) as state:
+        crawler = crawler_for({SITEMAP_URL: sitemap}, state)
+        urls = crawler.discover_articles(MARCH_31, MARCH_31)
+        assert urls == [article_url(1), article_url(2, "sports")]
+        for url in urls:
+            crawler.store_article(ArticleRecord(url, date="১৪৫৯ ঘণ্টা, মার্চ ৩১, ২০২৪"))
+        crawler.mark_stored(urls)
+        assert not state.new_links("bdpratidin", category, day, urls, stop_after=0)
+
+
+def test_unconfirmed_article_outside_the_range_is_dropped(tmp_path):
+    """
+    An article dated by lastmod only is not written if its page date is out of range.
+    """
+    sitemap = urlset(
+        (article_url(1), "2024-03-31T10:00:00+06:00", None),
+        (article_url(2), None, "2024-04-05"),
+        (article_url(3), None, "2024-04-05"),
+    )
+    with IncrementalState(str(tmp_path / "state.sqlite3")) as state:
+        crawler = crawler_for({SITEMAP_URL: sitemap}, state)
+        crawler.sink = ListSink()
+        urls = crawler.discover_articles(MARCH_31, MARCH_31)
+        assert urls == [article_url(1), article_url(2), article_url(3)]
+        crawler.store_article(ArticleRecord(urls[1], date="১৪৫৯ ঘণ্টা, মার্চ ৩১, ২০২৪"))
+        crawler.store_article(ArticleRecord(urls[2], date="১৪৫৯ ঘণ্টা, এপ্রিল ০৫, ২০২৪"))
+        assert [article.url for article in crawler.sink.articles] == [article_url(2)]
+        category = BDPRATIDIN.archive_category(article_url(3))
+        assert not state.new_links(
+            "bdpratidin", category, date(2024, 4, 5), [article_url(3)], stop_after=0
+        )
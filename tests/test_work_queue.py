@@ -0,0 +1,141 @@
+"""
+Tests of the SQLite work queue's leases and of the crawl worker releasing its tasks.
+"""
+
+from datetime import date
+
+from benchmarks import mock_server
+from src.crawlers import work_queue
+from src.crawlers.article_store import JsonlShardWriter
+from src.crawlers.distributed import CrawlWorker
+from src.crawlers.work_queue import SqliteWorkQueue, make_task
+from tests.test_pipeline import ARCHIVE_URL, crawler_for, pipeline_pages
+
+DAY = date(2024, 3, 31)
+
+
+class Clock:  # pylint: disable=too-few-public-methods
+    """
+    A clock that only moves when the test advances it.
+    """
+
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        """
+        Returns the current time.
+        """
+        return self.now
+
+
+def tasks(count):
+    """
+    Returns the tasks of count BanglaNews24 archive pages.
+    """
+    return [
+        make_task("banglanews24", f"category-{i}", DAY, f"https://www.banglanews24.com/{i}")
+        for i in range(count)
+    ]
+
+
+def open_queue(tmp_path, monkeypatch, **kwargs):
+    """
+    Opens a queue that reads the time from a test clock, and returns both.
+    """
+    clock = Clock()
+    monkeypatch.setattr(work_queue, "time", clock)
+    return SqliteWorkQueue(str(tmp_path / "queue.sqlite3"), lease_seconds=10, **kwargs), clock
+
+
+def test_claim_leases_each_task_once(tmp_path, monkeypatch):
+    """
+    Tasks are claimed oldest first, by one worker only, and put only once.
+    """
+    queue, _ = open_queue(tmp_path, monkeypatch)
+    assert queue.put(tasks(3)) == 3
+    assert queue.put(tasks(4)) == 1
+    first = queue.claim("a", limit=2)
+    assert [task.task_id for task in first] == [task.task_id for task in tasks(2)]
+    assert [task.attempts for task in first] == [1, 1]
+    assert [task.url for task in queue.claim("b", limit=5)] == [
+        task.url for task in tasks(4)[2:]
+    ]
+    assert not queue.claim("c")
+    assert queue.counts() == {"queued": 0, "leased": 4, "done": 0, "failed": 0}
+
+
+def test_renewed_lease_outlives_its_first_expiry(tmp_path, monkeypatch):
+    """
+    A renewed lease is kept past its first expiry, and an expired one is lost.
+    """
+    queue, clock = open_queue(tmp_path, monkeypatch)
+    queue.put(tasks(2))
+    first, second = queue.claim("a", limit=2)
+    clock.now += 8
+    assert queue.renew("a", [first.task_id]) == [first.task_id]
+    assert not queue.renew("b", [second.task_id])
+    clock.now += 8
+    assert queue.renew("a", [first.task_id, second.task_id]) == [first.task_id]
+    assert queue.requeue_expired() == 1
+    assert [task.task_id for task in queue.claim("b")] == [second.task_id]
+    assert not queue.complete("a", second.task_id)
+    assert queue.complete("a", first.task_id)
+    assert queue.counts() == {"queued": 0, "leased": 1, "done": 1, "failed": 0}
+
+
+def test_expired_lease_is_claimed_again(tmp_path, monkeypatch):
+    """
+    The task of a worker that stopped renewing is handed to the next claim.
+    """
+    queue, clock = open_queue(tmp_path, monkeypatch)
+    queue.put(tasks(1))
+    queue.claim("a")
+    clock.now += 11
+    (task,) = queue.claim("b")
+    assert task.attempts == 2
+    assert queue.complete("b", task.task_id)
+    assert not queue.fail("a", task.task_id, "too late")
+
+
+def test_task_fails_for_good_after_max_attempts(tmp_path, monkeypatch):
+    """
+    Failures and expiries queue a task again until it used max_attempts claims.
+    """
+    queue, clock = open_queue(tmp_path, monkeypatch, max_attempts=3)
+    queue.put(tasks(1))
+    (task,) = queue.claim("a")
+    assert queue.fail("a", task.task_id, "archive not crawled")
+    queue.claim("a")
+    clock.now += 11
+    assert queue.requeue_expired() == 1
+    (task,) = queue.claim("a")
+    assert task.attempts == 3
+    assert queue.fail("a", task.task_id, "archive not crawled")
+    assert not queue.claim("a")
+    assert queue.counts() == {"queued": 0, "leased": 0, "done": 0, "failed": 1}
+
+
+def test_worker_fails_archives_with_failed_articles(tmp_path, monkeypatch, articles):
+    """
+    A task is completed only once its archive and all its articles are stored.
+    """
+    queue, _ = open_queue(tmp_path, monkeypatch)
+    broken = "https://www.banglanews24.com/national"
+    broken_article = "https://www.banglanews24.com/national/news/bd/9.details"
+    pages = pipeline_pages(articles)
+    pages[broken] = mock_server.render_bn24_archive([broken_article]).encode()
+    pages[broken_article] = b""
+    queue.put([
+        make_task("banglanews24", "sports", DAY, ARCHIVE_URL),
+        make_task("banglanews24", "national", DAY, broken),
+    ])
+    with JsonlShardWriter(str(tmp_path / "articles")) as sink:
+        crawler = crawler_for(pages)
+        crawler.sink = sink
+        worker = CrawlWorker(crawler, queue, "a", pipeline_options={"parse_workers": 0})
+        assert worker.run(max_batches=1) == {"completed": 1, "failed": 1, "lost": 0}
+        assert queue.counts() == {"queued": 1, "leased": 0, "done": 1, "failed": 0}
+        pages[broken_article] = mock_server.render_bn24_article(articles[0]).encode()
+        assert worker.run(max_batches=1) == {"completed": 2, "failed": 1, "lost": 0}
+        assert queue.counts() == {"queued": 0, "leased": 0, "done": 2, "failed": 0}